@@ -0,0 +1,72 @@
+from typing import Optional
+
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import ResourceStats
+
+# NodeResourceStats 字段 -> ResourceStats 字段
+AGGREGATE_FIELDS = {
+    "cpu_count": "total_cpu_count",
+    "used_cpu_count": "used_cpu_count",
+    "gpu_count": "total_gpu_count",
+    "used_gpu_count": "used_gpu_count",
+    "memory_count": "total_memory_count",
+    "used_memory_count": "used_memory_count",
+    "storage_count": "total_storage_count",
+    "used_storage_count": "used_storage_count",
+}
+
+REGION_COUNT_FIELDS = {
+    RegionType.Cloud: "cloud_node_count",
+    RegionType.Edge: "edge_node_count",
+    RegionType.Device: "device_node_count",
+}
+
+
+class ResourceAggregates:
+    """
+    集群资源的增量汇总
+
+    每次心跳时减去节点旧状态、加上新状态，查询时直接读取汇总值，
+    与节点数量无关。
+    """
+
+    def __init__(self):
+        self.node_counts: dict[RegionType, int] = {region: 0 for region in RegionType}
+        self.totals: dict[RegionType, dict[str, int]] = {
+            region: dict.fromkeys(AGGREGATE_FIELDS, 0) for region in RegionType
+        }
+
+    def _apply(self, stats: NodeResourceStats, sign: int):
+        for region in (stats.region, RegionType.ALL):
+            self.node_counts[region] += sign
+            totals = self.totals[region]
+            for field in AGGREGATE_FIELDS:
+                totals[field] += sign * getattr(stats, field)
+
+    def add(self, stats: NodeResourceStats):
+        self._apply(stats, 1)
+
+    def remove(self, stats: NodeResourceStats):
+        self._apply(stats, -1)
+
+    def update(self, old: Optional[NodeResourceStats], new: NodeResourceStats):
+        if old is not None:
+            self.remove(old)
+        self.add(new)
+
+    def to_resource_stats(self, region: RegionType = RegionType.ALL) -> ResourceStats:
+        region_counts = {
+            count_field: self.node_counts[node_region]
+            if region in (RegionType.ALL, node_region)
+            else 0
+            for node_region, count_field in REGION_COUNT_FIELDS.items()
+        }
+        totals = self.totals[region]
+        return ResourceStats(
+            **region_counts,
+            **{
+                stats_field: totals[node_field]
+                for node_field, stats_field in AGGREGATE_FIELDS.items()
+            },
+        )
@@ -1,64 +1,185 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi import Header
+from fastapi import Query
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 
 from cedschedulerapp.master.args import server_config
 from cedschedulerapp.master.client.client_type import InferenceInstanceInfo
+from cedschedulerapp.master.enums import ChatStreamEventType
+from cedschedulerapp.master.enums import NodeType
 from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.events import encode_event
+from cedschedulerapp.master.events import relay_until_disconnect
 from cedschedulerapp.master.manager import global_manager
+from cedschedulerapp.master.manager import NodeStatsResyncError
+from cedschedulerapp.master.metrics import CONTENT_TYPE
+from cedschedulerapp.master.metrics import global_metrics
+from cedschedulerapp.master.metrics import HEARTBEATS
+from cedschedulerapp.master.metrics import MetricsMiddleware
+from cedschedulerapp.master.response_cache import ResponseCache
 from cedschedulerapp.master.schemas import APIResponse
 from cedschedulerapp.master.schemas import BenchmarkHistory
 from cedschedulerapp.master.schemas import BenchmarkProgressResponse
 from cedschedulerapp.master.schemas import BenchmarkRequest
 from cedschedulerapp.master.schemas import BenchmarkResultResponse
+from cedschedulerapp.master.schemas import BenchmarkSummaryResponse
 from cedschedulerapp.master.schemas import InferenceService
+from cedschedulerapp.master.schemas import InstanceRouteState
+from cedschedulerapp.master.schemas import LoadTestRequest
+from cedschedulerapp.master.schemas import NodeHistoryResponse
 from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import NodeResourceStatsDelta
+from cedschedulerapp.master.schemas import NodeStatusInfo
 from cedschedulerapp.master.schemas import RequestSubmitRequest
 from cedschedulerapp.master.schemas import ResourceStats
 from cedschedulerapp.master.schemas import SubmitTaskRequest
 from cedschedulerapp.master.schemas import TaskLogResponse
+from cedschedulerapp.master.schemas import TaskSubmissionState
 from cedschedulerapp.master.schemas import TrainingTask
 from cedschedulerapp.master.schemas import TrainingTaskDetail
 from cedschedulerapp.utils.logger import setup_logger
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global_manager.start()
+    yield
+    await global_manager.close()
+
+
+app = FastAPI(lifespan=lifespan)
+# 长连接推送的耗时是连接时长，不计入请求延迟
+app.add_middleware(MetricsMiddleware, untimed_routes=["/dashboard/stream", "/inference/chat/stream"])
 logger = setup_logger(__name__)
+# 大列表接口按数据版本缓存序列化后的响应
+response_cache = ResponseCache()
+
+STALE_MESSAGE = "上游服务不可用，返回最近一次成功获取的数据"
+
+HEARTBEAT_OK = HEARTBEATS.labels("full", "ok")
+HEARTBEAT_ERROR = HEARTBEATS.labels("full", "error")
+HEARTBEAT_DELTA_OK = HEARTBEATS.labels("delta", "ok")
+HEARTBEAT_DELTA_RESYNC = HEARTBEATS.labels("delta", "resync")
+HEARTBEAT_DELTA_ERROR = HEARTBEATS.labels("delta", "error")
+
+
+def stale_response(data, stale: bool) -> APIResponse:
+    return APIResponse(data=data, stale=True, message=STALE_MESSAGE) if stale else APIResponse(data=data)
 
 
 @app.post("/node/heartbeat", response_model=APIResponse[NodeResourceStats])
 async def receive_heartbeat(stats: NodeResourceStats):
     """接收来自worker节点的心跳信息"""
+    global_manager.record_trace(TraceRecordType.Heartbeat, stats)
     try:
         await global_manager.update_node_stats(stats.node_id, stats)
+        HEARTBEAT_OK.inc()
         return APIResponse(data=stats)
     except Exception as e:
+        HEARTBEAT_ERROR.inc()
         return APIResponse(code=500, message=f"更新节点状态失败: {str(e)}")
 
 
+@app.post("/node/heartbeat/delta", response_model=APIResponse[None])
+async def receive_heartbeat_delta(delta: NodeResourceStatsDelta):
+    """接收增量心跳，只包含变化的字段；返回 409 时 worker 需重发全量心跳"""
+    global_manager.record_trace(TraceRecordType.HeartbeatDelta, delta)
+    try:
+        await global_manager.update_node_stats(delta.node_id, delta)
+        HEARTBEAT_DELTA_OK.inc()
+        return APIResponse()
+    except NodeStatsResyncError as e:
+        HEARTBEAT_DELTA_RESYNC.inc()
+        return APIResponse(code=409, message=f"需要全量心跳: {str(e)}")
+    except Exception as e:
+        HEARTBEAT_DELTA_ERROR.inc()
+        return APIResponse(code=500, message=f"更新节点状态失败: {str(e)}")
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 指标"""
+    return Response(global_metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/dashboard/stream")
+async def dashboard_stream():
+    """
+    看板 SSE 推送：先发送 snapshot 事件，之后只发送变化
+
+    事件类型: resources, node, node_removed, task, instances, benchmark_progress
+    """
+    return StreamingResponse(
+        global_manager.dashboard_hub.stream(global_manager.get_dashboard_snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/resources/stats", response_model=APIResponse[ResourceStats])
-async def get_resource_stats():
+async def get_resource_stats(region: RegionType = RegionType.ALL):
     try:
-        stats = await global_manager.get_resource_stats()
+        stats = await global_manager.get_resource_stats(region)
         return APIResponse(data=stats)
     except Exception as e:
         return APIResponse(code=500, message=f"获取资源统计失败: {str(e)}")
 
 
-@app.get("/resources/node_stats", response_model=APIResponse[list[NodeResourceStats]])
-async def get_nodes_stats(region: RegionType) -> APIResponse[list[NodeResourceStats]]:
+@app.get("/resources/node_stats", response_model=APIResponse[list[NodeStatusInfo]])
+async def get_nodes_stats(
+    region: RegionType,
+    node_type: Optional[NodeType] = None,
+    gpu_type: Optional[str] = None,
+    free_gpu: bool = False,
+    accept_encoding: Annotated[Optional[str], Header()] = None,
+):
+    """按区域查询节点状态，可组合节点类型、GPU 型号及是否有空闲 GPU 过滤"""
     try:
-        if region == RegionType.ALL:
-            stats = await global_manager.get_all_node_stats()
-        else:
-            stats = await global_manager.get_nodes_stats_by_region(region)
-        return APIResponse(data=stats)
+        key = ("node_stats", region, node_type, gpu_type, free_gpu)
+        version = global_manager.node_stats_cache_version()
+        payload = response_cache.lookup(key, version)
+        if payload is None:
+            stats = await global_manager.query_node_stats(
+                region=region, node_type=node_type, gpu_type=gpu_type, free_gpu=free_gpu
+            )
+            payload = response_cache.store(key, version, APIResponse(data=stats))
+        return await payload.to_response(accept_encoding)
     except Exception as e:
         return APIResponse(code=500, message=f"获取所有节点状态失败: {str(e)}")
 
 
+@app.get("/resources/node_history", response_model=APIResponse[NodeHistoryResponse])
+async def get_node_history(
+    node_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: Optional[int] = None,
+):
+    """查询节点 CPU、内存、存储及各 GPU 显存、利用率的历史，可选分辨率 5 / 60 / 900 秒"""
+    try:
+        history = await global_manager.get_node_history(node_id, start=start, end=end, resolution=resolution)
+        if history is None:
+            return APIResponse(code=404, message=f"节点不存在: {node_id}")
+        return APIResponse(data=history)
+    except ValueError as e:
+        return APIResponse(code=400, message=f"查询参数错误: {str(e)}")
+    except Exception as e:
+        return APIResponse(code=500, message=f"获取节点历史失败: {str(e)}")
+
+
 @app.get("/resources/task_sim_list", response_model=APIResponse[list[TrainingTask]])
 async def get_training_task_sim_list():
     try:
-        stats = await global_manager.get_training_task_sim_list()
-        return APIResponse(data=stats)
+        stats, stale = await global_manager.get_training_task_sim_list()
+        return stale_response(stats, stale)
     except Exception as e:
         return APIResponse(code=500, message=f"获取训练任务列表失败: {str(e)}")
 
@@ -68,31 +189,49 @@ async def get_training_task_sim_list():
 )
 async def get_inference_service_sim_list():
     try:
-        stats = await global_manager.get_service_sim_list()
-        return APIResponse(data=stats)
+        stats, stale = await global_manager.get_service_sim_list()
+        return stale_response(stats, stale)
     except Exception as e:
         return APIResponse(code=500, message=f"获取推理服务列表失败: {str(e)}")
 
 
 @app.get("/training/task_list", response_model=APIResponse[list[TrainingTaskDetail]])
-async def get_training_task_list():
+async def get_training_task_list(accept_encoding: Annotated[Optional[str], Header()] = None):
     try:
-        stats = await global_manager.get_training_task_list()
-        return APIResponse(data=stats)
+        version = global_manager.training_task_snapshot.version
+        stats, stale = await global_manager.get_training_task_list()
+        payload = response_cache.get(("training_task_list", stale), version, lambda: stale_response(stats, stale))
+        return await payload.to_response(accept_encoding)
     except Exception as e:
         return APIResponse(code=500, message=f"获取训练任务列表失败: {str(e)}")
 
 
-@app.post("/training/task_submit", response_model=APIResponse[int])
+@app.post("/training/task_submit", response_model=APIResponse[list[str]])
 async def submit_task(request: list[SubmitTaskRequest]):
-    """提交任务到调度系统"""
+    """提交任务到调度系统，立即返回任务ID，任务在后台异步提交"""
+    global_manager.record_trace(TraceRecordType.Submit, request)
     try:
-        await global_manager.submit_task(request)
-        return APIResponse()
+        task_ids = await global_manager.submit_task(request)
+        return APIResponse(data=task_ids)
     except Exception as e:
         return APIResponse(code=500, message=f"任务提交失败: {str(e)}")
 
 
+@app.get(
+    "/training/task_submit/status",
+    response_model=APIResponse[list[TaskSubmissionState]],
+)
+async def get_task_submission_status(
+    task_ids: Annotated[Optional[list[str]], Query()] = None,
+):
+    """查询任务提交状态，不指定任务ID时返回全部"""
+    try:
+        states = await global_manager.get_task_submission_states(task_ids)
+        return APIResponse(data=states)
+    except Exception as e:
+        return APIResponse(code=500, message=f"获取任务提交状态失败: {str(e)}")
+
+
 @app.get("/training/task_log/{task_id}", response_model=APIResponse[TaskLogResponse])
 async def update_task(task_id: str):
     """更新训练任务状态"""
@@ -108,8 +247,8 @@ async def update_task(task_id: str):
 )
 async def get_inference_instance_list():
     try:
-        instances = await global_manager.get_inference_instance_list()
-        return APIResponse(data=instances)
+        instances, stale = await global_manager.get_inference_instance_list()
+        return stale_response(instances, stale)
     except Exception as e:
         return APIResponse(code=500, message=f"获取推理实例列表失败: {str(e)}")
 
@@ -123,15 +262,44 @@ async def get_inference_instance_log(instance_id: str):
         return APIResponse(code=500, message=f"获取推理实例日志失败: {str(e)}")
 
 
+@app.get("/inference/router", response_model=APIResponse[list[InstanceRouteState]])
+async def get_inference_router_states():
+    """各推理实例的路由状态：遥测、本地未返回请求数、估计负载及已分发请求数"""
+    return APIResponse(data=global_manager.get_inference_route_states())
+
+
 @app.post("/inference/chat", response_model=APIResponse[str])
 async def chat(request: RequestSubmitRequest):
     try:
-        response = await global_manager.generate(request.message)
+        response = await global_manager.generate(request.message, request.sampling_params())
         return APIResponse(data=response)
     except Exception as e:
         return APIResponse(code=500, message=f"生成失败: {str(e)}")
 
 
+async def chat_events(message: str, sampling_params: dict) -> AsyncIterator[bytes]:
+    try:
+        async for text in global_manager.generate_stream(message, sampling_params):
+            yield encode_event(ChatStreamEventType.Token, {"text": text})
+    except Exception as e:
+        yield encode_event(ChatStreamEventType.Error, {"message": f"生成失败: {str(e)}"})
+        return
+    yield encode_event(ChatStreamEventType.Done, {})
+
+
+@app.post("/inference/chat/stream")
+async def chat_stream(request: RequestSubmitRequest, http_request: Request):
+    """
+    流式生成 SSE：每个 token 事件的 data 为 {"text": 新增文本}，结束时发送 done 事件，
+    失败时发送 error 事件（data 为 {"message": 错误信息}）。客户端断开时立即中止上游生成。
+    """
+    return StreamingResponse(
+        relay_until_disconnect(chat_events(request.message, request.sampling_params()), http_request.receive),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/inference/benchmark", response_model=APIResponse[str])
 async def benchmark(request: BenchmarkRequest):
     try:
@@ -141,6 +309,29 @@ async def benchmark(request: BenchmarkRequest):
         return APIResponse(code=500, message=f"基准测试失败: {str(e)}")
 
 
+@app.post("/inference/loadtest", response_model=APIResponse[str])
+async def load_test(request: LoadTestRequest):
+    """
+    启动内置开环负载测试，返回基准测试 ID；进度和结果通过 /inference/benchmark/* 查询，
+    其中 prefill_latencies 为首 token 延迟
+    """
+    try:
+        benchmark_id = await global_manager.load_test(request)
+        return APIResponse(data=benchmark_id)
+    except ValueError as e:
+        return APIResponse(code=400, message=f"负载测试参数错误: {str(e)}")
+    except Exception as e:
+        return APIResponse(code=500, message=f"负载测试失败: {str(e)}")
+
+
+@app.delete("/inference/loadtest/{benchmark_id}", response_model=APIResponse[str])
+async def cancel_load_test(benchmark_id: str):
+    """停止进行中的负载测试，已完成请求的结果保留"""
+    if not global_manager.cancel_load_test(benchmark_id):
+        return APIResponse(code=404, message=f"负载测试不存在或已结束: {benchmark_id}")
+    return APIResponse(data=benchmark_id)
+
+
 @app.get(
     "/inference/benchmark/progress",
     response_model=APIResponse[BenchmarkProgressResponse],
@@ -156,22 +347,54 @@ async def benchmark_progress(benchmark_id: str, total: int, completed: int):
 @app.get(
     "/inference/benchmark/results", response_model=APIResponse[BenchmarkResultResponse]
 )
-async def benchmark_result(benchmark_id: str):
+async def benchmark_result(
+    benchmark_id: str,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    max_samples: Annotated[Optional[int], Query(ge=1)] = None,
+):
+    """获取基准测试原始样本，支持分页(offset/limit)和降采样(max_samples)"""
     try:
-        result = await global_manager.benchmark_result(benchmark_id)
+        result = await global_manager.benchmark_result(
+            benchmark_id, offset=offset, limit=limit, max_samples=max_samples
+        )
         return APIResponse(data=result)
     except Exception as e:
         return APIResponse(code=500, message=f"基准测试结果失败: {str(e)}")
 
 
+@app.get(
+    "/inference/benchmark/results/summary",
+    response_model=APIResponse[BenchmarkSummaryResponse],
+)
+async def benchmark_summary(
+    benchmark_id: str, bins: Annotated[int, Query(ge=1, le=1000)] = 20
+):
+    """获取基准测试统计摘要：分位数、均值、吞吐及直方图"""
+    try:
+        result = await global_manager.benchmark_summary(benchmark_id, bins)
+        return APIResponse(data=result)
+    except Exception as e:
+        return APIResponse(code=500, message=f"基准测试统计失败: {str(e)}")
+
+
 @app.get(
     "/inference/benchmark/results/list",
     response_model=APIResponse[list[BenchmarkHistory]],
 )
-async def benchmark_result_list():
+async def benchmark_result_list(
+    max_samples: Annotated[Optional[int], Query(ge=1)] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None,
+):
     try:
-        result = await global_manager.get_benchmark_result_list()
-        return APIResponse(data=result)
+        await global_manager.refresh_pending_benchmarks()
+        key = ("benchmark_result_list", max_samples)
+        version = global_manager.benchmark_history_version
+        payload = response_cache.lookup(key, version)
+        if payload is None:
+            result = await global_manager.get_benchmark_result_list(max_samples, refresh=False)
+            payload = response_cache.store(key, version, APIResponse(data=result))
+        return await payload.to_response(accept_encoding)
     except Exception as e:
         return APIResponse(code=500, message=f"基准测试结果列表失败: {str(e)}")
 
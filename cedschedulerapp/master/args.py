@@ -1,5 +1,10 @@
 import argparse
 from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from cedschedulerapp.master.enums import PlacementStrategy
+from cedschedulerapp.master.enums import RoutingPolicy
 
 
 @dataclass
@@ -10,6 +15,53 @@ class ServerConfig:
     training_port: int = 5000
     inference_host: str = "127.0.0.1"
     inference_port: int = 5001
+    inference_instances: dict[str, tuple[str, int]] = field(default_factory=dict)
+    routing_policy: RoutingPolicy = RoutingPolicy.LeastWaiting
+    router_refresh_interval: float = 1.0
+    chat_max_batch_size: int = 1
+    chat_batch_window: float = 0.01
+    chat_cache_size: int = 0
+    chat_cache_ttl: float = 3600.0
+    chat_cache_spill_path: Optional[str] = None
+    chat_cache_nondeterministic: bool = False
+    upstream_pool_size: int = 20
+    upstream_timeout: float = 10.0
+    upstream_failure_threshold: int = 5
+    upstream_reset_timeout: float = 30.0
+    upstream_max_retries: int = 2
+    upstream_retry_ratio: float = 0.2
+    training_poll_interval: float = 5.0
+    training_snapshot_max_age: float = 10.0
+    submit_concurrency: int = 8
+    submit_rate: float = 20.0
+    submit_max_retries: int = 3
+    submit_retry_backoff: float = 1.0
+    benchmark_db_path: str = "data/benchmark_history.db"
+    load_test_max_inflight: int = 4096
+    load_test_chat_url: Optional[str] = None
+    node_suspect_timeout: float = 15.0
+    node_dead_timeout: float = 60.0
+    node_evict_timeout: float = 600.0
+    node_stats_cache_ttl: float = 1.0
+    placement_strategy: Optional[PlacementStrategy] = None
+    record_trace: Optional[str] = None
+    dashboard_coalesce_window: float = 0.5
+    dashboard_poll_interval: float = 2.0
+
+
+def parse_instance_endpoints(value: str) -> dict[str, tuple[str, int]]:
+    """解析 "实例ID=host:port,..." 形式的实例地址映射"""
+    endpoints = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        instance_id, _, address = item.partition("=")
+        host, _, port = address.strip().rpartition(":")
+        if not instance_id.strip() or not host or not port.isdigit():
+            raise argparse.ArgumentTypeError(f"invalid instance endpoint {item!r}, expected instance_id=host:port")
+        endpoints[instance_id.strip()] = (host, int(port))
+    return endpoints
+
 
 def parse_args() -> ServerConfig:
     parser = argparse.ArgumentParser(description="CedScheduler Worker Server")
@@ -19,6 +71,132 @@ def parse_args() -> ServerConfig:
     parser.add_argument("--training-port", type=int, default=5000, help="训练服务器端口号 (默认: 5000)")
     parser.add_argument("--inference-host", type=str, default="127.0.0.1", help="推理服务器主机地址 (默认: 127.0.0.1)")
     parser.add_argument("--inference-port", type=int, default=5001, help="推理服务器端口号 (默认: 5001)")
+    parser.add_argument(
+        "--inference-instances",
+        type=parse_instance_endpoints,
+        default={},
+        help="推理实例地址映射 instance_id=host:port,...，配置后生成请求按负载直接分发到实例 (默认: 不启用)",
+    )
+    parser.add_argument(
+        "--routing-policy",
+        type=RoutingPolicy,
+        choices=list(RoutingPolicy),
+        default=RoutingPolicy.LeastWaiting,
+        help="推理请求路由策略 (默认: least_waiting，可选: free_kv, power_of_two)",
+    )
+    parser.add_argument(
+        "--router-refresh-interval", type=float, default=1.0, help="路由拉取推理实例负载的间隔秒数 (默认: 1.0)"
+    )
+    parser.add_argument(
+        "--chat-max-batch-size",
+        type=int,
+        default=1,
+        help="生成请求合批的最大 prompt 数，>1 时启用，要求上游 /generate 接受 prompt 列表 (默认: 1，不合批)",
+    )
+    parser.add_argument(
+        "--chat-batch-window",
+        type=float,
+        default=0.01,
+        help="合批最长等待秒数，实际窗口随请求到达速率自适应 (默认: 0.01)",
+    )
+    parser.add_argument(
+        "--chat-cache-size", type=int, default=0, help="生成结果内存缓存条数，>0 时启用 (默认: 0，不缓存)"
+    )
+    parser.add_argument("--chat-cache-ttl", type=float, default=3600.0, help="生成结果缓存有效期秒数 (默认: 3600)")
+    parser.add_argument(
+        "--chat-cache-spill-path",
+        type=str,
+        default=None,
+        help="内存缓存淘汰的条目写入该 SQLite 文件，重启后仍可命中 (默认: 不落盘)",
+    )
+    parser.add_argument(
+        "--chat-cache-nondeterministic",
+        action="store_true",
+        help="同时缓存 temperature 不为 0 的生成结果，相同请求将返回相同文本 (默认: 只缓存确定性采样)",
+    )
+    parser.add_argument("--upstream-pool-size", type=int, default=20, help="每个上游服务的连接池大小 (默认: 20)")
+    parser.add_argument("--upstream-timeout", type=float, default=10.0, help="上游请求默认超时秒数 (默认: 10.0)")
+    parser.add_argument(
+        "--upstream-failure-threshold", type=int, default=5, help="上游连续失败多少次后熔断 (默认: 5)"
+    )
+    parser.add_argument(
+        "--upstream-reset-timeout", type=float, default=30.0, help="熔断后多少秒放行探测请求 (默认: 30)"
+    )
+    parser.add_argument(
+        "--upstream-max-retries", type=int, default=2, help="只读上游请求失败后的最大重试次数 (默认: 2)"
+    )
+    parser.add_argument(
+        "--upstream-retry-ratio",
+        type=float,
+        default=0.2,
+        help="重试预算，重试请求数最多为正常请求数的比例 (默认: 0.2)",
+    )
+    parser.add_argument("--training-poll-interval", type=float, default=5.0, help="训练任务列表轮询间隔秒数 (默认: 5)")
+    parser.add_argument(
+        "--training-snapshot-max-age", type=float, default=10.0, help="训练任务快照最大有效期秒数 (默认: 10.0)"
+    )
+    parser.add_argument("--submit-concurrency", type=int, default=8, help="训练任务并发提交数 (默认: 8)")
+    parser.add_argument("--submit-rate", type=float, default=20.0, help="训练任务每秒最大提交数，<=0 不限流 (默认: 20)")
+    parser.add_argument(
+        "--submit-max-retries",
+        type=int,
+        default=3,
+        help="训练任务提交请求未发出（连接失败或熔断）时的最大重试次数，已发出的请求失败后不重试 (默认: 3)",
+    )
+    parser.add_argument("--submit-retry-backoff", type=float, default=1.0, help="提交重试退避基准秒数 (默认: 1.0)")
+    parser.add_argument(
+        "--benchmark-db-path",
+        type=str,
+        default="data/benchmark_history.db",
+        help="基准测试历史数据库路径 (默认: data/benchmark_history.db)",
+    )
+    parser.add_argument(
+        "--load-test-max-inflight",
+        type=int,
+        default=4096,
+        help="内置负载生成器同时进行的最大请求数，超出时新到达的请求记为丢弃 (默认: 4096)",
+    )
+    parser.add_argument(
+        "--load-test-chat-url",
+        type=str,
+        default=None,
+        help="负载生成器 chat 目标的 master 地址，如 http://10.0.0.2:8000 (默认: 本机 --port)",
+    )
+    parser.add_argument(
+        "--node-suspect-timeout", type=float, default=15.0, help="节点无心跳多少秒后标记为可疑 (默认: 15)"
+    )
+    parser.add_argument(
+        "--node-dead-timeout", type=float, default=60.0, help="节点无心跳多少秒后标记为离线并不再计入资源 (默认: 60)"
+    )
+    parser.add_argument("--node-evict-timeout", type=float, default=600.0, help="节点无心跳多少秒后移除 (默认: 600)")
+    parser.add_argument(
+        "--node-stats-cache-ttl",
+        type=float,
+        default=1.0,
+        help="节点列表响应缓存的最长秒数，节点加入、移除或存活状态变化时立即失效，<=0 时每次心跳都失效 (默认: 1)",
+    )
+    parser.add_argument(
+        "--placement-strategy",
+        type=PlacementStrategy,
+        choices=list(PlacementStrategy),
+        default=None,
+        help="训练任务放置策略，需要安装 numpy，不指定则不生成放置建议 (可选: best_fit, spread, region_affinity)",
+    )
+    parser.add_argument(
+        "--record-trace",
+        type=str,
+        default=None,
+        help="将心跳、任务提交及上游响应追加记录到该二进制轨迹文件，用于回放和仿真 (默认: 不记录)",
+    )
+    parser.add_argument(
+        "--dashboard-coalesce-window", type=float, default=0.5, help="看板推送事件合并窗口秒数 (默认: 0.5)"
+    )
+    parser.add_argument(
+        "--dashboard-poll-interval",
+        type=float,
+        default=2.0,
+        help="有看板订阅者时拉取推理实例和基准测试进度的间隔秒数 (默认: 2)",
+    )
 
     args = parser.parse_args()
     return ServerConfig(
@@ -28,6 +206,38 @@ def parse_args() -> ServerConfig:
         training_port=args.training_port,
         inference_host=args.inference_host,
         inference_port=args.inference_port,
+        inference_instances=args.inference_instances,
+        routing_policy=args.routing_policy,
+        router_refresh_interval=args.router_refresh_interval,
+        chat_max_batch_size=args.chat_max_batch_size,
+        chat_batch_window=args.chat_batch_window,
+        chat_cache_size=args.chat_cache_size,
+        chat_cache_ttl=args.chat_cache_ttl,
+        chat_cache_spill_path=args.chat_cache_spill_path,
+        chat_cache_nondeterministic=args.chat_cache_nondeterministic,
+        upstream_pool_size=args.upstream_pool_size,
+        upstream_timeout=args.upstream_timeout,
+        upstream_failure_threshold=args.upstream_failure_threshold,
+        upstream_reset_timeout=args.upstream_reset_timeout,
+        upstream_max_retries=args.upstream_max_retries,
+        upstream_retry_ratio=args.upstream_retry_ratio,
+        training_poll_interval=args.training_poll_interval,
+        training_snapshot_max_age=args.training_snapshot_max_age,
+        submit_concurrency=args.submit_concurrency,
+        submit_rate=args.submit_rate,
+        submit_max_retries=args.submit_max_retries,
+        submit_retry_backoff=args.submit_retry_backoff,
+        benchmark_db_path=args.benchmark_db_path,
+        load_test_max_inflight=args.load_test_max_inflight,
+        load_test_chat_url=args.load_test_chat_url,
+        node_suspect_timeout=args.node_suspect_timeout,
+        node_dead_timeout=args.node_dead_timeout,
+        node_evict_timeout=args.node_evict_timeout,
+        node_stats_cache_ttl=args.node_stats_cache_ttl,
+        placement_strategy=args.placement_strategy,
+        record_trace=args.record_trace,
+        dashboard_coalesce_window=args.dashboard_coalesce_window,
+        dashboard_poll_interval=args.dashboard_poll_interval,
     )
 
 
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Optional
+
+from cedschedulerapp.master.metrics import CHAT_BATCH_SIZE
+from cedschedulerapp.utils.logger import setup_logger
+
+# 到达间隔的指数移动平均系数
+ARRIVAL_EWMA_ALPHA = 0.2
+IDLE_INTERVAL_CAP = 10
+
+
+class MicroBatcher:
+    """
+    生成请求微批处理
+
+    第一个请求到达时开启窗口，窗口结束或凑满 max_batch_size 时整批发送一次上游请求，
+    再按顺序把结果分给各个调用方。窗口长度随到达速率自适应：按平均到达间隔估计
+    凑满一批所需的时间，不超过 max_window；到达间隔超过 max_window 时等待也等不到
+    下一个请求，窗口为 0，请求直接发送。
+    """
+
+    def __init__(
+        self,
+        submit_batch: Callable[[list[str]], Awaitable[list[str]]],
+        max_batch_size: int,
+        max_window: float,
+    ):
+        self.submit_batch = submit_batch
+        self.max_batch_size = max_batch_size
+        self.max_window = max_window
+        self.pending: list[tuple[str, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.inflight: set[asyncio.Task] = set()
+        self.last_arrival: Optional[float] = None
+        self.mean_interval = max_window
+        self.batch_size = CHAT_BATCH_SIZE.labels()
+        self.logger = setup_logger(__name__)
+
+    @property
+    def window(self) -> float:
+        if self.mean_interval >= self.max_window:
+            return 0.0
+        return min(self.max_window, self.mean_interval * (self.max_batch_size - 1))
+
+    def _record_arrival(self):
+        now = time.monotonic()
+        if self.last_arrival is not None:
+            # 限制空闲后的单个长间隔，突发到来时很快恢复合批
+            interval = min(now - self.last_arrival, IDLE_INTERVAL_CAP * self.max_window)
+            self.mean_interval += ARRIVAL_EWMA_ALPHA * (interval - self.mean_interval)
+        self.last_arrival = now
+
+    async def submit(self, prompt: str) -> str:
+        self._record_arrival()
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((prompt, future))
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif self.flush_handle is None:
+            window = self.window
+            if window <= 0:
+                self.flush()
+            else:
+                self.flush_handle = asyncio.get_running_loop().call_later(window, self.flush)
+        # 调用方被取消时 future 随之取消，发送时跳过
+        return await future
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch = [(prompt, future) for prompt, future in self.pending if not future.done()]
+        self.pending = []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self.inflight.add(task)
+        task.add_done_callback(self.inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]]):
+        try:
+            self.batch_size.observe(len(batch))
+            results = await self.submit_batch([prompt for prompt, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batched generate returned {len(results)} results for {len(batch)} prompts")
+        except Exception as e:
+            self.logger.error(f"Batched generate of {len(batch)} prompts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        for _, future in self.pending:
+            future.cancel()
+        self.pending = []
+        for task in list(self.inflight):
+            task.cancel()
+        await asyncio.gather(*self.inflight, return_exceptions=True)
@@ -0,0 +1,204 @@
+import math
+from array import array
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from cedschedulerapp.master.client.benchmark_parser import BenchmarkResult
+from cedschedulerapp.master.schemas import BenchmarkHistory
+from cedschedulerapp.master.schemas import BenchmarkResultResponse
+from cedschedulerapp.master.schemas import BenchmarkSummaryResponse
+from cedschedulerapp.master.schemas import HistogramSummary
+from cedschedulerapp.master.schemas import MetricSummary
+
+INT_COLUMNS = ("prompt_lens", "response_lens")
+FLOAT_COLUMNS = ("end_to_end_latencies", "prefill_latencies")
+PERCENTILES = {"p50": 50.0, "p90": 90.0, "p99": 99.0, "p999": 99.9}
+
+
+def _as_typed(values, typecode: str) -> array:
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+@dataclass
+class BenchmarkColumns:
+    """按列存储的基准测试样本，整数列为 int64，浮点列为 float64"""
+
+    prompt_lens: array = field(default_factory=lambda: array("q"))
+    response_lens: array = field(default_factory=lambda: array("q"))
+    end_to_end_latencies: array = field(default_factory=lambda: array("d"))
+    prefill_latencies: array = field(default_factory=lambda: array("d"))
+
+    def __post_init__(self):
+        for name in INT_COLUMNS:
+            setattr(self, name, _as_typed(getattr(self, name), "q"))
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, _as_typed(getattr(self, name), "d"))
+
+    def __len__(self) -> int:
+        return len(self.end_to_end_latencies)
+
+    @classmethod
+    def from_result(cls, result: BenchmarkResult) -> "BenchmarkColumns":
+        return cls(
+            prompt_lens=result.prompt_lens,
+            response_lens=result.response_lens,
+            end_to_end_latencies=result.e2e_latencies,
+            prefill_latencies=result.decode_token_latencies,
+        )
+
+    @classmethod
+    def from_bytes(cls, columns: dict[str, bytes]) -> "BenchmarkColumns":
+        arrays = {}
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            arrays[name] = array("q" if name in INT_COLUMNS else "d")
+            arrays[name].frombytes(columns[name])
+        return cls(**arrays)
+
+    def to_bytes(self) -> dict[str, bytes]:
+        return {name: getattr(self, name).tobytes() for name in INT_COLUMNS + FLOAT_COLUMNS}
+
+    def to_response(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        max_samples: Optional[int] = None,
+    ) -> BenchmarkResultResponse:
+        """
+        导出原始样本
+
+        Args:
+            offset: 起始样本下标
+            limit: 最多返回的样本数（分页）
+            max_samples: 按固定步长降采样后的最大样本数
+
+        Returns:
+            BenchmarkResultResponse: 原始样本
+        """
+        end = len(self) if limit is None else min(len(self), offset + limit)
+        step = 1
+        if max_samples is not None and max_samples > 0:
+            step = max(1, math.ceil((end - offset) / max_samples))
+        window = slice(offset, end, step)
+        return BenchmarkResultResponse(
+            prompt_lens=self.prompt_lens[window].tolist(),
+            response_lens=self.response_lens[window].tolist(),
+            end_to_end_latencies=self.end_to_end_latencies[window].tolist(),
+            prefill_latencies=self.prefill_latencies[window].tolist(),
+        )
+
+
+@dataclass
+class BenchmarkRecord:
+    benchmark_id: str
+    timestamp: float
+    qps: float
+    num_prompts: int
+    is_complete: bool = False
+    columns: BenchmarkColumns = field(default_factory=BenchmarkColumns)
+    # 已完成基准测试的统计摘要缓存，按直方图分桶数索引
+    summaries: dict[int, BenchmarkSummaryResponse] = field(default_factory=dict)
+
+    def to_history(self, max_samples: Optional[int] = None) -> BenchmarkHistory:
+        return BenchmarkHistory(
+            benchmark_id=self.benchmark_id,
+            timestamp=self.timestamp,
+            qps=self.qps,
+            num_prompts=self.num_prompts,
+            is_complete=self.is_complete,
+            results=self.columns.to_response(max_samples=max_samples),
+        )
+
+    def summary(self, bins: int) -> BenchmarkSummaryResponse:
+        cached = self.summaries.get(bins)
+        if cached is not None:
+            return cached
+        summary = summarize(self.benchmark_id, self.columns, self.qps, bins)
+        summary.is_complete = self.is_complete
+        if self.is_complete:
+            self.summaries[bins] = summary
+        return summary
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    # 与 numpy 默认的线性插值方式一致
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100.0
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _histogram(sorted_values: list, bins: int) -> HistogramSummary:
+    if not sorted_values:
+        return HistogramSummary(bin_edges=[], counts=[])
+    low, high = float(sorted_values[0]), float(sorted_values[-1])
+    if high == low:
+        return HistogramSummary(bin_edges=[low, high], counts=[len(sorted_values)])
+    width = (high - low) / bins
+    counts = [0] * bins
+    for value in sorted_values:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return HistogramSummary(
+        bin_edges=[low + width * i for i in range(bins + 1)], counts=counts
+    )
+
+
+def summarize_metric(values: array, bins: int) -> MetricSummary:
+    sorted_values = sorted(values)
+    count = len(sorted_values)
+    return MetricSummary(
+        count=count,
+        mean=math.fsum(sorted_values) / count if count else 0.0,
+        min=float(sorted_values[0]) if count else 0.0,
+        max=float(sorted_values[-1]) if count else 0.0,
+        **{name: _percentile(sorted_values, q) for name, q in PERCENTILES.items()},
+        histogram=_histogram(sorted_values, bins),
+    )
+
+
+def estimate_duration(columns: BenchmarkColumns, qps: float) -> float:
+    """
+    估算基准测试的墙钟时长
+
+    日志中没有每个请求的发送时间，按开环到达估算：
+    最后一个请求在 (n - 1) / qps 秒时发出，再加上最长的端到端延迟。
+    """
+    if not len(columns):
+        return 0.0
+    arrival_span = (len(columns) - 1) / qps if 0 < qps < math.inf else 0.0
+    return arrival_span + max(columns.end_to_end_latencies)
+
+
+def output_token_rates(columns: BenchmarkColumns) -> array:
+    return array(
+        "d",
+        (
+            tokens / latency if latency > 0 else 0.0
+            for tokens, latency in zip(columns.response_lens, columns.end_to_end_latencies)
+        ),
+    )
+
+
+def summarize(
+    benchmark_id: str, columns: BenchmarkColumns, qps: float, bins: int
+) -> BenchmarkSummaryResponse:
+    duration = estimate_duration(columns, qps)
+    output_tokens = sum(columns.response_lens)
+    total_tokens = output_tokens + sum(columns.prompt_lens)
+    return BenchmarkSummaryResponse(
+        benchmark_id=benchmark_id,
+        num_requests=len(columns),
+        duration=duration,
+        request_throughput=len(columns) / duration if duration else 0.0,
+        output_token_throughput=output_tokens / duration if duration else 0.0,
+        total_token_throughput=total_tokens / duration if duration else 0.0,
+        prompt_lens=summarize_metric(columns.prompt_lens, bins),
+        response_lens=summarize_metric(columns.response_lens, bins),
+        end_to_end_latencies=summarize_metric(columns.end_to_end_latencies, bins),
+        prefill_latencies=summarize_metric(columns.prefill_latencies, bins),
+        output_token_rates=summarize_metric(output_token_rates(columns), bins),
+    )
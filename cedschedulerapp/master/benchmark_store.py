@@ -0,0 +1,69 @@
+import asyncio
+
+from cedschedulerapp.master.benchmark_stats import BenchmarkColumns
+from cedschedulerapp.master.benchmark_stats import BenchmarkRecord
+from cedschedulerapp.master.benchmark_stats import FLOAT_COLUMNS
+from cedschedulerapp.master.benchmark_stats import INT_COLUMNS
+from cedschedulerapp.master.sqlite_store import SQLiteStore
+
+SAMPLE_COLUMNS = INT_COLUMNS + FLOAT_COLUMNS
+
+
+class BenchmarkStore(SQLiteStore):
+    """
+    基准测试历史的本地持久化存储（SQLite）
+
+    已完成的结果只解析一次并落盘，master 重启后直接从本地加载。
+    样本按列以原始 int64/float64 字节存储。
+    """
+
+    schema = (
+        f"""
+        CREATE TABLE IF NOT EXISTS benchmark_results (
+            benchmark_id TEXT PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            qps REAL NOT NULL,
+            num_prompts INTEGER NOT NULL,
+            is_complete INTEGER NOT NULL DEFAULT 0,
+            {", ".join(f"{name} BLOB NOT NULL" for name in SAMPLE_COLUMNS)}
+        )
+        """,
+    )
+
+    def load_all(self) -> list[BenchmarkRecord]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT benchmark_id, timestamp, qps, num_prompts, is_complete, "
+                f"{', '.join(SAMPLE_COLUMNS)} FROM benchmark_results ORDER BY timestamp"
+            ).fetchall()
+        return [
+            BenchmarkRecord(
+                benchmark_id=benchmark_id,
+                timestamp=timestamp,
+                qps=qps,
+                num_prompts=num_prompts,
+                is_complete=bool(is_complete),
+                columns=BenchmarkColumns.from_bytes(dict(zip(SAMPLE_COLUMNS, columns))),
+            )
+            for benchmark_id, timestamp, qps, num_prompts, is_complete, *columns in rows
+        ]
+
+    def save_sync(self, record: BenchmarkRecord):
+        columns = record.columns.to_bytes()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO benchmark_results "
+                f"(benchmark_id, timestamp, qps, num_prompts, is_complete, {', '.join(SAMPLE_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, ?, {', '.join('?' for _ in SAMPLE_COLUMNS)})",
+                (
+                    record.benchmark_id,
+                    record.timestamp,
+                    record.qps,
+                    record.num_prompts,
+                    int(record.is_complete),
+                    *(columns[name] for name in SAMPLE_COLUMNS),
+                ),
+            )
+
+    async def save(self, record: BenchmarkRecord):
+        await asyncio.to_thread(self.save_sync, record)
@@ -1,41 +1,188 @@
+import asyncio
+import time
 from typing import Optional
 
-import requests
+import httpx
 
+from cedschedulerapp.master.client.resilience import backoff_delay
+from cedschedulerapp.master.client.resilience import CircuitBreaker
+from cedschedulerapp.master.client.resilience import RetryBudget
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.metrics import UPSTREAM_LATENCY
+from cedschedulerapp.master.metrics import UPSTREAM_REQUESTS
+from cedschedulerapp.master.metrics import UPSTREAM_RETRIES
+from cedschedulerapp.master.trace_recorder import TraceRecorder
 from cedschedulerapp.utils.logger import setup_logger
 
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2
+MAX_RETRY_BACKOFF = 2.0
+# 这些错误发生时请求还没有发送到上游，上游一定没有处理该请求
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class UpstreamNotSentError(Exception):
+    """请求没有发送到上游（连接失败或熔断），非幂等请求可以安全重试"""
+
 
 class ClientBase:
-    def __init__(self, ip: str, port: int):
+    # 各端点的读超时（秒），按最长前缀匹配，子类可覆盖
+    endpoint_timeouts: dict[str, float] = {}
+    # 启用轨迹记录时需要记录原始响应的端点
+    trace_endpoints: dict[str, TraceRecordType] = {}
+    # 可以安全重试的只读端点前缀，其余端点（提交、生成等）失败后不重试
+    retry_endpoints: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        endpoint_timeouts: Optional[dict[str, float]] = None,
+        trace_recorder: Optional[TraceRecorder] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_ratio: float = 0.2,
+    ):
         self.base_url = f"http://{ip}:{port}"
         self.logger = setup_logger(__name__)
+        self.timeout = timeout
+        self.endpoint_timeouts = {**self.endpoint_timeouts, **(endpoint_timeouts or {})}
+        self.trace_recorder = trace_recorder
+        self.circuit_breaker = CircuitBreaker(
+            type(self).__name__, failure_threshold=failure_threshold, reset_timeout=reset_timeout
+        )
+        self.retry_budget = RetryBudget(ratio=retry_ratio)
+        self.max_retries = max_retries
+        # 每个上游共享一个长连接池，避免每次请求重新建立 TCP 连接
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+            timeout=httpx.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT),
+        )
+
+    def _match_endpoint(self, endpoint: str) -> str:
+        """按最长前缀匹配 endpoint_timeouts 中的端点，未匹配时返回空字符串"""
+        matched = ""
+        for prefix in self.endpoint_timeouts:
+            if endpoint.startswith(prefix) and len(prefix) > len(matched):
+                matched = prefix
+        return matched
+
+    def _get_timeout(self, endpoint: str) -> httpx.Timeout:
+        timeout = self.endpoint_timeouts.get(self._match_endpoint(endpoint), self.timeout)
+        return httpx.Timeout(timeout, connect=min(timeout, DEFAULT_CONNECT_TIMEOUT))
+
+    def _endpoint_label(self, endpoint: str) -> str:
+        # 以匹配到的端点前缀作为标签，路径中的 ID 不会产生新的时间序列
+        return self._match_endpoint(endpoint) or "other"
+
+    def _observe(self, endpoint: str, start: float, outcome: str):
+        client = type(self).__name__
+        label = self._endpoint_label(endpoint)
+        UPSTREAM_LATENCY.labels(client, label).observe(time.perf_counter() - start)
+        UPSTREAM_REQUESTS.labels(client, label, outcome).inc()
+
+    def _record_trace(self, endpoint: str, response: httpx.Response):
+        if self.trace_recorder is None:
+            return
+        kind = self.trace_endpoints.get(endpoint)
+        if kind is not None:
+            self.trace_recorder.record(kind, response.content)
 
-    async def _make_request(self, endpoint: str, data: dict) -> Optional[dict]:
+    async def _make_request(self, endpoint: str, data: dict, raise_unsent: bool = False) -> Optional[dict]:
         """
         发送HTTP请求到服务器
 
         Args:
             endpoint: API端点路径
             data: 请求数据
+            raise_unsent: 请求没有发送到上游时抛出 UpstreamNotSentError 而不是返回 None
 
         Returns:
-            Optional[dict]: 响应数据，失败时返回None
+            Optional[dict]: 响应数据，失败或熔断时返回None
+
+        Raises:
+            UpstreamNotSentError: raise_unsent 为 True 且请求没有发送到上游
         """
-        url = f"{self.base_url}{endpoint}"
-        try:
-            response = requests.post(url, json=data)
-            response.raise_for_status()  # 如果HTTP请求返回了不成功的状态码，将抛出HTTPError异常
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Request to {url} failed: {e}")
-            return None
+        return await self._request("POST", endpoint, raise_unsent=raise_unsent, json=data)
 
     async def get_request(self, endpoint: str) -> Optional[dict]:
+        return await self._request("GET", endpoint)
+
+    async def _request(self, method: str, endpoint: str, raise_unsent: bool = False, **kwargs) -> Optional[dict]:
+        """
+        发送请求，经过熔断器，只读端点在上游故障时按重试预算退避重试
+
+        连接错误、超时和 5xx 视为上游故障，计入熔断器，其中读超时不重试；
+        4xx 和无法解析的响应说明上游仍然可用，直接失败不重试。
+        raise_unsent 为 True 时，熔断或连接失败等请求没有发出的情况抛出
+        UpstreamNotSentError，调用方可以据此区分"上游没有处理"和"结果未知"。
+        """
         url = f"{self.base_url}{endpoint}"
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Request to {url} failed: {e}")
-            return None
+        retryable = endpoint.startswith(self.retry_endpoints) if self.retry_endpoints else False
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.circuit_breaker.allow():
+                UPSTREAM_REQUESTS.labels(type(self).__name__, self._endpoint_label(endpoint), "rejected").inc()
+                self.logger.debug(f"Circuit open, skip request to {url}")
+                if raise_unsent:
+                    raise UpstreamNotSentError(f"Circuit open, skip request to {url}")
+                return None
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                response = await self.client.request(
+                    method, endpoint, timeout=self._get_timeout(endpoint), **kwargs
+                )
+                response.raise_for_status()  # 如果HTTP请求返回了不成功的状态码，将抛出HTTPStatusError异常
+                result = response.json()
+                self._record_trace(endpoint, response)
+                outcome = "ok"
+                self.circuit_breaker.record_success()
+                return result
+            except httpx.HTTPStatusError as e:
+                error, upstream_failure = e, e.response.status_code >= 500
+            except (httpx.HTTPError, ValueError) as e:
+                error, upstream_failure = e, isinstance(e, httpx.HTTPError)
+            finally:
+                self._observe(endpoint, start, outcome)
+
+            if upstream_failure:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            unsent = raise_unsent and isinstance(error, UNSENT_ERRORS)
+            # 读超时说明上游已经过载或卡住，重试只会放大延迟和负载
+            if isinstance(error, httpx.ReadTimeout) or not (
+                upstream_failure and retryable and attempt <= self.max_retries
+            ):
+                self.logger.error(f"Request to {url} failed: {error!r}")
+                if unsent:
+                    raise UpstreamNotSentError(f"Request to {url} failed: {error!r}") from error
+                return None
+            label = self._endpoint_label(endpoint)
+            if not self.retry_budget.withdraw():
+                UPSTREAM_RETRIES.labels(type(self).__name__, label, "budget_exhausted").inc()
+                self.logger.error(f"Request to {url} failed: {error!r}, retry budget exhausted")
+                if unsent:
+                    raise UpstreamNotSentError(f"Request to {url} failed: {error!r}") from error
+                return None
+            UPSTREAM_RETRIES.labels(type(self).__name__, label, "retried").inc()
+            delay = backoff_delay(attempt, RETRY_BACKOFF, MAX_RETRY_BACKOFF)
+            self.logger.warning(f"Request to {url} failed: {error!r}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        """关闭连接池"""
+        await self.client.aclose()
@@ -1,6 +1,14 @@
+import json
 import re
+import time
+from array import array
 from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
 from typing import Optional
+from typing import Union
+
+from cedschedulerapp.master.metrics import BENCHMARK_PARSE_DURATION
 
 
 @dataclass
@@ -12,108 +20,165 @@ class BenchmarkProgress:
 
 @dataclass
 class BenchmarkResult:
-    request_lens: list[int]
+    request_lens: array
     request_ids: list[str]
-    total_tokens: list[int]
-    prompt_lens: list[int]
-    response_lens: list[int]
-    e2e_latencies: list[float]
-    per_token_latencies: list[float]
-    inference_latencies: list[float]
-    waiting_latencies: list[float]
-    decode_token_latencies: list[float]
+    total_tokens: array
+    prompt_lens: array
+    response_lens: array
+    e2e_latencies: array
+    per_token_latencies: array
+    inference_latencies: array
+    waiting_latencies: array
+    decode_token_latencies: array
+
+
+# Required array names
+REQUIRED_ARRAYS = [
+    "request_lens",
+    "request_ids",
+    "total_tokens",
+    "prompt_lens",
+    "response_lens",
+    "e2e_latencies",
+    "per_token_latencies",
+    "inference_latencies",
+    "waiting_latencies",
+    "decode_token_latencies",
+]
+
+
+@dataclass
+class _ParseState:
+    # Offset just past the last complete line that has been consumed
+    offset: int = 0
+    total_prompts: Optional[int] = None
+    current_progress: Optional[int] = None
+    arrays: dict[str, Union[array, list[str]]] = field(default_factory=dict)
 
 
 class BenchmarkLogParser:
+    """Incremental parser for benchmark logs.
+
+    State is kept per ``benchmark_id`` so that repeated polls of a growing log
+    only scan the text appended since the previous call.
+    """
+
     def __init__(self):
+        self.progress_marker = "num_finised_requests: "
         self.progress_pattern = re.compile(r"num_finised_requests: (\d+)")
         self.total_prompts_pattern = re.compile(r"num_prompts=(\d+)")
         self.array_pattern = re.compile(r"all_(\w+)=\[(.*?)\]")
+        self.states: dict[str, _ParseState] = {}
+
+    def forget(self, benchmark_id: str):
+        """Drop the incremental state kept for a benchmark."""
+        self.states.pop(benchmark_id, None)
+
+    def _decode_array(self, name: str, values_str: str) -> Union[array, list[str]]:
+        if name == "request_ids":
+            return [v.strip("'") for v in values_str.split(", ")] if values_str else []
+        typecode = "d" if any(c in values_str for c in ".eEn") else "q"
+        try:
+            # Decode the whole array in one C-level call, then pack it into a typed buffer
+            return array(typecode, json.loads(f"[{values_str}]"))
+        except ValueError:
+            # e.g. Python's repr of nan/inf, which is not valid JSON
+            return array(typecode, map(float, values_str.split(", ")))
+
+    def _scan(self, state: _ParseState, log_text: str, start: int, end: int):
+        if state.total_prompts is None:
+            total_match = self.total_prompts_pattern.search(log_text, start, end)
+            if total_match:
+                state.total_prompts = int(total_match.group(1))
+
+        # Only the last progress line of the chunk matters; rfind avoids a match object per line
+        index = log_text.rfind(self.progress_marker, start, end)
+        if index >= 0:
+            progress_match = self.progress_pattern.match(log_text, index, end)
+            if progress_match:
+                progress = int(progress_match.group(1))
+                if state.current_progress is None or progress > state.current_progress:
+                    state.current_progress = progress
+
+        for match in self.array_pattern.finditer(log_text, start, end):
+            name, values_str = match.groups()
+            state.arrays[name] = self._decode_array(name, values_str)
+
+    def feed(self, log_text: Union[str, bytes], benchmark_id: Optional[str] = None) -> _ParseState:
+        """Consume the part of ``log_text`` not seen yet for ``benchmark_id``.
+
+        Args:
+            log_text: The full benchmark log text (or its latest snapshot)
+            benchmark_id: Key for the incremental state; a fresh state is used if None
 
-    def parse_progress(self, log_text: str) -> Optional[BenchmarkProgress]:
+        Returns:
+            The accumulated parse state
+        """
+        start = time.perf_counter()
+        if isinstance(log_text, bytes):
+            log_text = log_text.decode("utf-8", errors="replace")
+        state = self.states.get(benchmark_id) if benchmark_id is not None else None
+        if state is None or len(log_text) < state.offset:
+            # First poll, or the log was truncated/rotated upstream
+            state = _ParseState()
+            if benchmark_id is not None:
+                self.states[benchmark_id] = state
+
+        # Only commit complete lines to the stored state
+        end = log_text.rfind("\n", state.offset) + 1
+        if end > state.offset:
+            self._scan(state, log_text, state.offset, end)
+            state.offset = end
+        result = state
+        if state.offset < len(log_text):
+            # A trailing partial line may still be being written (e.g. "num_prompts=10" of 1000),
+            # so it is scanned into a throwaway copy and re-read from scratch on the next call
+            result = replace(state, arrays=dict(state.arrays))
+            self._scan(result, log_text, state.offset, len(log_text))
+        BENCHMARK_PARSE_DURATION.labels().observe(time.perf_counter() - start)
+        return result
+
+    def parse_progress(
+        self, log_text: Union[str, bytes], benchmark_id: Optional[str] = None
+    ) -> Optional[BenchmarkProgress]:
         """Parse the progress from benchmark log text.
 
         Args:
             log_text: The benchmark log text
+            benchmark_id: If given, only the text appended since the last call is scanned
 
         Returns:
             BenchmarkProgress if progress information is found, None otherwise
         """
-        # Find total prompts
-        total_match = self.total_prompts_pattern.search(log_text)
-        if not total_match:
+        state = self.feed(log_text, benchmark_id)
+        if state.total_prompts is None or state.current_progress is None:
             return None
-        total_prompts = int(total_match.group(1))
-
-        # Find current progress
-        progress_matches = self.progress_pattern.findall(log_text)
-        if not progress_matches:
-            return None
-
-        current_progress = int(progress_matches[-1])
-        is_complete = current_progress >= total_prompts
 
         return BenchmarkProgress(
-            current_progress=current_progress,
-            total_prompts=total_prompts,
-            is_complete=is_complete,
+            current_progress=state.current_progress,
+            total_prompts=state.total_prompts,
+            is_complete=state.current_progress >= state.total_prompts,
         )
 
-    def parse_result(self, log_text: str) -> Optional[BenchmarkResult]:
+    def parse_result(
+        self, log_text: Union[str, bytes], benchmark_id: Optional[str] = None
+    ) -> Optional[BenchmarkResult]:
         """Parse the benchmark results from log text.
 
         Args:
             log_text: The benchmark log text
+            benchmark_id: If given, only the text appended since the last call is scanned
 
         Returns:
             BenchmarkResult if all required arrays are found, None otherwise
         """
-        # Required array names
-        required_arrays = [
-            "request_lens",
-            "request_ids",
-            "total_tokens",
-            "prompt_lens",
-            "response_lens",
-            "e2e_latencies",
-            "per_token_latencies",
-            "inference_latencies",
-            "waiting_latencies",
-            "decode_token_latencies",
-        ]
-
-        # Parse all arrays
-        arrays = {}
-        for match in self.array_pattern.finditer(log_text):
-            name = match.group(1)
-            values_str = match.group(2)
-
-            # Parse values based on type
-            if name == "request_ids":
-                values = [v.strip("'") for v in values_str.split(", ")]
-            else:
-                values = [
-                    float(v) if "." in v else int(v) for v in values_str.split(", ")
-                ]
-
-            arrays[name] = values
+        arrays = self.feed(log_text, benchmark_id).arrays
 
         # Check if all required arrays are present
-        if not all(name in arrays for name in required_arrays):
+        if not all(name in arrays for name in REQUIRED_ARRAYS):
             return None
 
-        return BenchmarkResult(
-            request_lens=arrays["request_lens"],
-            request_ids=arrays["request_ids"],
-            total_tokens=arrays["total_tokens"],
-            prompt_lens=arrays["prompt_lens"],
-            response_lens=arrays["response_lens"],
-            e2e_latencies=arrays["e2e_latencies"],
-            per_token_latencies=arrays["per_token_latencies"],
-            inference_latencies=arrays["inference_latencies"],
-            waiting_latencies=arrays["waiting_latencies"],
-            decode_token_latencies=arrays["decode_token_latencies"],
-        )
+        return BenchmarkResult(**{name: arrays[name] for name in REQUIRED_ARRAYS})
 
 
 global_benchmark_parser = BenchmarkLogParser()
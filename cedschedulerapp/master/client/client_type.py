@@ -1,16 +1,44 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from cedschedulerapp.master.enums import GPUPerformance
+from cedschedulerapp.master.enums import GPUType
+from cedschedulerapp.master.enums import PlacementStrategy
 from cedschedulerapp.master.enums import TaskInstDataStatus
 from cedschedulerapp.master.enums import TaskInstStatus
 from cedschedulerapp.master.enums import TaskStatus
 
 
+def scale_task_runtime(runtime: float) -> dict[str, int]:
+    """以 T4 上的运行时间为基准，按 GPUPerformance 换算各型号 GPU 上的运行时间"""
+    return {
+        GPUType.V100: int(runtime * GPUPerformance.T4_PERFORMANCE / GPUPerformance.V100_PERFORMANCE),
+        GPUType.P100: int(runtime * GPUPerformance.T4_PERFORMANCE / GPUPerformance.P100_PERFORMANCE),
+        GPUType.T4: int(runtime),
+    }
+
+
 class TaskInst(BaseModel):
     task_id: str
     inst_id: int
     inst_status: TaskStatus
 
 
+class InstancePlacement(BaseModel):
+    inst_id: int
+    node_id: str
+    gpu_type: str
+
+
+class PlacementHint(BaseModel):
+    # master 根据心跳数据给出的放置建议，训练服务可以参考或忽略
+    strategy: PlacementStrategy
+    instances: list[InstancePlacement]
+    # 各实例估计完成时间的最大值（秒）
+    estimated_runtime: float
+
+
 class TaskMeta(BaseModel):
     # task metadata
     task_id: str
@@ -22,6 +50,7 @@ class TaskMeta(BaseModel):
     task_status: TaskStatus
     task_start_time: float
     task_runtime: dict[str, int]
+    placement_hint: Optional[PlacementHint] = None
 
 
 class ScheduleInfo(BaseModel):
@@ -53,6 +82,7 @@ class TaskMetaModel(BaseModel):
     task_status: TaskStatus
     task_start_time: float
     task_runtime: dict[str, float]
+    placement_hint: Optional[PlacementHint] = None
 
     def to_task_meta(self) -> TaskMeta:
         return TaskMeta(
@@ -65,6 +95,7 @@ class TaskMetaModel(BaseModel):
             task_status=self.task_status,
             task_start_time=self.task_start_time,
             task_runtime=self.task_runtime,
+            placement_hint=self.placement_hint,
         )
 
     @classmethod
@@ -79,6 +110,7 @@ class TaskMetaModel(BaseModel):
             task_status=task_meta.task_status,
             task_start_time=task_meta.task_start_time,
             task_runtime=task_meta.task_runtime,
+            placement_hint=task_meta.placement_hint,
         )
 
 
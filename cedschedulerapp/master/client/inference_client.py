@@ -1,18 +1,48 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from typing import Optional
+
+import httpx
+
 from cedschedulerapp.master.client.base_client import ClientBase
 from cedschedulerapp.master.client.client_type import InferenceInstanceInfo
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.metrics import UPSTREAM_REQUESTS
 from cedschedulerapp.utils.logger import setup_logger
 
+SAMPLING_PARAMS = {"temperature": 0.7, "top_p": 0.9, "max_tokens": 512}
+# 流式生成时上游以 \0 分隔每个 JSON 片段
+STREAM_DELIMITER = b"\0"
+
+
+def resolve_sampling_params(overrides: Optional[dict] = None) -> dict:
+    """在默认采样参数上应用请求指定的参数"""
+    return {**SAMPLING_PARAMS, **(overrides or {})}
+
 
 class InferenceServerClient(ClientBase):
-    def __init__(self, ip: str, port: int):
-        super().__init__(ip, port)
+    endpoint_timeouts = {
+        "/instance_list": 5.0,
+        "/instance_log/": 10.0,
+        # 非流式生成需要等待完整的 512 token 输出
+        "/generate": 120.0,
+        "/benchmark": 30.0,
+        "/benchmark_result/": 30.0,
+    }
+    trace_endpoints = {"/instance_list": TraceRecordType.InstanceList}
+    retry_endpoints = ("/instance_list", "/instance_log/", "/benchmark_result/")
+
+    def __init__(self, ip: str, port: int, **kwargs):
+        super().__init__(ip, port, **kwargs)
         self.logger = setup_logger(__name__)
 
-    async def list_instances(self) -> list[InferenceInstanceInfo]:
-        """获取推理实例列表"""
+    async def list_instances(self) -> Optional[list[InferenceInstanceInfo]]:
+        """获取推理实例列表，请求失败时返回 None"""
         response = await self.get_request("/instance_list")
         if response is None:
-            return []
+            return None
 
         response = response.get("data", [])
         instances = []
@@ -37,15 +67,76 @@ class InferenceServerClient(ClientBase):
         response = response.get("data", "")
         return response
 
-    async def generate(self, prompt: str) -> str:
-        sampling_params = {"temperature": 0.7, "top_p": 0.9, "max_tokens": 512}
-        request_body = {"prompt": prompt, "stream": False, **sampling_params}
+    async def generate(self, prompt: str, sampling_params: Optional[dict] = None) -> str:
+        request_body = {"prompt": prompt, "stream": False, **resolve_sampling_params(sampling_params)}
         response = await self._make_request("/generate", request_body)
 
         if response is None:
             return ""
         return response
 
+    async def generate_batch(self, prompts: list[str]) -> list[str]:
+        """一次请求生成多个 prompt，要求上游 /generate 接受 prompt 列表并按顺序返回 text 列表"""
+        request_body = {"prompt": prompts, "stream": False, **SAMPLING_PARAMS}
+        response = await self._make_request("/generate", request_body)
+        if response is None:
+            raise RuntimeError(f"Batched request to {self.base_url}/generate failed")
+        return response["text"]
+
+    async def generate_stream(self, prompt: str, sampling_params: Optional[dict] = None) -> AsyncIterator[str]:
+        """
+        流式生成，逐段返回新增的文本
+
+        上游每个片段是截至当前的完整文本，这里只返回相对上一个片段新增的部分。
+        调用方停止迭代或被取消时关闭上游连接，上游据此中止生成并释放资源。
+        请求失败或熔断时抛出 RuntimeError，已返回的片段不会重发。
+        """
+        endpoint = "/generate"
+        url = f"{self.base_url}{endpoint}"
+        if not self.circuit_breaker.allow():
+            UPSTREAM_REQUESTS.labels(type(self).__name__, self._endpoint_label(endpoint), "rejected").inc()
+            raise RuntimeError(f"Circuit open, skip request to {url}")
+        request_body = {"prompt": prompt, "stream": True, **resolve_sampling_params(sampling_params)}
+        start = time.perf_counter()
+        outcome = "error"
+        previous = ""
+        try:
+            async with self.client.stream(
+                "POST", endpoint, json=request_body, timeout=self._get_timeout(endpoint)
+            ) as response:
+                response.raise_for_status()
+                self.circuit_breaker.record_success()
+                buffer = b""
+                async for data in response.aiter_bytes():
+                    *frames, buffer = (buffer + data).split(STREAM_DELIMITER)
+                    for frame in frames:
+                        delta, previous = self._stream_delta(frame, previous)
+                        if delta:
+                            yield delta
+                delta, previous = self._stream_delta(buffer, previous)
+                if delta:
+                    yield delta
+            outcome = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            raise RuntimeError(f"Request to {url} failed: {e!r}") from e
+        except httpx.HTTPError as e:
+            self.circuit_breaker.record_failure()
+            raise RuntimeError(f"Request to {url} failed: {e!r}") from e
+        finally:
+            self._observe(endpoint, start, outcome)
+
+    @staticmethod
+    def _stream_delta(frame: bytes, previous: str) -> tuple[str, str]:
+        if not frame.strip():
+            return "", previous
+        text = json.loads(frame)["text"][0]
+        return (text[len(previous):] if text.startswith(previous) else text), text
+
     async def benchmark(self, num_prompts: int, qps: float) -> str:
         response = await self._make_request(
             "/benchmark", {"num_prompts": num_prompts, "qps": qps}
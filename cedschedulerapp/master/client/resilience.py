@@ -0,0 +1,98 @@
+import random
+import time
+
+from cedschedulerapp.master.enums import CircuitState
+from cedschedulerapp.master.metrics import CIRCUIT_TRANSITIONS
+from cedschedulerapp.utils.logger import setup_logger
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """指数退避 + 全抖动，attempt 从 1 开始"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """
+    上游熔断器
+
+    连续 failure_threshold 次上游故障（连接错误、超时、5xx）后打开，打开期间请求
+    直接失败不再等待超时；reset_timeout 秒后放行一个探测请求（半开），成功则关闭，
+    失败则重新打开。探测请求被取消没有结果时，再过 reset_timeout 秒会放行下一个。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.Closed
+        self.failures = 0
+        # 打开或最近一次放行探测请求的时间
+        self.opened_at = 0.0
+        self.logger = setup_logger(__name__)
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CircuitState.Closed
+
+    @property
+    def accepting(self) -> bool:
+        """allow() 此时是否会放行请求，不改变状态"""
+        return self.state == CircuitState.Closed or time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def _transition(self, state: CircuitState):
+        if state == self.state:
+            return
+        self.logger.warning(f"Circuit {self.name}: {self.state.value} -> {state.value}")
+        self.state = state
+        CIRCUIT_TRANSITIONS.labels(self.name, state.value).inc()
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.Closed:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        self.opened_at = now
+        self._transition(CircuitState.HalfOpen)
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._transition(CircuitState.Closed)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == CircuitState.HalfOpen or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(CircuitState.Open)
+
+
+class RetryBudget:
+    """
+    重试预算
+
+    每个请求存入 ratio 个令牌，每次重试消耗一个，另外每秒补充 min_per_second 个保底令牌。
+    上游整体故障时重试量被限制在正常请求量的 ratio 倍以内，不会因重试放大负载。
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated_at = time.monotonic()
+
+    def _refill(self, amount: float = 0.0):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.updated_at) * self.min_per_second + amount)
+        self.updated_at = now
+
+    def deposit(self):
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
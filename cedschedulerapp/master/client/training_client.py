@@ -2,12 +2,21 @@ from cedschedulerapp.master.client.base_client import ClientBase
 from cedschedulerapp.master.client.client_type import ManagerTaskSubmitModel
 from cedschedulerapp.master.client.client_type import TaskMeta
 from cedschedulerapp.master.client.client_type import TaskMetaModel
+from cedschedulerapp.master.enums import TraceRecordType
 from cedschedulerapp.utils.logger import setup_logger
 
 
 class TraingingServerClient(ClientBase):
-    def __init__(self, ip: str, port: int):
-        super().__init__(ip, port)
+    endpoint_timeouts = {
+        "/api/task/infos": 10.0,
+        "/api/task/submit": 10.0,
+        "/api/task/log/": 30.0,
+    }
+    trace_endpoints = {"/api/task/infos": TraceRecordType.TaskInfos}
+    retry_endpoints = ("/api/task/infos", "/api/task/log/")
+
+    def __init__(self, ip: str, port: int, **kwargs):
+        super().__init__(ip, port, **kwargs)
         self.logger = setup_logger(__name__)
 
     async def list_tasks(self):
@@ -17,10 +26,16 @@ class TraingingServerClient(ClientBase):
         return list(response.values())
 
     async def submit_task(self, task_meta: TaskMeta):
+        """
+        提交任务，失败时返回 None
+
+        Raises:
+            UpstreamNotSentError: 请求没有发送到训练服务，任务一定没有被创建
+        """
         data = ManagerTaskSubmitModel(
             task=TaskMetaModel.from_task_meta(task_meta)
-        ).model_dump()
-        return await self._make_request("/api/task/submit", data)
+        ).model_dump(exclude_none=True)
+        return await self._make_request("/api/task/submit", data, raise_unsent=True)
 
     async def get_training_task_log(self, task_id: str) -> dict[int, str]:
         response = await self._make_request(f"/api/task/log/{task_id}", {})
@@ -44,3 +44,77 @@ class TaskInstDataStatus(str, Enum):
     Pending = "pending"
     Running = "running"
     Finished = "finished"
+
+
+class SubmissionStatus(str, Enum):
+    Queued = "queued"
+    Submitting = "submitting"
+    Submitted = "submitted"
+    Failed = "failed"
+
+
+class NodeLiveness(str, Enum):
+    Alive = "alive"
+    Suspect = "suspect"
+    Dead = "dead"
+
+
+class PlacementStrategy(str, Enum):
+    BestFit = "best_fit"
+    Spread = "spread"
+    RegionAffinity = "region_affinity"
+
+
+class TraceRecordType(int, Enum):
+    Heartbeat = 1
+    HeartbeatDelta = 2
+    Submit = 3
+    TaskInfos = 4
+    InstanceList = 5
+
+
+class DashboardEventType(str, Enum):
+    Snapshot = "snapshot"
+    Resources = "resources"
+    Node = "node"
+    NodeRemoved = "node_removed"
+    Task = "task"
+    Instances = "instances"
+    BenchmarkProgress = "benchmark_progress"
+
+
+class ChatStreamEventType(str, Enum):
+    Token = "token"
+    Done = "done"
+    Error = "error"
+
+
+class CircuitState(str, Enum):
+    Closed = "closed"
+    Open = "open"
+    HalfOpen = "half_open"
+
+
+class RoutingPolicy(str, Enum):
+    # 等待队列（含本地已分发未反映到遥测的请求）最短的实例
+    LeastWaiting = "least_waiting"
+    # 估计剩余 KV cache 块最多的实例
+    FreeKV = "free_kv"
+    # 随机取两个实例，选负载较低的一个
+    PowerOfTwo = "power_of_two"
+
+
+class ArrivalPattern(str, Enum):
+    # 到达间隔服从指数分布
+    Poisson = "poisson"
+    # 固定间隔
+    Constant = "constant"
+    # 按给定的到达时间回放
+    Trace = "trace"
+
+
+class LoadTestTarget(str, Enum):
+    # 经过 master 的 /inference/chat/stream
+    Chat = "chat"
+    # 直接发送到推理实例的 /generate
+    Instances = "instances"
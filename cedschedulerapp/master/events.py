@@ -0,0 +1,136 @@
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+from typing import Optional
+
+from cedschedulerapp.master.enums import DashboardEventType
+from cedschedulerapp.master.trace_recorder import encode_payload
+
+# 长时间没有事件时发送 SSE 注释，防止代理断开空闲连接
+KEEPALIVE_INTERVAL = 15.0
+
+
+def encode_event(kind: Enum, data: Any) -> bytes:
+    return b"event: " + kind.value.encode() + b"\ndata: " + encode_payload(data, exclude_none=False) + b"\n\n"
+
+
+async def relay_until_disconnect(
+    source: AsyncIterator[bytes], receive: Callable[[], Awaitable[dict]]
+) -> AsyncIterator[bytes]:
+    """
+    转发 source 的输出，客户端断开时立即取消 source
+
+    source 在单独的任务中迭代，断开检测不依赖下一次写出：上游长时间没有输出
+    （排队或预填充）时客户端断开，也能立即中止上游请求。
+    """
+    queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+
+    async def _produce():
+        try:
+            async for chunk in source:
+                queue.put_nowait(chunk)
+        finally:
+            queue.put_nowait(None)
+
+    async def _watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        producer.cancel()
+
+    producer = asyncio.create_task(_produce())
+    watcher = asyncio.create_task(_watch_disconnect())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        producer.cancel()
+        watcher.cancel()
+        # 不能用 gather：本协程被取消时 gather 会再次取消 source，打断其关闭上游连接
+        await asyncio.wait({producer, watcher})
+
+
+class Subscriber:
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=max_pending)
+
+    def push(self, chunk: Optional[bytes]):
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            # 消费过慢的订阅者直接断开，重连后从新的快照开始
+            self.close()
+
+    def close(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class DashboardEventHub:
+    """
+    看板事件推送
+
+    各数据源通过 publish() 发布变化，同一对象在合并窗口内的多次变化只保留最后一次；
+    窗口结束时整批事件只序列化一次，再把同一份字节分发给所有订阅者。
+    没有订阅者时 publish() 直接返回。
+    """
+
+    def __init__(self, coalesce_window: float, max_pending: int = 256):
+        self.coalesce_window = coalesce_window
+        self.max_pending = max_pending
+        self.subscribers: set[Subscriber] = set()
+        self.pending: dict[tuple[DashboardEventType, str], Any] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self.subscribers)
+
+    def publish(self, kind: DashboardEventType, key: str, data: Any):
+        if not self.subscribers:
+            return
+        self.pending[(kind, key)] = data
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.coalesce_window, self.flush)
+
+    def flush(self):
+        self.flush_handle = None
+        if not self.pending:
+            return
+        chunk = b"".join(encode_event(kind, data) for (kind, _), data in self.pending.items())
+        self.pending.clear()
+        for subscriber in list(self.subscribers):
+            subscriber.push(chunk)
+
+    async def stream(self, snapshot: Callable[[], Awaitable[Any]]) -> AsyncIterator[bytes]:
+        """先发送一次完整快照，之后只发送变化事件"""
+        subscriber = Subscriber(self.max_pending)
+        # 先订阅再生成快照，快照期间发生的变化不会丢失
+        self.subscribers.add(subscriber)
+        try:
+            yield encode_event(DashboardEventType.Snapshot, await snapshot())
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def close(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        self.pending.clear()
+        for subscriber in list(self.subscribers):
+            subscriber.close()
@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Optional
+
+from cedschedulerapp.master.metrics import GENERATION_CACHE_REQUESTS
+from cedschedulerapp.master.sqlite_store import SQLiteStore
+from cedschedulerapp.utils.logger import setup_logger
+
+
+def is_deterministic(sampling_params: dict) -> bool:
+    """temperature 为 0 时为贪心解码，同一 prompt 的输出固定"""
+    return sampling_params.get("temperature") == 0
+
+
+def cache_key(prompt: str, sampling_params: dict) -> str:
+    payload = json.dumps({"prompt": prompt, **sampling_params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SpillStore(SQLiteStore):
+    """内存中被淘汰的缓存条目落盘（SQLite），内存未命中时再从磁盘查找"""
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS generation_cache (
+            key TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL,
+            text TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS generation_cache_expires_at ON generation_cache (expires_at)",
+    )
+
+    def __init__(self, path: str, max_entries: int):
+        super().__init__(path)
+        self.max_entries = max_entries
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM generation_cache WHERE expires_at <= ?", (time.time(),))
+
+    def get_sync(self, key: str) -> Optional[tuple[float, str]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT expires_at, text FROM generation_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row
+
+    def put_sync(self, entries: list[tuple[str, float, str]]):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO generation_cache (key, expires_at, text) VALUES (?, ?, ?)", entries
+            )
+            # 超出容量时删除最早过期的条目
+            self.conn.execute(
+                "DELETE FROM generation_cache WHERE key IN ("
+                "SELECT key FROM generation_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[tuple[float, str]]:
+        return await asyncio.to_thread(self.get_sync, key)
+
+    async def put(self, entries: list[tuple[str, float, str]]):
+        await asyncio.to_thread(self.put_sync, entries)
+
+
+class GenerationCache:
+    """
+    生成结果缓存
+
+    以 prompt 和采样参数的哈希为键，内存中按 LRU 保留 max_entries 条，每条在 ttl 秒后过期。
+    配置 spill_path 时，被淘汰的条目写入磁盘，内存未命中时再查磁盘，关闭时内存中的条目也落盘。
+    相同请求并发到达时只发送一次上游请求，其余请求等待同一结果。
+    默认只缓存确定性的采样参数（temperature 为 0），非确定性采样需要显式开启。
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        spill_path: Optional[str] = None,
+        max_spill_entries: int = 100000,
+        cache_nondeterministic: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_nondeterministic = cache_nondeterministic
+        # key -> (过期时间, 生成结果)
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.inflight: dict[str, asyncio.Task] = {}
+        self.spill = SpillStore(spill_path, max_spill_entries) if spill_path else None
+        self.spill_tasks: set[asyncio.Task] = set()
+        self.outcomes = {
+            outcome: GENERATION_CACHE_REQUESTS.labels(outcome)
+            for outcome in ("hit", "disk_hit", "coalesced", "miss", "bypass")
+        }
+        self.logger = setup_logger(__name__)
+
+    def cacheable(self, sampling_params: dict) -> bool:
+        return self.cache_nondeterministic or is_deterministic(sampling_params)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: str, expires_at: float, text: str):
+        self.entries[key] = (expires_at, text)
+        self.entries.move_to_end(key)
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            evicted_key, (evicted_expires_at, evicted_text) = self.entries.popitem(last=False)
+            evicted.append((evicted_key, evicted_expires_at, evicted_text))
+        if evicted and self.spill is not None:
+            task = asyncio.create_task(self.spill.put(evicted))
+            self.spill_tasks.add(task)
+            task.add_done_callback(self.spill_tasks.discard)
+
+    async def _load(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        if self.spill is not None:
+            row = await self.spill.get(key)
+            if row is not None:
+                self.outcomes["disk_hit"].inc()
+                self._store(key, *row)
+                return row[1]
+        self.outcomes["miss"].inc()
+        text = await generate()
+        # 上游失败时返回空字符串，不缓存
+        if text:
+            self._store(key, time.time() + self.ttl, text)
+        return text
+
+    async def get_or_generate(
+        self, prompt: str, sampling_params: dict, generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        if not self.cacheable(sampling_params):
+            self.outcomes["bypass"].inc()
+            return await generate()
+        key = cache_key(prompt, sampling_params)
+        text = self._lookup(key)
+        if text is not None:
+            self.outcomes["hit"].inc()
+            return text
+        task = self.inflight.get(key)
+        if task is None:
+            # 上游请求在独立任务中执行，第一个调用方取消不影响其他等待者
+            task = self.inflight[key] = asyncio.create_task(self._load(key, generate))
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.outcomes["coalesced"].inc()
+        return await asyncio.shield(task)
+
+    async def close(self):
+        for task in list(self.inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self.inflight.values(), *self.spill_tasks, return_exceptions=True)
+        if self.spill is None:
+            return
+        now = time.time()
+        entries = [(key, expires_at, text) for key, (expires_at, text) in self.entries.items() if expires_at > now]
+        if entries:
+            await self.spill.put(entries)
+        self.spill.close()
@@ -0,0 +1,101 @@
+import heapq
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from cedschedulerapp.master.enums import NodeLiveness
+
+
+@dataclass
+class LivenessTransitions:
+    # (node_id, 旧状态, 新状态)
+    changed: list[tuple[str, NodeLiveness, NodeLiveness]] = field(default_factory=list)
+    # (node_id, 移除前的状态)
+    evicted: list[tuple[str, NodeLiveness]] = field(default_factory=list)
+
+
+class NodeLivenessTracker:
+    """
+    基于截止时间小顶堆的节点存活检测
+
+    每个节点在堆中只有一个有效条目（与 deadlines 中记录的截止时间一致），
+    存活节点的心跳只更新 last_seen（O(1)），条目到期时根据最新的 last_seen
+    重新计算状态并重新入堆，因此每次过期处理的代价为 O(log n)，不需要全量扫描。
+    """
+
+    def __init__(
+        self, suspect_timeout: float, dead_timeout: float, evict_timeout: float
+    ):
+        self.suspect_timeout = suspect_timeout
+        self.dead_timeout = max(dead_timeout, suspect_timeout)
+        self.evict_timeout = max(evict_timeout, self.dead_timeout)
+        # 单调时钟，用于计算超时
+        self.last_seen: dict[str, float] = {}
+        # 墙上时间，用于展示
+        self.last_seen_wall: dict[str, float] = {}
+        self.states: dict[str, NodeLiveness] = {}
+        self.heap: list[tuple[float, str]] = []
+        # 每个节点当前有效的截止时间，与之不一致的堆条目已过期
+        self.deadlines: dict[str, float] = {}
+
+    def touch(self, node_id: str, now: Optional[float] = None) -> Optional[NodeLiveness]:
+        """记录一次心跳，返回节点之前的状态（新节点返回 None）"""
+        now = time.monotonic() if now is None else now
+        previous = self.states.get(node_id)
+        self.last_seen[node_id] = now
+        self.last_seen_wall[node_id] = time.time()
+        self.states[node_id] = NodeLiveness.Alive
+        # 存活节点已有的条目不晚于新的 suspect 截止时间，到期时会按新的 last_seen 顺延；
+        # 新节点或从 suspect/dead 恢复的节点需要重新安排更早的截止时间
+        if previous != NodeLiveness.Alive or node_id not in self.deadlines:
+            self._schedule(node_id, now + self.suspect_timeout)
+        return previous
+
+    def _schedule(self, node_id: str, deadline: float):
+        self.deadlines[node_id] = deadline
+        heapq.heappush(self.heap, (deadline, node_id))
+
+    def get_state(self, node_id: str) -> NodeLiveness:
+        return self.states.get(node_id, NodeLiveness.Dead)
+
+    def get_last_seen(self, node_id: str) -> float:
+        return self.last_seen_wall.get(node_id, 0.0)
+
+    def remove(self, node_id: str):
+        # 堆中残留的条目在到期时被丢弃
+        self.deadlines.pop(node_id, None)
+        self.last_seen.pop(node_id, None)
+        self.last_seen_wall.pop(node_id, None)
+        self.states.pop(node_id, None)
+
+    def _evaluate(self, elapsed: float) -> tuple[Optional[NodeLiveness], Optional[float]]:
+        """根据距上次心跳的时间返回 (状态, 下一个阈值)，状态为 None 表示应当移除"""
+        if elapsed >= self.evict_timeout:
+            return None, None
+        if elapsed >= self.dead_timeout:
+            return NodeLiveness.Dead, self.evict_timeout
+        if elapsed >= self.suspect_timeout:
+            return NodeLiveness.Suspect, self.dead_timeout
+        return NodeLiveness.Alive, self.suspect_timeout
+
+    def expire(self, now: Optional[float] = None) -> LivenessTransitions:
+        """处理所有已到期的条目，返回状态变化的节点"""
+        now = time.monotonic() if now is None else now
+        transitions = LivenessTransitions()
+        while self.heap and self.heap[0][0] <= now:
+            deadline, node_id = heapq.heappop(self.heap)
+            if self.deadlines.get(node_id) != deadline:
+                continue
+            last_seen = self.last_seen[node_id]
+            state, next_threshold = self._evaluate(now - last_seen)
+            previous = self.states[node_id]
+            if state is None:
+                self.remove(node_id)
+                transitions.evicted.append((node_id, previous))
+                continue
+            if state != previous:
+                self.states[node_id] = state
+                transitions.changed.append((node_id, previous, state))
+            self._schedule(node_id, last_seen + next_threshold)
+        return transitions
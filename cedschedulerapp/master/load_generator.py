@@ -0,0 +1,440 @@
+import asyncio
+import json
+import random
+from array import array
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Optional
+from urllib.parse import urlsplit
+
+from cedschedulerapp.master.benchmark_stats import BenchmarkColumns
+from cedschedulerapp.master.client.inference_client import STREAM_DELIMITER
+from cedschedulerapp.master.enums import ArrivalPattern
+from cedschedulerapp.master.enums import ChatStreamEventType
+from cedschedulerapp.master.metrics import LOAD_TEST_DISPATCH_LAG
+from cedschedulerapp.master.metrics import LOAD_TEST_REQUESTS
+from cedschedulerapp.utils.logger import setup_logger
+
+# 单个请求的最长时间，与非流式生成的超时一致
+REQUEST_TIMEOUT = 120.0
+CONNECT_TIMEOUT = 3.0
+TOKEN_EVENT = b"event: " + ChatStreamEventType.Token.value.encode()
+ERROR_EVENT = b"event: " + ChatStreamEventType.Error.value.encode()
+EVENT_TAIL = max(len(TOKEN_EVENT), len(ERROR_EVENT)) - 1
+
+# 响应解析状态
+STATE_IDLE = 0
+STATE_HEAD = 1
+STATE_CHUNK_SIZE = 2
+STATE_CHUNK_DATA = 3
+STATE_CHUNK_END = 4
+STATE_TRAILER = 5
+STATE_BODY = 6
+STATE_UNTIL_EOF = 7
+
+# 发送一个 prompt，返回首个 token 到达的时刻（loop.time()，没有输出时为 None）和输出 token 数
+StreamRequest = Callable[[str], Awaitable[tuple[Optional[float], int]]]
+
+
+def arrival_schedule(
+    pattern: ArrivalPattern,
+    count: int,
+    qps: Optional[float] = None,
+    arrival_times: Optional[list[float]] = None,
+    seed: Optional[int] = None,
+) -> array:
+    """
+    生成各请求相对开始时间的到达时刻（秒）
+
+    Raises:
+        ValueError: 参数与到达模式不匹配
+    """
+    if pattern == ArrivalPattern.Trace:
+        if not arrival_times:
+            raise ValueError("trace pattern requires arrival_times")
+        times = sorted(arrival_times)
+        return array("d", (t - times[0] for t in times))
+    if qps is None or qps <= 0:
+        raise ValueError(f"{pattern.value} pattern requires qps > 0")
+    if count <= 0:
+        raise ValueError("num_prompts must be positive")
+    if pattern == ArrivalPattern.Constant:
+        return array("d", (i / qps for i in range(count)))
+    rng = random.Random(seed)
+    offsets = array("d", [0.0]) * count
+    elapsed = 0.0
+    for i in range(1, count):
+        elapsed += rng.expovariate(qps)
+        offsets[i] = elapsed
+    return offsets
+
+
+def parse_url(url: str) -> tuple[str, int, str]:
+    parts = urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        raise ValueError(f"unsupported load test url {url!r}, expected http://host:port/path")
+    return parts.hostname, parts.port or 80, parts.path or "/"
+
+
+class DelimiterCounter:
+    """推理实例的流式 /generate 每生成一步发送一个 \\0 结尾的片段，只按分隔符计数，不解析累积的文本"""
+
+    def feed(self, data: bytes) -> int:
+        return data.count(STREAM_DELIMITER)
+
+
+class ChatEventCounter:
+    """按 SSE token 事件计数，收到 error 事件时请求失败"""
+
+    def __init__(self):
+        self.tail = b""
+
+    def feed(self, data: bytes) -> int:
+        chunk = self.tail + data
+        if ERROR_EVENT in chunk:
+            raise RuntimeError("chat stream returned an error event")
+        # 事件标记可能被切分在两次到达的数据之间，保留末尾不足一个标记长度的字节
+        self.tail = chunk[-EVENT_TAIL:]
+        return chunk.count(TOKEN_EVENT)
+
+
+class StreamConnection(asyncio.Protocol):
+    """
+    一个 HTTP/1.1 长连接
+
+    响应在 data_received 中直接解析（chunked、Content-Length 或读到连接关闭），
+    响应体交给计数器统计 token 数并记录首个 token 的到达时刻，只在响应结束时唤醒
+    等待的请求，流式输出的每个片段不产生额外的任务调度。
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.transport: Optional[asyncio.Transport] = None
+        self.state = STATE_IDLE
+        self.buffer = bytearray()
+        self.waiter: Optional[asyncio.Future] = None
+        self.counter = None
+        # 当前 chunk 或 Content-Length 响应体剩余的字节数
+        self.remaining = 0
+        self.first_token: Optional[float] = None
+        self.tokens = 0
+        self.keep_alive = True
+        self.closed = False
+
+    @property
+    def reusable(self) -> bool:
+        return self.state == STATE_IDLE and self.keep_alive and not self.closed
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.closed = True
+        if self.state == STATE_UNTIL_EOF:
+            self._finish(None)
+        elif self.state != STATE_IDLE:
+            self._finish(ConnectionError(f"connection closed before response completed: {exc!r}"))
+
+    def request(self, payload: bytes, counter) -> asyncio.Future:
+        self.waiter = self.loop.create_future()
+        self.counter = counter
+        self.first_token = None
+        self.tokens = 0
+        self.state = STATE_HEAD
+        self.transport.write(payload)
+        return self.waiter
+
+    def close(self):
+        self.closed = True
+        if self.transport is not None:
+            self.transport.abort()
+
+    def data_received(self, data: bytes):
+        if self.state == STATE_IDLE:
+            # 没有进行中的请求时收到的数据无法对应到请求，连接不再复用
+            self.close()
+            return
+        self.buffer += data
+        try:
+            self._parse()
+        except Exception as e:
+            self._finish(e)
+
+    def _feed(self, data: bytes):
+        count = self.counter.feed(data)
+        if count:
+            if self.first_token is None:
+                self.first_token = self.loop.time()
+            self.tokens += count
+
+    def _finish(self, exc: Optional[Exception]):
+        self.state = STATE_IDLE
+        self.buffer.clear()
+        if exc is not None:
+            self.close()
+        if self.waiter is not None and not self.waiter.done():
+            if exc is None:
+                self.waiter.set_result((self.first_token, self.tokens))
+            else:
+                self.waiter.set_exception(exc)
+
+    def _parse_head(self, head: bytes):
+        status_line, *header_lines = head.split(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        if not 200 <= status < 300:
+            raise RuntimeError(f"upstream returned status {status}")
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip().lower()
+        self.keep_alive = headers.get(b"connection") != b"close"
+        if headers.get(b"transfer-encoding") == b"chunked":
+            self.state = STATE_CHUNK_SIZE
+        elif b"content-length" in headers:
+            self.remaining = int(headers[b"content-length"])
+            self.state = STATE_BODY
+        else:
+            self.keep_alive = False
+            self.state = STATE_UNTIL_EOF
+
+    def _read_line(self, terminator: bytes = b"\r\n") -> Optional[bytes]:
+        end = self.buffer.find(terminator)
+        if end < 0:
+            return None
+        line = bytes(self.buffer[:end])
+        del self.buffer[: end + len(terminator)]
+        return line
+
+    def _read_body(self):
+        piece = bytes(self.buffer[: self.remaining])
+        del self.buffer[: len(piece)]
+        self.remaining -= len(piece)
+        if piece:
+            self._feed(piece)
+
+    def _parse(self):
+        while self.state != STATE_IDLE:
+            state = self.state
+            if state == STATE_HEAD:
+                head = self._read_line(b"\r\n\r\n")
+                if head is None:
+                    return
+                self._parse_head(head)
+            elif state == STATE_CHUNK_SIZE:
+                line = self._read_line()
+                if line is None:
+                    return
+                self.remaining = int(line.split(b";", 1)[0], 16)
+                self.state = STATE_CHUNK_DATA if self.remaining else STATE_TRAILER
+            elif state == STATE_CHUNK_DATA:
+                self._read_body()
+                if self.remaining:
+                    return
+                self.state = STATE_CHUNK_END
+            elif state == STATE_CHUNK_END:
+                if self._read_line() is None:
+                    return
+                self.state = STATE_CHUNK_SIZE
+            elif state == STATE_TRAILER:
+                line = self._read_line()
+                if line is None:
+                    return
+                # trailer 以空行结束
+                if not line:
+                    self._finish(None)
+            elif state == STATE_BODY:
+                self._read_body()
+                if self.remaining:
+                    return
+                self._finish(None)
+            else:
+                self.remaining = len(self.buffer)
+                self._read_body()
+                return
+
+
+class StreamingHTTPClient:
+    """
+    负载生成器使用的最小 HTTP/1.1 客户端，只支持 POST JSON
+
+    httpx 的连接池每分配一个请求都要遍历池中所有连接，开环压测需要上千个并发连接时
+    每个请求的 CPU 开销随连接数增长，生成器自身先于被测服务成为瓶颈。这里每个地址只
+    维护一个空闲长连接栈，取用和归还都是 O(1)。每个请求的总时长不超过 REQUEST_TIMEOUT，
+    超时后直接断开连接。
+    """
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT, connect_timeout: float = CONNECT_TIMEOUT):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle: dict[tuple[str, int], list[StreamConnection]] = {}
+
+    async def _connect(self, host: str, port: int) -> StreamConnection:
+        idle = self.idle.get((host, port))
+        while idle:
+            connection = idle.pop()
+            # 服务端可能已关闭空闲连接
+            if connection.reusable:
+                return connection
+        _, connection = await asyncio.wait_for(
+            asyncio.get_running_loop().create_connection(StreamConnection, host, port), self.connect_timeout
+        )
+        return connection
+
+    async def post(self, host: str, port: int, path: str, body: bytes, counter) -> tuple[Optional[float], int]:
+        """
+        发送请求，等待响应结束
+
+        Returns:
+            首个 token 的到达时刻和 token 总数
+
+        Raises:
+            RuntimeError: 响应状态码不是 2xx 或计数器判定失败
+            ConnectionError: 连接断开
+        """
+        connection = await self._connect(host, port)
+        payload = (
+            b"POST %s HTTP/1.1\r\nHost: %s:%d\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+            % (path.encode(), host.encode(), port, len(body))
+            + body
+        )
+        waiter = connection.request(payload, counter)
+        deadline = asyncio.get_running_loop().call_later(self.timeout, connection.close)
+        try:
+            return await waiter
+        finally:
+            deadline.cancel()
+            if connection.reusable:
+                self.idle.setdefault((host, port), []).append(connection)
+            else:
+                # 超时或被取消时连接上还有未读完的响应
+                connection.close()
+
+    def close(self):
+        for connections in self.idle.values():
+            for connection in connections:
+                connection.close()
+        self.idle.clear()
+
+
+def chat_stream_request(client: StreamingHTTPClient, url: str, sampling_params: dict) -> StreamRequest:
+    """经过 master 的 /inference/chat/stream"""
+    host, port, path = parse_url(url)
+
+    async def _request(prompt: str) -> tuple[Optional[float], int]:
+        body = json.dumps({"message": prompt, **sampling_params}).encode()
+        return await client.post(host, port, path, body, ChatEventCounter())
+
+    return _request
+
+
+def instance_stream_request(client: StreamingHTTPClient, urls: list[str], sampling_params: dict) -> StreamRequest:
+    """直接发送到推理实例的流式 /generate，请求按轮询分配到各实例"""
+    endpoints = [parse_url(url) for url in urls]
+    counter = DelimiterCounter()
+    next_endpoint = 0
+
+    async def _request(prompt: str) -> tuple[Optional[float], int]:
+        nonlocal next_endpoint
+        host, port, path = endpoints[next_endpoint]
+        next_endpoint = (next_endpoint + 1) % len(endpoints)
+        body = json.dumps({"prompt": prompt, "stream": True, **sampling_params}).encode()
+        return await client.post(host, port, path, body, counter)
+
+    return _request
+
+
+class LoadGenerator:
+    """
+    开环负载生成器
+
+    请求按预先生成的到达时刻发出，不等待之前的请求返回；调度落后时立即补发所有
+    已到期的请求，到达时刻不会随之推迟。延迟从计划到达时刻开始计算，生成器自身的
+    调度延迟也计入结果，并单独记录到 dispatch lag 指标中，用于判断生成器是否成为瓶颈。
+    同时进行的请求达到 max_inflight 时新到达的请求直接丢弃，不改变到达过程。
+
+    每个成功的请求记录一行样本：prompt token 数、收到的输出 token 数、端到端延迟，
+    以及首个 token 的延迟（写入 prefill_latencies 列）。失败和丢弃的请求只计数。
+    """
+
+    def __init__(
+        self,
+        benchmark_id: str,
+        stream_request: StreamRequest,
+        prompts: list[str],
+        prompt_lens: list[int],
+        schedule: array,
+        max_inflight: int,
+    ):
+        self.benchmark_id = benchmark_id
+        self.stream_request = stream_request
+        self.prompts = prompts
+        self.prompt_lens = prompt_lens
+        self.schedule = schedule
+        self.max_inflight = max_inflight
+        self.columns = BenchmarkColumns()
+        self.failed = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+        self.inflight: set[asyncio.Task] = set()
+        self.outcomes = {outcome: LOAD_TEST_REQUESTS.labels(outcome) for outcome in ("ok", "error", "dropped")}
+        self.dispatch_lag = LOAD_TEST_DISPATCH_LAG.labels()
+        self.logger = setup_logger(__name__)
+
+    @property
+    def total(self) -> int:
+        return len(self.schedule)
+
+    @property
+    def completed(self) -> int:
+        return len(self.columns) + self.failed + self.dropped
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            for index, offset in enumerate(self.schedule):
+                scheduled = start + offset
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lag = loop.time() - scheduled
+                self.dispatch_lag.observe(lag)
+                if lag > self.max_lag:
+                    self.max_lag = lag
+                if len(self.inflight) >= self.max_inflight:
+                    self.dropped += 1
+                    self.outcomes["dropped"].inc()
+                    continue
+                task = loop.create_task(self._request(index, scheduled))
+                self.inflight.add(task)
+                task.add_done_callback(self.inflight.discard)
+            if self.inflight:
+                await asyncio.wait(self.inflight)
+        finally:
+            for task in self.inflight:
+                task.cancel()
+            if self.inflight:
+                await asyncio.wait(self.inflight)
+            self.logger.info(
+                f"Load test {self.benchmark_id}: {len(self.columns)} ok, {self.failed} failed, "
+                f"{self.dropped} dropped of {self.total}, max dispatch lag {self.max_lag * 1000:.1f} ms"
+            )
+
+    async def _request(self, index: int, scheduled: float):
+        loop = asyncio.get_running_loop()
+        prompt_index = index % len(self.prompts)
+        try:
+            first_token, tokens = await self.stream_request(self.prompts[prompt_index])
+        except Exception as e:
+            self.failed += 1
+            self.outcomes["error"].inc()
+            if self.failed == 1:
+                self.logger.warning(f"Load test {self.benchmark_id} request failed: {e!r}")
+            return
+        end = loop.time()
+        self.outcomes["ok"].inc()
+        columns = self.columns
+        columns.prompt_lens.append(self.prompt_lens[prompt_index])
+        columns.response_lens.append(tokens)
+        columns.end_to_end_latencies.append(end - scheduled)
+        columns.prefill_latencies.append((first_token or end) - scheduled)
@@ -2,238 +2,680 @@ import asyncio
 import random
 import string
 import time
-from asyncio import Lock
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
 from datetime import datetime
+from typing import Optional
+from typing import Union
 
+from cedschedulerapp.master.aggregates import ResourceAggregates
 from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.batcher import MicroBatcher
+from cedschedulerapp.master.benchmark_stats import BenchmarkColumns
+from cedschedulerapp.master.benchmark_stats import BenchmarkRecord
+from cedschedulerapp.master.benchmark_store import BenchmarkStore
 from cedschedulerapp.master.client.benchmark_parser import global_benchmark_parser
 from cedschedulerapp.master.client.client_type import InferenceInstanceInfo
 from cedschedulerapp.master.client.client_type import TaskMeta
 from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.client.inference_client import resolve_sampling_params
+from cedschedulerapp.master.client.inference_client import SAMPLING_PARAMS
 from cedschedulerapp.master.client.training_client import TraingingServerClient
-from cedschedulerapp.master.enums import GPUPerformance
-from cedschedulerapp.master.enums import GPUType
+from cedschedulerapp.master.enums import ArrivalPattern
+from cedschedulerapp.master.enums import DashboardEventType
+from cedschedulerapp.master.enums import LoadTestTarget
+from cedschedulerapp.master.enums import NodeLiveness
+from cedschedulerapp.master.enums import NodeType
 from cedschedulerapp.master.enums import RegionType
-from cedschedulerapp.master.enums import TaskStatus
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.events import DashboardEventHub
+from cedschedulerapp.master.generation_cache import GenerationCache
+from cedschedulerapp.master.liveness import NodeLivenessTracker
+from cedschedulerapp.master.load_generator import arrival_schedule
+from cedschedulerapp.master.load_generator import chat_stream_request
+from cedschedulerapp.master.load_generator import instance_stream_request
+from cedschedulerapp.master.load_generator import LoadGenerator
+from cedschedulerapp.master.load_generator import StreamingHTTPClient
+from cedschedulerapp.master.metrics import DAEMON_DURATION
+from cedschedulerapp.master.metrics import InstrumentedLock
+from cedschedulerapp.master.node_registry import NodeRegistry
+from cedschedulerapp.master.router import InferenceRouter
 from cedschedulerapp.master.schemas import BenchmarkHistory
+from cedschedulerapp.master.schemas import BenchmarkProgressEvent
 from cedschedulerapp.master.schemas import BenchmarkProgressResponse
 from cedschedulerapp.master.schemas import BenchmarkResultResponse
+from cedschedulerapp.master.schemas import BenchmarkSummaryResponse
+from cedschedulerapp.master.schemas import DashboardSnapshot
 from cedschedulerapp.master.schemas import InferenceService
+from cedschedulerapp.master.schemas import InstanceRouteState
+from cedschedulerapp.master.schemas import LoadTestRequest
+from cedschedulerapp.master.schemas import NodeHistoryResponse
+from cedschedulerapp.master.schemas import NodeRemovedEvent
 from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import NodeResourceStatsDelta
+from cedschedulerapp.master.schemas import NodeStatusInfo
 from cedschedulerapp.master.schemas import ResourceStats
 from cedschedulerapp.master.schemas import SubmitTaskRequest
 from cedschedulerapp.master.schemas import TaskLogResponse
+from cedschedulerapp.master.schemas import TaskStatusTransition
+from cedschedulerapp.master.schemas import TaskSubmissionState
 from cedschedulerapp.master.schemas import TaskWrapRuntimeInfo
 from cedschedulerapp.master.schemas import TrainingTask
 from cedschedulerapp.master.schemas import TrainingTaskDetail
+from cedschedulerapp.master.snapshot import VersionedSnapshot
+from cedschedulerapp.master.submission import SubmissionPipeline
+from cedschedulerapp.master.timeseries import NodeHistoryStore
+from cedschedulerapp.master.trace_recorder import TraceRecorder
 from cedschedulerapp.utils.logger import setup_logger
 
+NODE_SWEEP_INTERVAL = 1.0
+# 已有快照时路由最多等待上游刷新的秒数，超时先返回旧快照并标记为过期
+SNAPSHOT_STALE_WAIT = 1.0
+# 看板只跟踪最近这段时间内创建、尚未完成的基准测试进度
+DASHBOARD_BENCHMARK_WINDOW = 3600
+
+
+class NodeStatsResyncError(Exception):
+    """增量心跳无法应用，需要重新发送全量心跳"""
+
 
 class Manager:
     def __init__(self):
-        self.node_stats: dict[str, NodeResourceStats] = {}
-        self.node_stats_lock = Lock()
+        # 节点状态及按区域/类型/GPU 型号的二级索引
+        self.node_registry = NodeRegistry()
+        # 每个节点最近一次应用的心跳序号，用于校验增量心跳的连续性
+        self.node_stats_seq: dict[str, int] = {}
+        # 集群资源汇总，随心跳增量维护
+        self.resource_aggregates = ResourceAggregates()
+        self.node_liveness = NodeLivenessTracker(
+            suspect_timeout=server_config.node_suspect_timeout,
+            dead_timeout=server_config.node_dead_timeout,
+            evict_timeout=server_config.node_evict_timeout,
+        )
+        self.node_stats_lock = InstrumentedLock("node_stats")
+        # 节点状态每次变化时递增
+        self.node_stats_version = 0
+        # 节点加入、移除或存活状态变化时递增，与时间分桶一起作为节点列表响应的缓存版本
+        self.node_membership_version = 0
+        # 节点及 GPU 利用率历史，固定大小的环形缓冲
+        self.node_history = NodeHistoryStore()
+
+        # 可选的轨迹记录，用于离线回放和仿真
+        self.trace_recorder = TraceRecorder(server_config.record_trace) if server_config.record_trace else None
 
         self.training_tasks: list[TrainingTaskDetail] = []
+        # task_id -> (上一次轮询的原始 dict, 构建好的任务详情)
+        self.training_task_cache: dict[str, tuple[dict, TrainingTaskDetail]] = {}
         self.inference_services: list[InferenceInstanceInfo] = []
         self.training_client = TraingingServerClient(
-            ip=server_config.training_host, port=server_config.training_port
+            ip=server_config.training_host,
+            port=server_config.training_port,
+            pool_size=server_config.upstream_pool_size,
+            timeout=server_config.upstream_timeout,
+            trace_recorder=self.trace_recorder,
+            failure_threshold=server_config.upstream_failure_threshold,
+            reset_timeout=server_config.upstream_reset_timeout,
+            max_retries=server_config.upstream_max_retries,
+            retry_ratio=server_config.upstream_retry_ratio,
         )
         self.inference_client = InferenceServerClient(
-            ip=server_config.inference_host, port=server_config.inference_port
+            ip=server_config.inference_host,
+            port=server_config.inference_port,
+            pool_size=server_config.upstream_pool_size,
+            timeout=server_config.upstream_timeout,
+            trace_recorder=self.trace_recorder,
+            failure_threshold=server_config.upstream_failure_threshold,
+            reset_timeout=server_config.upstream_reset_timeout,
+            max_retries=server_config.upstream_max_retries,
+            retry_ratio=server_config.upstream_retry_ratio,
         )
+        # 生成请求按实例负载直接分发，未配置实例地址时都发往推理服务
+        self.inference_router = InferenceRouter(
+            server_config.inference_instances,
+            server_config.routing_policy,
+            lambda host, port: InferenceServerClient(
+                ip=host,
+                port=port,
+                pool_size=server_config.upstream_pool_size,
+                timeout=server_config.upstream_timeout,
+                failure_threshold=server_config.upstream_failure_threshold,
+                reset_timeout=server_config.upstream_reset_timeout,
+                max_retries=server_config.upstream_max_retries,
+                retry_ratio=server_config.upstream_retry_ratio,
+            ),
+        )
+        # 可选的生成请求合批，未启用时每个请求单独发送
+        self.chat_batcher = None
+        if server_config.chat_max_batch_size > 1:
+            self.chat_batcher = MicroBatcher(
+                self.generate_batch, server_config.chat_max_batch_size, server_config.chat_batch_window
+            )
+        # 可选的生成结果缓存，相同的 prompt 和采样参数直接返回缓存结果
+        self.generation_cache = None
+        if server_config.chat_cache_size > 0:
+            self.generation_cache = GenerationCache(
+                server_config.chat_cache_size,
+                server_config.chat_cache_ttl,
+                spill_path=server_config.chat_cache_spill_path,
+                cache_nondeterministic=server_config.chat_cache_nondeterministic,
+            )
         self.logger = setup_logger(__name__)
 
-        self.benchmark_history: list[BenchmarkHistory] = []
-        self.benchmark_history_lock = Lock()
+        # 在 start() 中打开，导入模块时不创建数据库文件
+        self.benchmark_store: Optional[BenchmarkStore] = None
+        self.benchmark_history: dict[str, BenchmarkRecord] = {}
+        self.benchmark_history_lock = InstrumentedLock("benchmark_history")
+        # 基准测试记录新增或刷新时递增
+        self.benchmark_history_version = 0
+        # 进行中的内置负载测试，结果直接写入基准测试历史中的记录
+        self.load_tests: dict[str, LoadGenerator] = {}
+        self.load_test_tasks: dict[str, asyncio.Task] = {}
+
+        # 训练任务列表快照，由后台轮询刷新，路由只读取快照
+        self.training_task_snapshot: VersionedSnapshot[list[TrainingTaskDetail]] = (
+            VersionedSnapshot(
+                self.fetch_training_task_list,
+                max_age=server_config.training_snapshot_max_age,
+            )
+        )
+        self.daemon_tasks: list[asyncio.Task] = []
+
+        # 看板推送，所有订阅者共享同一份数据源
+        self.dashboard_hub = DashboardEventHub(server_config.dashboard_coalesce_window)
+        self.benchmark_progress_cache: dict[str, BenchmarkProgressEvent] = {}
+
+        self.submission_pipeline = SubmissionPipeline(
+            self.training_client.submit_task,
+            concurrency=server_config.submit_concurrency,
+            rate=server_config.submit_rate,
+            max_retries=server_config.submit_max_retries,
+            retry_backoff=server_config.submit_retry_backoff,
+        )
+
+        self.placement_engine = None
+        if server_config.placement_strategy is not None:
+            # numpy 为可选依赖，只在启用放置策略时导入
+            from cedschedulerapp.master.placement import PlacementEngine
+
+            self.placement_engine = PlacementEngine(server_config.placement_strategy)
 
-        self.get_training_task_list_daemon()
+    def start(self):
+        """打开本地存储并在事件循环中启动后台任务"""
+        self.open_benchmark_store()
+        if self.trace_recorder is not None:
+            self.trace_recorder.start()
+        self.start_daemon(
+            "training_task_list", server_config.training_poll_interval, self.training_task_snapshot.refresh
+        )
+        self.start_daemon("node_liveness", NODE_SWEEP_INTERVAL, self.expire_nodes)
+        self.start_daemon(
+            "dashboard",
+            server_config.dashboard_poll_interval,
+            self.refresh_dashboard_sources,
+            when=lambda: self.dashboard_hub.has_subscribers,
+        )
+        if self.inference_router.enabled:
+            self.start_daemon(
+                "inference_router", server_config.router_refresh_interval, self.refresh_inference_instances
+            )
+        self.submission_pipeline.start()
+
+    def open_benchmark_store(self):
+        """打开基准测试历史数据库并加载已完成的结果"""
+        if self.benchmark_store is not None:
+            return
+        self.benchmark_store = BenchmarkStore(server_config.benchmark_db_path)
+        self.benchmark_history.update(
+            (record.benchmark_id, record) for record in self.benchmark_store.load_all()
+        )
+        self.benchmark_history_version += 1
+
+    def start_daemon(
+        self,
+        name: str,
+        interval: float,
+        job: Callable[[], Awaitable],
+        when: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        启动后台周期任务，每隔 interval 秒执行一次 job
+
+        单次执行失败只记录日志，不中断后续执行；每次执行的耗时计入 DAEMON_DURATION。
+        任务在 close() 时取消。
+
+        Args:
+            name: 任务名，用于日志和指标标签
+            interval: 两次执行之间的间隔秒数
+            job: 每次执行的协程函数
+            when: 可选的执行条件，返回 False 时跳过本次执行
+        """
 
-    def get_training_task_list_daemon(self):
         async def _daemon():
+            duration = DAEMON_DURATION.labels(name)
             while True:
-                try:
-                    await self.get_training_task_list()
-                except Exception as e:
-                    self.logger.error(f"Error in training task list daemon: {e}")
-                await asyncio.sleep(5)
-
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+                if when is None or when():
+                    start = time.perf_counter()
+                    try:
+                        await job()
+                    except Exception as e:
+                        self.logger.error(f"Error in {name} daemon: {e}")
+                    duration.observe(time.perf_counter() - start)
+                await asyncio.sleep(interval)
+
+        self.daemon_tasks.append(asyncio.create_task(_daemon()))
+
+    async def refresh_inference_instances(self):
+        """拉取推理实例列表，更新路由使用的负载，变化时推送到看板"""
+        previous_instances = self.inference_services
+        instances, stale = await self.get_inference_instance_list()
+        if stale:
+            return
+        self.inference_router.update(instances)
+        if instances != previous_instances:
+            self.dashboard_hub.publish(DashboardEventType.Instances, "", instances)
+
+    async def refresh_dashboard_sources(self):
+        """有订阅者时统一拉取推理实例和进行中的基准测试进度，变化时推送"""
+        # 启用路由时实例列表已由路由后台任务更频繁地拉取
+        if not self.inference_router.enabled:
+            await self.refresh_inference_instances()
+
+        now = time.time()
+        async with self.benchmark_history_lock:
+            running = [
+                record
+                for record in self.benchmark_history.values()
+                if not record.is_complete and now - record.timestamp < DASHBOARD_BENCHMARK_WINDOW
+            ]
+        for record in running:
+            progress = await self.benchmark_progress(record.benchmark_id, record.num_prompts, 0)
+            event = BenchmarkProgressEvent(benchmark_id=record.benchmark_id, **progress.model_dump())
+            if self.benchmark_progress_cache.get(record.benchmark_id) != event:
+                self.benchmark_progress_cache[record.benchmark_id] = event
+                self.dashboard_hub.publish(DashboardEventType.BenchmarkProgress, record.benchmark_id, event)
+            if event.total and event.completed >= event.total:
+                await self.refresh_benchmark_record(record)
+
+    async def get_dashboard_snapshot(self) -> DashboardSnapshot:
+        """看板初始快照，只读取本地状态，不为单个订阅者访问上游"""
+        async with self.node_stats_lock:
+            resources = self.resource_aggregates.to_resource_stats()
+            nodes = [self._to_node_status(node) for node in self.node_registry.values()]
+        snapshot = self.training_task_snapshot.snapshot
+        return DashboardSnapshot(
+            resources=resources,
+            nodes=nodes,
+            tasks=snapshot.data if snapshot is not None else [],
+            instances=self.inference_services,
+            benchmarks=list(self.benchmark_progress_cache.values()),
+        )
 
-        loop.create_task(_daemon())
+    def _publish_node(self, node_stats: Optional[NodeResourceStats], node_id: str):
+        """记录节点变化并推送节点及随之变化的资源汇总，调用方持有 node_stats_lock"""
+        self.node_stats_version += 1
+        if not self.dashboard_hub.has_subscribers:
+            return
+        if node_stats is None:
+            self.dashboard_hub.publish(DashboardEventType.NodeRemoved, node_id, NodeRemovedEvent(node_id=node_id))
+        else:
+            self.dashboard_hub.publish(DashboardEventType.Node, node_id, self._to_node_status(node_stats))
+        self.dashboard_hub.publish(
+            DashboardEventType.Resources, "", self.resource_aggregates.to_resource_stats()
+        )
 
-    async def update_node_stats(self, node_id: str, node_stats: NodeResourceStats):
+    async def expire_nodes(self):
+        """处理超时节点：dead 节点不再计入资源汇总，超过移除时间的节点被删除"""
         async with self.node_stats_lock:
-            self.node_stats[node_id] = node_stats
+            transitions = self.node_liveness.expire()
+            for node_id, previous, state in transitions.changed:
+                self.logger.warning(f"Node {node_id} liveness: {previous.value} -> {state.value}")
+                self.node_membership_version += 1
+                if state == NodeLiveness.Dead:
+                    self.resource_aggregates.remove(self.node_registry.get(node_id))
+                self._publish_node(self.node_registry.get(node_id), node_id)
+            for node_id, previous in transitions.evicted:
+                self.logger.warning(f"Node {node_id} evicted after missing heartbeats")
+                self.node_membership_version += 1
+                node_stats = self.node_registry.remove(node_id)
+                if previous != NodeLiveness.Dead:
+                    self.resource_aggregates.remove(node_stats)
+                self.node_stats_seq.pop(node_id, None)
+                self.node_history.remove(node_id)
+                self._publish_node(None, node_id)
+
+    async def close(self):
+        for task in self.daemon_tasks:
+            task.cancel()
+        await asyncio.gather(*self.daemon_tasks, return_exceptions=True)
+        self.daemon_tasks.clear()
+        self.dashboard_hub.close()
+        await self.submission_pipeline.close()
+        for task in list(self.load_test_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self.load_test_tasks.values(), return_exceptions=True)
+        await self.training_client.close()
+        if self.generation_cache is not None:
+            await self.generation_cache.close()
+        if self.chat_batcher is not None:
+            await self.chat_batcher.close()
+        await self.inference_client.close()
+        await self.inference_router.close()
+        if self.benchmark_store is not None:
+            self.benchmark_store.close()
+            self.benchmark_store = None
+        if self.trace_recorder is not None:
+            await asyncio.to_thread(self.trace_recorder.close)
+
+    def record_trace(self, kind: TraceRecordType, payload):
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(kind, payload)
+
+    async def update_node_stats(
+        self,
+        node_id: str,
+        node_stats: Union[NodeResourceStats, NodeResourceStatsDelta],
+    ) -> NodeResourceStats:
+        """
+        更新节点状态，支持全量心跳和增量心跳
+
+        Raises:
+            NodeStatsResyncError: 增量心跳无法应用（节点未知或序号不连续），需要 worker 重发全量心跳
+        """
+        async with self.node_stats_lock:
+            if isinstance(node_stats, NodeResourceStatsDelta):
+                current = self.node_registry.get(node_id)
+                expected_seq = self.node_stats_seq.get(node_id)
+                if current is None or expected_seq is None:
+                    raise NodeStatsResyncError(f"Unknown node {node_id}")
+                if node_stats.seq != expected_seq + 1:
+                    self.node_stats_seq.pop(node_id, None)
+                    raise NodeStatsResyncError(
+                        f"Heartbeat seq gap for node {node_id}: "
+                        f"expected {expected_seq + 1}, got {node_stats.seq}"
+                    )
+                changes = node_stats.model_dump(
+                    exclude={"node_id", "seq"}, exclude_none=True
+                )
+                if "gpu_info" in changes:
+                    changes["gpu_info"] = node_stats.gpu_info
+                node_stats = current.model_copy(update=changes)
+                self.node_stats_seq[node_id] += 1
+            else:
+                self.node_stats_seq[node_id] = 0
+            previous_liveness = self.node_liveness.touch(node_id)
+            if previous_liveness != NodeLiveness.Alive:
+                self.node_membership_version += 1
+            previous = self.node_registry.upsert(node_stats)
+            # dead 节点已从资源汇总中扣除，恢复时直接加入
+            self.resource_aggregates.update(
+                previous if previous_liveness != NodeLiveness.Dead else None,
+                node_stats,
+            )
+            self.node_history.record(time.time(), node_stats)
+            self._publish_node(node_stats, node_id)
+            return node_stats
+
+    async def get_node_history(
+        self,
+        node_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        resolution: Optional[int] = None,
+    ) -> Optional[NodeHistoryResponse]:
+        """
+        查询节点历史
+
+        Args:
+            node_id: 节点 ID
+            start: 起始时间戳，默认为一小时前
+            end: 结束时间戳，默认为当前时间
+            resolution: 时间槽长度（秒），默认选择能覆盖 start 的最细分辨率
+
+        Returns:
+            Optional[NodeHistoryResponse]: 节点不存在时为 None
+        """
+        now = time.time()
+        end = now if end is None else end
+        start = end - 3600 if start is None else start
+        return self.node_history.query(node_id, start, end, now, resolution)
+
+    def _to_node_status(self, node_stats: NodeResourceStats) -> NodeStatusInfo:
+        # 字段已校验过，直接构造避免重复校验
+        return NodeStatusInfo.model_construct(
+            **dict(node_stats),
+            liveness=self.node_liveness.get_state(node_stats.node_id),
+            last_seen=self.node_liveness.get_last_seen(node_stats.node_id),
+        )
+
+    def node_stats_cache_version(self):
+        """
+        节点列表响应的缓存版本
+
+        每次心跳都会改变节点的资源用量，按 node_stats_version 缓存几乎不会命中。
+        这里只在节点加入、移除或存活状态变化时立即失效，资源用量最多滞后
+        node_stats_cache_ttl 秒；ttl <= 0 时每次节点状态变化都失效。
+        """
+        ttl = server_config.node_stats_cache_ttl
+        if ttl <= 0:
+            return self.node_stats_version
+        return self.node_membership_version, int(time.monotonic() // ttl)
 
-    async def get_node_stats(self, node_id: str) -> NodeResourceStats:
+    async def get_node_stats(self, node_id: str) -> NodeStatusInfo:
         async with self.node_stats_lock:
-            return self.node_stats[node_id]
+            return self._to_node_status(self.node_registry.nodes[node_id])
 
-    async def get_all_node_stats(self) -> list[NodeResourceStats]:
+    async def get_all_node_stats(self) -> list[NodeStatusInfo]:
         async with self.node_stats_lock:
-            return list(self.node_stats.values())
+            return [self._to_node_status(node) for node in self.node_registry.values()]
 
     async def get_nodes_stats_by_region(
         self, region: RegionType
-    ) -> list[NodeResourceStats]:
+    ) -> list[NodeStatusInfo]:
+        return await self.query_node_stats(region=region)
+
+    async def query_node_stats(
+        self,
+        region: Optional[RegionType] = None,
+        node_type: Optional[NodeType] = None,
+        gpu_type: Optional[str] = None,
+        free_gpu: bool = False,
+    ) -> list[NodeStatusInfo]:
         async with self.node_stats_lock:
-            return [node for node in self.node_stats.values() if node.region == region]
+            return [
+                self._to_node_status(node)
+                for node in self.node_registry.query(
+                    region=region,
+                    node_type=node_type,
+                    gpu_type=gpu_type,
+                    free_gpu=free_gpu,
+                )
+            ]
 
-    async def get_resource_stats(self) -> ResourceStats:
+    async def get_resource_stats(
+        self, region: RegionType = RegionType.ALL
+    ) -> ResourceStats:
         async with self.node_stats_lock:
-            return ResourceStats(
-                cloud_node_count=sum(
-                    1
-                    for node in self.node_stats.values()
-                    if node.region == RegionType.Cloud
-                ),
-                edge_node_count=sum(
-                    1
-                    for node in self.node_stats.values()
-                    if node.region == RegionType.Edge
-                ),
-                device_node_count=sum(
-                    1
-                    for node in self.node_stats.values()
-                    if node.region == RegionType.Device
-                ),
-                total_cpu_count=sum(
-                    node.cpu_count for node in self.node_stats.values()
-                ),
-                used_cpu_count=sum(
-                    node.used_cpu_count for node in self.node_stats.values()
-                ),
-                total_gpu_count=sum(
-                    node.gpu_count for node in self.node_stats.values()
-                ),
-                used_gpu_count=sum(
-                    node.used_gpu_count for node in self.node_stats.values()
-                ),
-                total_memory_count=sum(
-                    node.memory_count for node in self.node_stats.values()
-                ),
-                used_memory_count=sum(
-                    node.used_memory_count for node in self.node_stats.values()
-                ),
-                total_storage_count=sum(
-                    node.storage_count for node in self.node_stats.values()
-                ),
-                used_storage_count=sum(
-                    node.used_storage_count for node in self.node_stats.values()
-                ),
-            )
+            return self.resource_aggregates.to_resource_stats(region)
 
-    async def get_training_task_sim_list(self) -> list[TrainingTask]:
-        training_task_list = await self.get_training_task_list()
+    async def get_training_task_sim_list(self) -> tuple[list[TrainingTask], bool]:
+        training_task_list, stale = await self.get_training_task_list()
         sim_list = [
             TrainingTask.from_training_task_detail(task) for task in training_task_list
         ]
-        return sim_list
+        return sim_list, stale
 
-    async def get_service_sim_list(self) -> list[InferenceService]:
-        service_list = await self.get_inference_instance_list()
+    async def get_service_sim_list(self) -> tuple[list[InferenceService], bool]:
+        service_list, stale = await self.get_inference_instance_list()
         sim_list = [
             InferenceService.from_inference_instance_info(service)
             for service in service_list
         ]
-        return sim_list
+        return sim_list, stale
+
+    async def get_training_task_list(self) -> tuple[list[TrainingTaskDetail], bool]:
+        """返回任务列表及是否过期，训练服务不可用时返回最近一次成功拉取的列表"""
+        return await self.training_task_snapshot.get_or_stale(wait=SNAPSHOT_STALE_WAIT)
+
+    @staticmethod
+    def build_training_task_detail(task_info: dict) -> TrainingTaskDetail:
+        task_meta = TaskMeta(**task_info.get("task_meta", {}))
+        task_wrap = TaskWrapRuntimeInfo(
+            task_meta=task_meta,
+            schedule_infos=task_info.get("schedule_infos", {}),
+            inst_status=task_info.get("inst_status", {}),
+            inst_data_status=task_info.get("inst_data_status", {}),
+            task_submit_time=task_info.get("task_submit_time", 0.0),
+            task_start_time=task_info.get("task_start_time", 0.0),
+            task_end_time=task_info.get("task_end_time", 0.0),
+        )
+        return TrainingTaskDetail.from_training_task_wrap_runtime_info(task_wrap)
+
+    async def fetch_training_task_list(self) -> list[TrainingTaskDetail]:
+        """
+        拉取训练任务列表，只为新出现或内容变化的任务重新构建模型
 
-    async def get_training_task_list(self) -> list[TrainingTaskDetail]:
+        每个任务以上一次轮询的原始 dict 作为指纹，内容相同时直接复用缓存的
+        TrainingTaskDetail；状态变化以 TaskStatusTransition 事件发布到看板。
+        """
         training_task_wrap_runtime_list = await self.training_client.list_tasks()
-        self.logger.info(training_task_wrap_runtime_list)
+        if training_task_wrap_runtime_list is None:
+            raise RuntimeError("Failed to fetch training task list")
+        previous_cache = self.training_task_cache
+        task_cache: dict[str, tuple[dict, TrainingTaskDetail]] = {}
         training_task_list = []
+        transitions: list[TaskStatusTransition] = []
         for task_info in training_task_wrap_runtime_list:
-            task_meta = TaskMeta(**task_info.get("task_meta", {}))
-
-            task_wrap = TaskWrapRuntimeInfo(
-                task_meta=task_meta,
-                schedule_infos=task_info.get("schedule_infos", {}),
-                inst_status=task_info.get("inst_status", {}),
-                inst_data_status=task_info.get("inst_data_status", {}),
-                task_submit_time=task_info.get("task_submit_time", 0.0),
-                task_start_time=task_info.get("task_start_time", 0.0),
-                task_end_time=task_info.get("task_end_time", 0.0),
-            )
-
-            task_detail = TrainingTaskDetail(
-                task_id=task_meta.task_id,
-                task_name=task_meta.task_name,
-                task_inst_num=task_meta.task_inst_num,
-                task_plan_cpu=task_meta.task_plan_cpu,
-                task_plan_mem=task_meta.task_plan_mem,
-                task_plan_gpu=task_meta.task_plan_gpu,
-                task_status=task_meta.task_status,
-                schedule_infos=task_wrap.schedule_infos,
-                inst_status=task_wrap.inst_status,
-                task_submit_time=task_wrap.task_submit_time,
-                task_start_time=task_wrap.task_start_time,
-                task_end_time=task_wrap.task_end_time,
-            )
+            task_id = task_info.get("task_meta", {}).get("task_id")
+            cached = previous_cache.get(task_id)
+            if cached is not None and cached[0] == task_info:
+                task_detail = cached[1]
+            else:
+                task_detail = self.build_training_task_detail(task_info)
+                previous_status = cached[1].task_status if cached is not None else None
+                # 首次轮询没有基线，全部任务都是新任务，不逐条发布
+                if previous_cache and previous_status != task_detail.task_status:
+                    transitions.append(
+                        TaskStatusTransition(
+                            task_id=task_detail.task_id,
+                            task_name=task_detail.task_name,
+                            previous_status=previous_status,
+                            status=task_detail.task_status,
+                        )
+                    )
+            task_cache[task_detail.task_id] = (task_info, task_detail)
             training_task_list.append(task_detail)
+
+        self.publish_task_transitions(transitions)
+        self.logger.debug(
+            f"Fetched {len(training_task_list)} training tasks, "
+            f"{len(transitions)} status transitions, {len(previous_cache.keys() - task_cache.keys())} removed"
+        )
+        self.training_task_cache = task_cache
         self.training_tasks = training_task_list
         return training_task_list
 
-    async def submit_task(self, request: list[SubmitTaskRequest]):
-        for task_request in request:
+    def publish_task_transitions(self, transitions: list[TaskStatusTransition]):
+        for transition in transitions:
+            self.logger.info(
+                f"Training task {transition.task_id} status: "
+                f"{transition.previous_status.value if transition.previous_status else None} -> "
+                f"{transition.status.value}"
+            )
+            self.dashboard_hub.publish(DashboardEventType.Task, transition.task_id, transition)
+
+    def generate_task_id(self, issued: Optional[set[str]] = None) -> str:
+        """
+        生成任务ID
+
+        Args:
+            issued: 同一批次中已生成、尚未加入提交队列的ID，新ID会加入该集合
+        """
+        while True:
             # Generate random string (4 characters)
             random_str = "".join(
                 random.choices(string.ascii_lowercase + string.digits, k=4)
             )
+            task_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{random_str}"
+            # 同一秒内批量提交时避免ID冲突，包括与同批次中尚未入队的ID冲突
+            if issued is not None and task_id in issued:
+                continue
+            if not self.submission_pipeline.contains(task_id):
+                if issued is not None:
+                    issued.add(task_id)
+                return task_id
+
+    def build_task_meta(self, task_request: SubmitTaskRequest, issued: Optional[set[str]] = None) -> TaskMeta:
+        return task_request.to_task_meta(task_id=self.generate_task_id(issued), start_time=time.time())
+
+    async def submit_task(self, request: list[SubmitTaskRequest]) -> list[str]:
+        """将任务加入后台提交队列，立即返回任务ID"""
+        issued: set[str] = set()
+        task_metas = [self.build_task_meta(task_request, issued) for task_request in request]
+        if self.placement_engine is not None:
+            await self.place_tasks(task_metas, [task_request.region for task_request in request])
+        return self.submission_pipeline.enqueue(task_metas)
+
+    async def place_tasks(self, task_metas: list[TaskMeta], regions: list[Optional[RegionType]]):
+        """根据当前存活训练节点的容量为任务生成放置建议"""
+        from cedschedulerapp.master.placement import NodeCapacity
 
-            # Convert SubmitTaskRequest to TaskMeta
-            task_meta = TaskMeta(
-                task_id=f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{random_str}",
-                task_name=task_request.task_name,
-                task_inst_num=task_request.inst_num,
-                task_plan_cpu=float(task_request.plan_cpu),
-                task_plan_mem=float(task_request.plan_mem),
-                task_plan_gpu=task_request.plan_gpu,
-                task_status=TaskStatus.Submitted,
-                task_start_time=time.time(),
-                task_runtime={
-                    GPUType.V100: int(
-                        task_request.runtime
-                        * GPUPerformance.T4_PERFORMANCE
-                        / GPUPerformance.V100_PERFORMANCE
-                    ),
-                    GPUType.P100: int(
-                        task_request.runtime
-                        * GPUPerformance.T4_PERFORMANCE
-                        / GPUPerformance.P100_PERFORMANCE
-                    ),
-                    GPUType.T4: int(task_request.runtime),
-                },
-            )
+        async with self.node_stats_lock:
+            nodes = [
+                node
+                for node in self.node_registry.query(node_type=NodeType.Training)
+                if self.node_liveness.get_state(node.node_id) == NodeLiveness.Alive
+            ]
+
+        def _place():
+            capacity = NodeCapacity.from_nodes(nodes)
+            return self.placement_engine.place_all(task_metas, capacity, regions)
 
-            self.logger.info(task_meta)
-            # Submit task using training client
-            await self.training_client.submit_task(task_meta)
+        hints = await asyncio.to_thread(_place)
+        for task_meta, hint in zip(task_metas, hints):
+            task_meta.placement_hint = hint
 
-            # Wait for 3 seconds before submitting next task
-            await asyncio.sleep(3)
+    async def get_task_submission_states(
+        self, task_ids: Optional[list[str]] = None
+    ) -> list[TaskSubmissionState]:
+        return self.submission_pipeline.get_states(task_ids)
 
     async def get_training_task_log(self, task_id: str) -> TaskLogResponse:
         task_log = await self.training_client.get_training_task_log(task_id)
         self.logger.info(task_log)
         return TaskLogResponse(task_id=task_id, logs=task_log)
 
-    async def get_inference_instance_list(self) -> list[InferenceInstanceInfo]:
+    async def get_inference_instance_list(self) -> tuple[list[InferenceInstanceInfo], bool]:
+        """返回推理实例列表及是否过期，推理服务不可用时返回最近一次成功拉取的列表"""
         instances = await self.inference_client.list_instances()
-        self.logger.info(instances)
+        if instances is None:
+            return self.inference_services, True
+        self.logger.debug(instances)
         self.inference_services = instances
-        return instances
+        return instances, False
+
+    def get_inference_route_states(self) -> list[InstanceRouteState]:
+        return self.inference_router.states()
 
     async def get_inference_instance_log(self, instance_id: str) -> str:
         log = await self.inference_client.get_instance_log(instance_id)
         return log
 
-    async def generate(self, prompt: str) -> str:
-        response = await self.inference_client.generate(prompt)
+    async def generate(self, prompt: str, sampling_params: Optional[dict] = None) -> str:
+        sampling_params = resolve_sampling_params(sampling_params)
+        if self.generation_cache is not None:
+            return await self.generation_cache.get_or_generate(
+                prompt, sampling_params, lambda: self._generate(prompt, sampling_params)
+            )
+        return await self._generate(prompt, sampling_params)
+
+    async def _generate(self, prompt: str, sampling_params: dict) -> str:
+        # 合批请求共用默认采样参数，指定了其他采样参数的请求单独发送
+        if self.chat_batcher is not None and sampling_params == SAMPLING_PARAMS:
+            return await self.chat_batcher.submit(prompt)
+        with self.inference_router.route() as instance:
+            client = instance.client if instance is not None else self.inference_client
+            response = await client.generate(prompt, sampling_params)
         response = (
             response["text"][0]
             if isinstance(response, dict) and "text" in response
@@ -241,62 +683,224 @@ class Manager:
         )
         return response
 
+    async def generate_batch(self, prompts: list[str]) -> list[str]:
+        """整批发送到路由选中的实例，一批在路由中计为一个请求"""
+        with self.inference_router.route() as instance:
+            client = instance.client if instance is not None else self.inference_client
+            return await client.generate_batch(prompts)
+
+    async def generate_stream(self, prompt: str, sampling_params: Optional[dict] = None) -> AsyncIterator[str]:
+        """流式生成，路由选中的实例在整个流期间计入负载"""
+        with self.inference_router.route() as instance:
+            client = instance.client if instance is not None else self.inference_client
+            async for text in client.generate_stream(prompt, sampling_params):
+                yield text
+
     async def benchmark(self, num_prompts: int, qps: float) -> str:
         benchmark_id = await self.inference_client.benchmark(
             num_prompts=num_prompts, qps=qps
         )
+        if not benchmark_id:
+            # 推理服务没有启动基准测试，不记录也不持久化
+            raise RuntimeError("Failed to start benchmark on the inference server")
+        record = BenchmarkRecord(
+            benchmark_id=benchmark_id,
+            timestamp=time.time(),
+            qps=qps,
+            num_prompts=num_prompts,
+        )
         async with self.benchmark_history_lock:
-            self.benchmark_history.append(
-                BenchmarkHistory(
-                    benchmark_id=benchmark_id,
-                    timestamp=time.time(),
-                    qps=qps,
-                    num_prompts=num_prompts,
-                    results=BenchmarkResultResponse(
-                        prompt_lens=[],
-                        response_lens=[],
-                        end_to_end_latencies=[],
-                        prefill_latencies=[],
-                    ),
-                )
+            self.benchmark_history[benchmark_id] = record
+            self.benchmark_history_version += 1
+        await self.benchmark_store.save(record)
+        return benchmark_id
+
+    def generate_load_test_id(self) -> str:
+        while True:
+            random_str = "".join(random.choices(string.ascii_lowercase + string.digits, k=4))
+            benchmark_id = f"loadtest_{datetime.now().strftime('%Y%m%d%H%M%S')}_{random_str}"
+            if benchmark_id not in self.benchmark_history:
+                return benchmark_id
+
+    async def load_test(self, request: LoadTestRequest) -> str:
+        """
+        启动内置的开环负载测试，立即返回基准测试 ID
+
+        chat 目标经过 master 的流式生成接口，包含路由、熔断等完整路径；instances 目标
+        直接请求推理实例，作为对照。结果与远程基准测试记录在同一份历史中。
+
+        Raises:
+            ValueError: 数据集或到达参数无效
+        """
+        if not request.prompts:
+            raise ValueError("prompts must not be empty")
+        if request.prompt_lens is not None and len(request.prompt_lens) != len(request.prompts):
+            raise ValueError("prompt_lens must have the same length as prompts")
+        schedule = arrival_schedule(
+            request.pattern,
+            request.num_prompts or len(request.prompts),
+            qps=request.qps,
+            arrival_times=request.arrival_times,
+            seed=request.seed,
+        )
+        prompt_lens = request.prompt_lens or [len(prompt.split()) for prompt in request.prompts]
+        client = StreamingHTTPClient()
+        if request.target == LoadTestTarget.Chat:
+            base_url = server_config.load_test_chat_url or f"http://127.0.0.1:{server_config.port}"
+            # 采样参数由 master 按默认值补全
+            stream_request = chat_stream_request(
+                client, f"{base_url.rstrip('/')}/inference/chat/stream", request.sampling_params()
+            )
+        else:
+            urls = [f"http://{host}:{port}/generate" for host, port in server_config.inference_instances.values()]
+            stream_request = instance_stream_request(
+                client,
+                urls or [f"{self.inference_client.base_url}/generate"],
+                resolve_sampling_params(request.sampling_params()),
             )
+        qps = request.qps
+        if request.pattern == ArrivalPattern.Trace:
+            qps = (len(schedule) - 1) / schedule[-1] if schedule[-1] > 0 else 0.0
+
+        benchmark_id = self.generate_load_test_id()
+        generator = LoadGenerator(
+            benchmark_id,
+            stream_request,
+            request.prompts,
+            prompt_lens,
+            schedule,
+            server_config.load_test_max_inflight,
+        )
+        record = BenchmarkRecord(
+            benchmark_id=benchmark_id,
+            timestamp=time.time(),
+            qps=qps,
+            num_prompts=generator.total,
+            columns=generator.columns,
+        )
+        async with self.benchmark_history_lock:
+            self.benchmark_history[benchmark_id] = record
+            self.benchmark_history_version += 1
+        self.load_tests[benchmark_id] = generator
+        self.load_test_tasks[benchmark_id] = asyncio.create_task(self._run_load_test(generator, record, client))
         return benchmark_id
 
+    async def _run_load_test(self, generator: LoadGenerator, record: BenchmarkRecord, client: StreamingHTTPClient):
+        try:
+            await generator.run()
+        except Exception as e:
+            self.logger.error(f"Load test {record.benchmark_id} failed: {e}")
+        finally:
+            client.close()
+            # 取消或失败时保留已完成请求的结果
+            record.is_complete = True
+            self.load_tests.pop(record.benchmark_id, None)
+            self.load_test_tasks.pop(record.benchmark_id, None)
+            self.benchmark_history_version += 1
+            await self.benchmark_store.save(record)
+
+    def cancel_load_test(self, benchmark_id: str) -> bool:
+        task = self.load_test_tasks.get(benchmark_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
     async def benchmark_progress(
         self, benchmark_id: str, total: int, completed: int
     ) -> BenchmarkProgressResponse:
+        generator = self.load_tests.get(benchmark_id)
+        if generator is not None:
+            return BenchmarkProgressResponse(total=generator.total, completed=generator.completed)
+        record = self.benchmark_history.get(benchmark_id)
+        if record is not None and record.is_complete:
+            # 已结束的基准测试（含取消的负载测试）不再访问推理服务
+            return BenchmarkProgressResponse(total=record.num_prompts, completed=record.num_prompts)
         result = await self.inference_client.benchmark_result(benchmark_id)
-        progress = global_benchmark_parser.parse_progress(result)
+        progress = global_benchmark_parser.parse_progress(result, benchmark_id)
         if progress is None:
             return BenchmarkProgressResponse(total=total, completed=completed)
         return BenchmarkProgressResponse(
             total=progress.total_prompts, completed=progress.current_progress
         )
 
-    async def benchmark_result(self, benchmark_id: str) -> BenchmarkResultResponse:
-        result = await self.inference_client.benchmark_result(benchmark_id)
-        result = global_benchmark_parser.parse_result(result)
-        if result is None:
-            return BenchmarkResultResponse(
-                prompt_lens=[],
-                response_lens=[],
-                end_to_end_latencies=[],
-                prefill_latencies=[],
+    async def get_benchmark_record(self, benchmark_id: str) -> BenchmarkRecord:
+        """获取基准测试记录，未完成时先从推理服务刷新"""
+        record = self.benchmark_history.get(benchmark_id)
+        if record is None:
+            # 不在历史中的基准测试，只临时解析不入库
+            record = BenchmarkRecord(
+                benchmark_id=benchmark_id, timestamp=0.0, qps=0.0, num_prompts=0
             )
-        benchmark_result = BenchmarkResultResponse(
-            prompt_lens=result.prompt_lens,
-            response_lens=result.response_lens,
-            end_to_end_latencies=result.e2e_latencies,
-            prefill_latencies=result.decode_token_latencies,
+            log_text = await self.inference_client.benchmark_result(benchmark_id)
+            result = global_benchmark_parser.parse_result(log_text)
+            if result is not None:
+                record.columns = BenchmarkColumns.from_result(result)
+            return record
+        if not record.is_complete:
+            await self.refresh_benchmark_record(record)
+        return record
+
+    async def benchmark_result(
+        self,
+        benchmark_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        max_samples: Optional[int] = None,
+    ) -> BenchmarkResultResponse:
+        record = await self.get_benchmark_record(benchmark_id)
+        return record.columns.to_response(
+            offset=offset, limit=limit, max_samples=max_samples
         )
 
-        return benchmark_result
+    async def benchmark_summary(
+        self, benchmark_id: str, bins: int
+    ) -> BenchmarkSummaryResponse:
+        record = await self.get_benchmark_record(benchmark_id)
+        return record.summary(bins)
+
+    async def refresh_benchmark_record(self, record: BenchmarkRecord):
+        """刷新未完成的基准测试，完成后结果只解析一次并持久化"""
+        if record.benchmark_id in self.load_tests:
+            # 内置负载测试的结果已在本地实时写入
+            self.benchmark_history_version += 1
+            return
+        log_text = await self.inference_client.benchmark_result(record.benchmark_id)
+        progress = global_benchmark_parser.parse_progress(
+            log_text, record.benchmark_id
+        )
+        result = global_benchmark_parser.parse_result(log_text, record.benchmark_id)
+        if result is None:
+            return
+        record.columns = BenchmarkColumns.from_result(result)
+        record.is_complete = progress is not None and progress.is_complete
+        self.benchmark_history_version += 1
+        if record.is_complete:
+            global_benchmark_parser.forget(record.benchmark_id)
+            await self.benchmark_store.save(record)
+
+    async def get_benchmark_result_list(
+        self, max_samples: Optional[int] = None, refresh: bool = True
+    ) -> list[BenchmarkHistory]:
+        if refresh:
+            await self.refresh_pending_benchmarks()
+        async with self.benchmark_history_lock:
+            records = list(self.benchmark_history.values())
+        return [record.to_history(max_samples=max_samples) for record in records]
 
-    async def get_benchmark_result_list(self) -> list[BenchmarkHistory]:
+    async def refresh_pending_benchmarks(self):
         async with self.benchmark_history_lock:
-            for history in self.benchmark_history:
-                history.results = await self.benchmark_result(history.benchmark_id)
-            return self.benchmark_history
+            pending = [r for r in self.benchmark_history.values() if not r.is_complete]
+        # 只刷新未完成的基准测试，在锁外并发拉取
+        results = await asyncio.gather(
+            *(self.refresh_benchmark_record(record) for record in pending),
+            return_exceptions=True,
+        )
+        for record, result in zip(pending, results):
+            if isinstance(result, Exception):
+                self.logger.error(
+                    f"Error refreshing benchmark {record.benchmark_id}: {result}"
+                )
 
 
 global_manager: Manager = Manager()
@@ -0,0 +1,257 @@
+import asyncio
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+
+from starlette.routing import Match
+
+# 秒级延迟的默认桶，覆盖心跳处理（亚毫秒）到上游生成请求（数十秒）
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 没有匹配到任何路由的请求（如 404）统一使用的路由标签，避免按原始路径产生新的时间序列
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # 非累计计数，最后一个为 +Inf，导出时再累加
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """返回对应标签组合的子指标，热路径上应缓存返回值，避免每次查找"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self.children[values] = self._new_child()
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self.children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple[str, ...], child) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _render_child(self, values: tuple[str, ...], child: CounterChild) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def _render_child(self, values: tuple[str, ...], child: HistogramChild) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _format_labels(self.labelnames, values, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+global_metrics = MetricsRegistry()
+
+ROUTE_LATENCY = global_metrics.histogram(
+    "cedscheduler_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+UPSTREAM_LATENCY = global_metrics.histogram(
+    "cedscheduler_upstream_request_duration_seconds", "Upstream call latency", ("client", "endpoint")
+)
+UPSTREAM_REQUESTS = global_metrics.counter(
+    "cedscheduler_upstream_requests_total", "Upstream calls by outcome", ("client", "endpoint", "outcome")
+)
+UPSTREAM_RETRIES = global_metrics.counter(
+    "cedscheduler_upstream_retries_total",
+    "Upstream retries, by whether the retry budget allowed them",
+    ("client", "endpoint", "outcome"),
+)
+CIRCUIT_TRANSITIONS = global_metrics.counter(
+    "cedscheduler_upstream_circuit_transitions_total", "Upstream circuit breaker state changes", ("client", "state")
+)
+LOCK_WAIT = global_metrics.histogram(
+    "cedscheduler_lock_wait_seconds",
+    "Time spent waiting to acquire a manager lock",
+    ("lock",),
+    buckets=(0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+HEARTBEATS = global_metrics.counter("cedscheduler_heartbeats_total", "Heartbeats received", ("kind", "outcome"))
+DAEMON_DURATION = global_metrics.histogram(
+    "cedscheduler_daemon_duration_seconds", "Duration of one background daemon iteration", ("daemon",)
+)
+ROUTED_REQUESTS = global_metrics.counter(
+    "cedscheduler_routed_requests_total", "Inference requests routed to each instance", ("instance",)
+)
+CHAT_BATCH_SIZE = global_metrics.histogram(
+    "cedscheduler_chat_batch_size",
+    "Prompts per batched upstream generate call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+GENERATION_CACHE_REQUESTS = global_metrics.counter(
+    "cedscheduler_generation_cache_requests_total",
+    "Generate requests by cache outcome (hit, disk_hit, coalesced, miss, bypass)",
+    ("outcome",),
+)
+LOAD_TEST_REQUESTS = global_metrics.counter(
+    "cedscheduler_load_test_requests_total",
+    "Load generator requests by outcome (ok, error, dropped)",
+    ("outcome",),
+)
+LOAD_TEST_DISPATCH_LAG = global_metrics.histogram(
+    "cedscheduler_load_test_dispatch_lag_seconds",
+    "Delay between a load test request's scheduled arrival and its dispatch",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+BENCHMARK_PARSE_DURATION = global_metrics.histogram(
+    "cedscheduler_benchmark_parse_duration_seconds", "Time spent scanning new benchmark log text"
+)
+
+
+class InstrumentedLock(asyncio.Lock):
+    """记录获取等待时间的 asyncio.Lock"""
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.wait_time = LOCK_WAIT.labels(name)
+
+    async def acquire(self) -> bool:
+        start = time.perf_counter()
+        result = await super().acquire()
+        self.wait_time.observe(time.perf_counter() - start)
+        return result
+
+
+def _match_route(scope) -> str:
+    """旧版 FastAPI 不在 scope 中记录匹配到的路由，按路由表重新匹配出路径模板"""
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    按路由模板记录请求延迟的 ASGI 中间件
+
+    直接包装 ASGI 调用，不经过 BaseHTTPMiddleware，避免额外的任务和流转发开销。
+    """
+
+    def __init__(self, app, untimed_routes: Sequence[str] = ()):
+        self.app = app
+        self.untimed_routes = set(untimed_routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or _match_route(scope)
+            if route not in self.untimed_routes:
+                ROUTE_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from itertools import count
+from typing import Optional
+
+from cedschedulerapp.master.enums import GPUType
+from cedschedulerapp.master.enums import NodeType
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.schemas import GPUInfo
+from cedschedulerapp.master.schemas import NodeResourceStats
+
+# 与 worker 计算 used_gpu_count 的规则保持一致
+GPU_BUSY_THRESHOLD = 20
+
+
+def normalize_gpu_type(gpu_type: str) -> str:
+    """将 worker 上报的 GPU 名称（如 "Tesla V100-SXM2-32GB"）归一化为 GPUType，无法识别时原样返回"""
+    name = gpu_type.upper()
+    for known in GPUType:
+        if known.value in name:
+            return known.value
+    return gpu_type
+
+
+def is_gpu_free(gpu: GPUInfo) -> bool:
+    memory_ratio = gpu.gpu_memory_used / gpu.gpu_memory_total * 100 if gpu.gpu_memory_total else 0
+    return memory_ratio <= GPU_BUSY_THRESHOLD and gpu.gpu_utilization <= GPU_BUSY_THRESHOLD
+
+
+class NodeRegistry:
+    """
+    节点状态注册表
+
+    在节点状态之外维护按区域、节点类型、GPU 型号以及空闲 GPU 型号的二级索引，
+    每次心跳增量更新。区域、类型、型号都给定时直接命中组合索引，代价与结果规模
+    相关；其余组合从最小的候选集合开始求交集，与集群规模无关。查询结果按节点
+    注册顺序返回，与不带过滤条件时一致。
+    """
+
+    def __init__(self):
+        self.nodes: dict[str, NodeResourceStats] = {}
+        # 节点注册序号，用于按注册顺序返回索引查询结果；节点移除后重新注册时排到最后
+        self.registration_order: dict[str, int] = {}
+        self._registration_counter = count()
+        self.by_region: dict[RegionType, set[str]] = defaultdict(set)
+        self.by_node_type: dict[NodeType, set[str]] = defaultdict(set)
+        self.by_gpu_type: dict[str, set[str]] = defaultdict(set)
+        self.by_free_gpu_type: dict[str, set[str]] = defaultdict(set)
+        self.with_free_gpu: set[str] = set()
+        # (区域, 节点类型, GPU 型号) 组合索引，三个条件都给定时直接命中结果集
+        self.by_profile: dict[tuple[RegionType, NodeType, str], set[str]] = defaultdict(set)
+        self.by_free_profile: dict[tuple[RegionType, NodeType, str], set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def get(self, node_id: str) -> Optional[NodeResourceStats]:
+        return self.nodes.get(node_id)
+
+    def values(self) -> list[NodeResourceStats]:
+        return list(self.nodes.values())
+
+    @staticmethod
+    def _index_keys(node: NodeResourceStats) -> tuple[set[str], set[str]]:
+        gpu_types = set()
+        free_gpu_types = set()
+        for gpu in node.gpu_info:
+            gpu_type = normalize_gpu_type(gpu.gpu_type)
+            gpu_types.add(gpu_type)
+            if is_gpu_free(gpu):
+                free_gpu_types.add(gpu_type)
+        return gpu_types, free_gpu_types
+
+    @staticmethod
+    def _discard(index: dict, key, node_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(node_id)
+            if not ids:
+                del index[key]
+
+    def _unindex(self, node: NodeResourceStats):
+        node_id = node.node_id
+        self._discard(self.by_region, node.region, node_id)
+        self._discard(self.by_node_type, node.node_type, node_id)
+        gpu_types, free_gpu_types = self._index_keys(node)
+        for gpu_type in gpu_types:
+            self._discard(self.by_gpu_type, gpu_type, node_id)
+            self._discard(self.by_profile, (node.region, node.node_type, gpu_type), node_id)
+        for gpu_type in free_gpu_types:
+            self._discard(self.by_free_gpu_type, gpu_type, node_id)
+            self._discard(self.by_free_profile, (node.region, node.node_type, gpu_type), node_id)
+        self.with_free_gpu.discard(node_id)
+
+    def _index(self, node: NodeResourceStats):
+        node_id = node.node_id
+        self.by_region[node.region].add(node_id)
+        self.by_node_type[node.node_type].add(node_id)
+        gpu_types, free_gpu_types = self._index_keys(node)
+        for gpu_type in gpu_types:
+            self.by_gpu_type[gpu_type].add(node_id)
+            self.by_profile[(node.region, node.node_type, gpu_type)].add(node_id)
+        for gpu_type in free_gpu_types:
+            self.by_free_gpu_type[gpu_type].add(node_id)
+            self.by_free_profile[(node.region, node.node_type, gpu_type)].add(node_id)
+        if free_gpu_types:
+            self.with_free_gpu.add(node_id)
+
+    def upsert(self, node: NodeResourceStats) -> Optional[NodeResourceStats]:
+        """写入节点状态并更新索引，返回旧状态"""
+        previous = self.nodes.get(node.node_id)
+        if previous is not None:
+            self._unindex(previous)
+        else:
+            self.registration_order[node.node_id] = next(self._registration_counter)
+        self.nodes[node.node_id] = node
+        self._index(node)
+        return previous
+
+    def remove(self, node_id: str) -> Optional[NodeResourceStats]:
+        node = self.nodes.pop(node_id, None)
+        if node is not None:
+            self._unindex(node)
+            del self.registration_order[node_id]
+        return node
+
+    def _in_registration_order(self, node_ids) -> list[NodeResourceStats]:
+        return [self.nodes[node_id] for node_id in sorted(node_ids, key=self.registration_order.__getitem__)]
+
+    def query(
+        self,
+        region: Optional[RegionType] = None,
+        node_type: Optional[NodeType] = None,
+        gpu_type: Optional[str] = None,
+        free_gpu: bool = False,
+    ) -> list[NodeResourceStats]:
+        """
+        组合条件查询节点
+
+        Args:
+            region: 节点区域，None 或 ALL 表示不限
+            node_type: 节点类型
+            gpu_type: GPU 型号（如 V100），与 free_gpu 组合时要求该型号至少有一块空闲 GPU
+            free_gpu: 是否只返回有空闲 GPU 的节点
+
+        Returns:
+            list[NodeResourceStats]: 节点列表，按节点注册顺序排列
+        """
+        if region is not None and region != RegionType.ALL and node_type is not None and gpu_type is not None:
+            index = self.by_free_profile if free_gpu else self.by_profile
+            node_ids = index.get((region, node_type, normalize_gpu_type(gpu_type)), set())
+            return self._in_registration_order(node_ids)
+
+        candidates: list[set[str]] = []
+        if region is not None and region != RegionType.ALL:
+            candidates.append(self.by_region.get(region, set()))
+        if node_type is not None:
+            candidates.append(self.by_node_type.get(node_type, set()))
+        if gpu_type is not None:
+            index = self.by_free_gpu_type if free_gpu else self.by_gpu_type
+            candidates.append(index.get(normalize_gpu_type(gpu_type), set()))
+        elif free_gpu:
+            candidates.append(self.with_free_gpu)
+
+        if not candidates:
+            return list(self.nodes.values())
+
+        candidates.sort(key=len)
+        smallest, rest = candidates[0], candidates[1:]
+        node_ids = [node_id for node_id in smallest if all(node_id in ids for ids in rest)]
+        return self._in_registration_order(node_ids)
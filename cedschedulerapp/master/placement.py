@@ -0,0 +1,265 @@
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
+
+from cedschedulerapp.master.client.client_type import InstancePlacement
+from cedschedulerapp.master.client.client_type import PlacementHint
+from cedschedulerapp.master.client.client_type import TaskMeta
+from cedschedulerapp.master.enums import GPUPerformance
+from cedschedulerapp.master.enums import GPUType
+from cedschedulerapp.master.enums import PlacementStrategy
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.node_registry import is_gpu_free
+from cedschedulerapp.master.node_registry import normalize_gpu_type
+from cedschedulerapp.master.schemas import NodeResourceStats
+
+GPU_TYPES = list(GPUType)
+GPU_TYPE_INDEX = {gpu_type.value: index for index, gpu_type in enumerate(GPU_TYPES)}
+GPU_PERFORMANCE = {gpu_type: GPUPerformance[f"{gpu_type.value}_PERFORMANCE"].value for gpu_type in GPU_TYPES}
+# 空闲 GPU 上残余负载导致的最低速度比例，避免除零
+MIN_SPEED = 0.05
+# 策略惩罚项相对估计完成时间的权重
+PENALTY_WEIGHT = 0.1
+# 区域亲和策略下其他区域节点的附加代价（秒），只在目标区域无可用节点时才会被选中
+REGION_MISS_COST = 1e9
+
+
+def gpu_runtime(task_runtime: dict[str, float], gpu_type: GPUType) -> float:
+    """任务在指定 GPU 型号上的运行时间，未给出时按 GPUPerformance 从其他型号换算"""
+    runtime = task_runtime.get(gpu_type.value)
+    if runtime is not None:
+        return float(runtime)
+    for known_type, known_runtime in task_runtime.items():
+        if known_type in GPU_TYPE_INDEX:
+            return float(known_runtime) * GPU_PERFORMANCE[GPUType(known_type)] / GPU_PERFORMANCE[gpu_type]
+    return float("inf")
+
+
+class NodeCapacity:
+    """
+    放置引擎使用的列式节点状态
+
+    每个节点一列，空闲 GPU 数和空闲 GPU 的速度比例按 GPU 型号分行，
+    放置过程中直接在数组上扣减，一批任务共享同一份容量视图。
+    """
+
+    def __init__(
+        self,
+        node_ids: list[str],
+        regions: np.ndarray,
+        free_cpu: np.ndarray,
+        free_mem: np.ndarray,
+        gpu_count: np.ndarray,
+        free_gpu: np.ndarray,
+        speed: np.ndarray,
+    ):
+        self.node_ids = node_ids
+        self.regions = regions
+        self.free_cpu = free_cpu
+        self.free_mem = free_mem
+        self.gpu_count = np.maximum(gpu_count, 1)
+        # (GPU 型号, 节点)
+        self.free_gpu = free_gpu
+        # 空闲 GPU 扣除残余利用率后的速度比例，扣减空闲 GPU 时平均利用率不变，无需更新
+        self.speed = speed
+        self.free_gpu_total = free_gpu.sum(axis=0)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[NodeResourceStats], idle: bool = False) -> "NodeCapacity":
+        """
+        Args:
+            nodes: 节点状态
+            idle: 忽略心跳中的使用量，视全部资源为空闲（离线仿真使用）
+        """
+        node_ids = []
+        regions = []
+        free_cpu = []
+        free_mem = []
+        gpu_count = []
+        free_gpu = [[] for _ in GPU_TYPES]
+        free_gpu_util = [[] for _ in GPU_TYPES]
+        for node in nodes:
+            node_ids.append(node.node_id)
+            regions.append(node.region.value)
+            free_cpu.append(node.cpu_count - (0 if idle else node.used_cpu_count))
+            free_mem.append(node.memory_count - (0 if idle else node.used_memory_count))
+            gpu_count.append(len(node.gpu_info))
+            free = [0] * len(GPU_TYPES)
+            util = [0.0] * len(GPU_TYPES)
+            for gpu in node.gpu_info:
+                index = GPU_TYPE_INDEX.get(normalize_gpu_type(gpu.gpu_type))
+                if index is None:
+                    continue
+                if idle:
+                    free[index] += 1
+                elif is_gpu_free(gpu):
+                    free[index] += 1
+                    util[index] += gpu.gpu_utilization
+            for index in range(len(GPU_TYPES)):
+                free_gpu[index].append(free[index])
+                free_gpu_util[index].append(util[index])
+        shape = (len(GPU_TYPES), len(node_ids))
+        free_gpu = np.array(free_gpu, dtype=np.int32).reshape(shape)
+        mean_util = np.array(free_gpu_util, dtype=np.float64).reshape(shape) / np.maximum(free_gpu, 1)
+        return cls(
+            node_ids=node_ids,
+            regions=np.array(regions, dtype=np.int8),
+            free_cpu=np.array(free_cpu, dtype=np.float64),
+            free_mem=np.array(free_mem, dtype=np.float64),
+            gpu_count=np.array(gpu_count, dtype=np.int32),
+            free_gpu=free_gpu,
+            speed=np.maximum(1 - mean_util / 100, MIN_SPEED),
+        )
+
+    def allocate(self, node: int, gpu_index: int, gpu: int, cpu: float, mem: float):
+        self.free_gpu[gpu_index, node] -= gpu
+        self.free_gpu_total[node] -= gpu
+        self.free_cpu[node] -= cpu
+        self.free_mem[node] -= mem
+
+    def release(self, node: int, gpu_index: int, gpu: int, cpu: float, mem: float):
+        self.allocate(node, gpu_index, -gpu, -cpu, -mem)
+
+
+class PlacementEngine:
+    """
+    训练任务放置引擎
+
+    按估计完成时间为候选节点打分：任务在各 GPU 型号上的运行时间由 task_runtime
+    （或 GPUPerformance 换算）给出，再按空闲 GPU 上的残余利用率折算速度。
+    策略只影响惩罚项：
+      - best_fit: 优先放到放置后剩余空闲 GPU 比例最小的节点，减少碎片
+      - spread: 优先放到剩余空闲 GPU 比例最大的节点，分散负载
+      - region_affinity: 在 best_fit 基础上优先请求指定的区域，未指定时与任务的首个实例同区域
+    每个任务对全部节点做一次向量化打分，多实例放置时只对容量变化的节点重新打分，
+    选用的 GPU 型号只对选中的节点计算。
+    """
+
+    def __init__(self, strategy: PlacementStrategy, penalty_weight: float = PENALTY_WEIGHT):
+        self.strategy = strategy
+        self.penalty_weight = penalty_weight
+        self.spread = strategy == PlacementStrategy.Spread
+        self.region_affinity = strategy == PlacementStrategy.RegionAffinity
+
+    def _penalty(self, leftover):
+        return 1 - leftover if self.spread else leftover
+
+    def _score(
+        self,
+        capacity: NodeCapacity,
+        runtimes: list[float],
+        gpu: int,
+        cpu: float,
+        mem: float,
+        region: Optional[RegionType],
+    ) -> np.ndarray:
+        """对全部节点向量化打分，不可行的节点为 inf"""
+        size = len(capacity)
+        if gpu:
+            runtime = np.full(size, np.inf)
+            for index, type_runtime in enumerate(runtimes):
+                if np.isfinite(type_runtime):
+                    type_runtime = np.where(
+                        capacity.free_gpu[index] >= gpu, type_runtime / capacity.speed[index], np.inf
+                    )
+                    np.minimum(runtime, type_runtime, out=runtime)
+            leftover = (capacity.free_gpu_total - gpu) / capacity.gpu_count
+            np.clip(leftover, 0.0, 1.0, out=leftover)
+        else:
+            runtime = np.full(size, min(runtimes))
+            leftover = np.zeros(size)
+        runtime[(capacity.free_cpu < cpu) | (capacity.free_mem < mem)] = np.inf
+
+        score = runtime * (1 + self.penalty_weight * self._penalty(leftover))
+        if self.region_affinity and region is not None:
+            score += (capacity.regions != region.value) * REGION_MISS_COST
+        return score
+
+    def _score_node(
+        self,
+        capacity: NodeCapacity,
+        node: int,
+        runtimes: list[float],
+        gpu: int,
+        cpu: float,
+        mem: float,
+        region: Optional[RegionType],
+    ) -> tuple[float, int, float]:
+        """与 _score 相同的规则为单个节点打分，返回 (得分, GPU 型号下标, 估计完成时间)"""
+        if capacity.free_cpu[node] < cpu or capacity.free_mem[node] < mem:
+            return float("inf"), 0, float("inf")
+        gpu_index = 0
+        if gpu:
+            runtime = float("inf")
+            for index, type_runtime in enumerate(runtimes):
+                if capacity.free_gpu[index, node] >= gpu:
+                    type_runtime = type_runtime / capacity.speed[index, node]
+                    if type_runtime < runtime:
+                        runtime, gpu_index = type_runtime, index
+            leftover = (capacity.free_gpu_total[node] - gpu) / capacity.gpu_count[node]
+            leftover = min(max(leftover, 0.0), 1.0)
+        else:
+            runtime = min(runtimes)
+            leftover = 0.0
+        score = runtime * (1 + self.penalty_weight * self._penalty(leftover))
+        if self.region_affinity and region is not None:
+            score += 0.0 if capacity.regions[node] == region.value else REGION_MISS_COST
+        return float(score), gpu_index, float(runtime)
+
+    def place(
+        self, task: TaskMeta, capacity: NodeCapacity, region: Optional[RegionType] = None
+    ) -> Optional[PlacementHint]:
+        """为任务的每个实例选择节点并扣减容量，无法放下全部实例时回滚并返回 None"""
+        if not len(capacity):
+            return None
+        gpu = task.task_plan_gpu
+        cpu = task.task_plan_cpu
+        mem = task.task_plan_mem
+        runtimes = [gpu_runtime(task.task_runtime, gpu_type) for gpu_type in GPU_TYPES]
+        score = self._score(capacity, runtimes, gpu, cpu, mem, region)
+
+        allocations = []
+        instances = []
+        estimated_runtime = 0.0
+        for inst_id in range(task.task_inst_num):
+            node = int(score.argmin())
+            node_score, index, runtime = self._score_node(capacity, node, runtimes, gpu, cpu, mem, region)
+            if not np.isfinite(node_score):
+                for allocated_node, allocated_index in allocations:
+                    capacity.release(allocated_node, allocated_index, gpu, cpu, mem)
+                return None
+            capacity.allocate(node, index, gpu, cpu, mem)
+            allocations.append((node, index))
+            instances.append(
+                InstancePlacement(
+                    inst_id=inst_id,
+                    node_id=capacity.node_ids[node],
+                    gpu_type=GPU_TYPES[index].value if gpu else "",
+                )
+            )
+            estimated_runtime = max(estimated_runtime, runtime)
+
+            if region is None and self.region_affinity:
+                region = RegionType(int(capacity.regions[node]))
+                score = self._score(capacity, runtimes, gpu, cpu, mem, region)
+            else:
+                # 只有被选中的节点容量发生变化，单独重新打分
+                score[node] = self._score_node(capacity, node, runtimes, gpu, cpu, mem, region)[0]
+
+        return PlacementHint(strategy=self.strategy, instances=instances, estimated_runtime=estimated_runtime)
+
+    def place_all(
+        self,
+        tasks: Sequence[TaskMeta],
+        capacity: NodeCapacity,
+        regions: Optional[Sequence[Optional[RegionType]]] = None,
+    ) -> list[Optional[PlacementHint]]:
+        """按提交顺序依次放置一批任务，后面的任务看到前面任务扣减后的容量"""
+        if regions is None:
+            regions = [None] * len(tasks)
+        return [self.place(task, capacity, region) for task, region in zip(tasks, regions)]
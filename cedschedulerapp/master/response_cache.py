@@ -0,0 +1,126 @@
+import asyncio
+import gzip
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from typing import Any
+from typing import Optional
+
+from fastapi.responses import Response
+
+from cedschedulerapp.master.trace_recorder import encode_payload
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_SIZE = 1024
+# 超过该字节数的响应在线程中压缩，避免阻塞事件循环
+THREAD_COMPRESS_SIZE = 256 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+MAX_ENTRIES = 64
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+
+def _gzip_compress(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def negotiate_encoding(accept_encoding: str, zstd_available: bool) -> str:
+    """按 Accept-Encoding 选择编码，优先 zstd，其次 gzip，q=0 视为不接受"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if zstd_available and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+class EncodedPayload:
+    """一份序列化好的 JSON 响应，各压缩编码在第一次被请求时生成并缓存"""
+
+    def __init__(self, body: bytes, zstd_compressor=None):
+        self.bodies: dict[str, bytes] = {"identity": body}
+        self.zstd_compressor = zstd_compressor
+
+    def __len__(self) -> int:
+        return len(self.bodies["identity"])
+
+    def _compress(self, encoding: str) -> bytes:
+        body = self.bodies["identity"]
+        if encoding == "zstd":
+            return self.zstd_compressor.compress(body)
+        return _gzip_compress(body)
+
+    async def encode(self, encoding: str) -> bytes:
+        body = self.bodies.get(encoding)
+        if body is None:
+            if len(self) >= THREAD_COMPRESS_SIZE:
+                body = await asyncio.to_thread(self._compress, encoding)
+            else:
+                body = self._compress(encoding)
+            self.bodies[encoding] = body
+        return body
+
+    async def to_response(self, accept_encoding: Optional[str]) -> Response:
+        encoding = "identity"
+        if accept_encoding and len(self) >= MIN_COMPRESS_SIZE:
+            encoding = negotiate_encoding(accept_encoding, self.zstd_compressor is not None)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(await self.encode(encoding), media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    按数据版本缓存序列化后的响应
+
+    大列表接口的响应直接从缓存的字节返回，跳过 FastAPI 按 response_model 的
+    校验和重复序列化；数据版本不变时同一份字节（及其压缩结果）被所有请求复用。
+    调用方必须在读取数据之前取得版本号，这样缓存中的数据总是不旧于其版本号，
+    读取期间版本变化最多导致下一次请求重新序列化。
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, tuple[Hashable, EncodedPayload]] = OrderedDict()
+        # 可选依赖，未安装 zstandard 时只提供 gzip
+        self.zstd_compressor = _zstd_compressor()
+
+    def lookup(self, key: Hashable, version: Hashable) -> Optional[EncodedPayload]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def store(self, key: Hashable, version: Hashable, payload: Any) -> EncodedPayload:
+        encoded = EncodedPayload(encode_payload(payload, exclude_none=False), self.zstd_compressor)
+        self.entries[key] = (version, encoded)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return encoded
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> EncodedPayload:
+        """命中时直接返回缓存，否则调用 build() 生成响应对象并序列化"""
+        encoded = self.lookup(key, version)
+        if encoded is None:
+            encoded = self.store(key, version, build())
+        return encoded
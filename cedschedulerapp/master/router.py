@@ -0,0 +1,163 @@
+import random
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from cedschedulerapp.master.client.client_type import InferenceInstanceInfo
+from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.enums import RoutingPolicy
+from cedschedulerapp.master.metrics import ROUTED_REQUESTS
+from cedschedulerapp.master.schemas import InstanceRouteState
+from cedschedulerapp.utils.logger import setup_logger
+
+
+class RoutedInstance:
+    """
+    一个可路由的推理实例
+
+    遥测只在后台刷新时更新，两次刷新之间本地分发和返回的请求按 inflight 的变化
+    叠加到遥测上，避免刷新间隔内的请求全部涌向同一个实例。
+    """
+
+    def __init__(self, instance_id: str, endpoint: str, client: InferenceServerClient):
+        self.instance_id = instance_id
+        self.endpoint = endpoint
+        self.client = client
+        self.telemetry: Optional[InferenceInstanceInfo] = None
+        # 尚未刷新过时假定可用，刷新后以实例列表为准
+        self.available = True
+        self.inflight = 0
+        # 最近一次刷新时的 inflight，之后的变化是遥测还没有反映的部分
+        self.inflight_at_refresh = 0
+        self.routed = ROUTED_REQUESTS.labels(instance_id)
+
+    def update(self, telemetry: Optional[InferenceInstanceInfo]):
+        self.available = telemetry is not None
+        if telemetry is not None:
+            self.telemetry = telemetry
+        self.inflight_at_refresh = self.inflight
+
+    @property
+    def pending(self) -> int:
+        return self.inflight - self.inflight_at_refresh
+
+    @property
+    def load(self) -> int:
+        """估计的运行中和排队请求总数"""
+        reported = 0
+        if self.telemetry is not None:
+            reported = self.telemetry.running_request_count + self.telemetry.waiting_request_count
+        return max(0, reported + self.pending)
+
+    @property
+    def waiting(self) -> int:
+        reported = self.telemetry.waiting_request_count if self.telemetry is not None else 0
+        return max(0, reported + self.pending)
+
+    @property
+    def free_blocks(self) -> float:
+        """估计的剩余 KV cache 块数，新分发的请求按当前运行请求的平均块数扣除"""
+        telemetry = self.telemetry
+        if telemetry is None:
+            return 0.0
+        running = telemetry.running_request_count
+        blocks_per_request = telemetry.used_gpu_blocks_count / running if running else 0.0
+        return (
+            telemetry.total_gpu_blocks_count
+            - telemetry.used_gpu_blocks_count
+            - telemetry.waiting_gpu_blocks_count
+            - self.pending * blocks_per_request
+        )
+
+    def to_state(self) -> InstanceRouteState:
+        telemetry = self.telemetry
+        return InstanceRouteState(
+            instance_id=self.instance_id,
+            endpoint=self.endpoint,
+            available=self.available,
+            circuit_state=self.client.circuit_breaker.state,
+            running_request_count=telemetry.running_request_count if telemetry else 0,
+            waiting_request_count=telemetry.waiting_request_count if telemetry else 0,
+            total_gpu_blocks_count=telemetry.total_gpu_blocks_count if telemetry else 0,
+            used_gpu_blocks_count=telemetry.used_gpu_blocks_count if telemetry else 0,
+            inflight=self.inflight,
+            load=self.load,
+            routed_count=int(self.routed.value),
+        )
+
+
+class InferenceRouter:
+    """
+    按实例负载分发推理请求
+
+    实例 ID 到地址的映射来自配置，每个实例使用独立的客户端（连接池和熔断器）。
+    没有配置实例、或所有实例都不在实例列表中或处于熔断时，route() 返回 None，
+    调用方退回到推理服务的统一入口。
+    """
+
+    def __init__(
+        self,
+        endpoints: dict[str, tuple[str, int]],
+        policy: RoutingPolicy,
+        client_factory: Callable[[str, int], InferenceServerClient],
+    ):
+        self.policy = policy
+        self.instances: dict[str, RoutedInstance] = {
+            instance_id: RoutedInstance(instance_id, f"{host}:{port}", client_factory(host, port))
+            for instance_id, (host, port) in endpoints.items()
+        }
+        self.unmapped: set[str] = set()
+        self.logger = setup_logger(__name__)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.instances)
+
+    def update(self, instances: list[InferenceInstanceInfo]):
+        """用最新的实例列表刷新遥测，列表中没有的实例不再参与路由"""
+        telemetry = {instance.instance_id: instance for instance in instances}
+        for instance_id, instance in self.instances.items():
+            instance.update(telemetry.get(instance_id))
+        unmapped = telemetry.keys() - self.instances.keys()
+        if unmapped - self.unmapped:
+            self.logger.warning(f"Inference instances without configured endpoint: {sorted(unmapped)}")
+        self.unmapped = unmapped
+
+    def select(self) -> Optional[RoutedInstance]:
+        # 熔断中的实例暂不参与，到达探测时间后重新参与，由熔断器放行探测请求
+        candidates = [
+            instance
+            for instance in self.instances.values()
+            if instance.available and instance.client.circuit_breaker.accepting
+        ]
+        if not candidates:
+            return None
+        if self.policy == RoutingPolicy.PowerOfTwo:
+            if len(candidates) > 2:
+                candidates = random.sample(candidates, 2)
+            return min(candidates, key=lambda instance: instance.load)
+        if self.policy == RoutingPolicy.FreeKV:
+            return min(candidates, key=lambda instance: (-instance.free_blocks, instance.load))
+        return min(candidates, key=lambda instance: (instance.waiting, instance.load))
+
+    @contextmanager
+    def route(self) -> Iterator[Optional[RoutedInstance]]:
+        """选择实例并在请求期间计入其 inflight"""
+        instance = self.select()
+        if instance is None:
+            yield None
+            return
+        instance.inflight += 1
+        instance.routed.inc()
+        try:
+            yield instance
+        finally:
+            instance.inflight -= 1
+
+    def states(self) -> list[InstanceRouteState]:
+        return [instance.to_state() for instance in self.instances.values()]
+
+    async def close(self):
+        for instance in self.instances.values():
+            await instance.client.close()
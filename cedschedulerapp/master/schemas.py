@@ -6,10 +6,17 @@ from typing import TypeVar
 from pydantic import BaseModel
 
 from cedschedulerapp.master.client.client_type import InferenceInstanceInfo
+from cedschedulerapp.master.client.client_type import scale_task_runtime
 from cedschedulerapp.master.client.client_type import ScheduleInfo
+from cedschedulerapp.master.client.client_type import TaskMeta
 from cedschedulerapp.master.client.client_type import TaskWrapRuntimeInfo
+from cedschedulerapp.master.enums import ArrivalPattern
+from cedschedulerapp.master.enums import CircuitState
+from cedschedulerapp.master.enums import LoadTestTarget
+from cedschedulerapp.master.enums import NodeLiveness
 from cedschedulerapp.master.enums import NodeType
 from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.enums import SubmissionStatus
 from cedschedulerapp.master.enums import TaskInstStatus
 from cedschedulerapp.master.enums import TaskStatus
 
@@ -20,6 +27,8 @@ class APIResponse(BaseModel, Generic[T]):
     code: int = 200
     message: str = "success"
     data: Optional[T] = None
+    # 上游不可用时返回的是最近一次成功获取的数据
+    stale: bool = False
 
 
 class GPUInfo(BaseModel):
@@ -46,6 +55,51 @@ class NodeResourceStats(BaseModel):
     gpu_info: list[GPUInfo]
 
 
+class NodeStatusInfo(NodeResourceStats):
+    liveness: NodeLiveness
+    # 最近一次心跳的时间戳
+    last_seen: float
+
+
+class GPUHistory(BaseModel):
+    gpu_id: str
+    gpu_type: str
+    gpu_memory_used: list[float]
+    gpu_utilization: list[float]
+
+
+class NodeHistoryResponse(BaseModel):
+    node_id: str
+    # 时间槽长度（秒），每个取值为该时间槽内样本的平均值
+    resolution: int
+    # 时间槽起始时间戳，没有样本的时间槽不返回
+    timestamps: list[float]
+    used_cpu_count: list[float]
+    used_memory_count: list[float]
+    used_storage_count: list[float]
+    gpus: list[GPUHistory]
+
+
+class NodeResourceStatsDelta(BaseModel):
+    """增量心跳：只包含相对上一次心跳发生变化的字段"""
+
+    node_id: str
+    # 自上次全量心跳以来的序号，全量心跳为 0，增量从 1 开始
+    seq: int
+    node_ip: Optional[str] = None
+    region: Optional[RegionType] = None
+    node_type: Optional[NodeType] = None
+    cpu_count: Optional[int] = None
+    gpu_count: Optional[int] = None
+    memory_count: Optional[int] = None
+    storage_count: Optional[int] = None
+    used_cpu_count: Optional[int] = None
+    used_gpu_count: Optional[int] = None
+    used_memory_count: Optional[int] = None
+    used_storage_count: Optional[int] = None
+    gpu_info: Optional[list[GPUInfo]] = None
+
+
 class TrainingTaskDetail(BaseModel):
     task_id: str
     task_name: str
@@ -114,6 +168,23 @@ class InferenceService(BaseModel):
         )
 
 
+class InstanceRouteState(BaseModel):
+    instance_id: str
+    endpoint: str
+    # 最近一次实例列表中是否存在该实例
+    available: bool
+    circuit_state: CircuitState
+    running_request_count: int
+    waiting_request_count: int
+    total_gpu_blocks_count: int
+    used_gpu_blocks_count: int
+    # 本 master 已分发、尚未返回的请求数
+    inflight: int
+    # 路由使用的估计负载
+    load: float
+    routed_count: int
+
+
 class ResourceStats(BaseModel):
     cloud_node_count: int
     edge_node_count: int
@@ -137,6 +208,30 @@ class SubmitTaskRequest(BaseModel):
     plan_gpu: int
     runtime: int
     fs_files: list[str]
+    # 区域亲和放置策略优先选择的区域
+    region: Optional[RegionType] = None
+
+    def to_task_meta(self, task_id: str, start_time: float) -> TaskMeta:
+        return TaskMeta(
+            task_id=task_id,
+            task_name=self.task_name,
+            task_inst_num=self.inst_num,
+            task_plan_cpu=float(self.plan_cpu),
+            task_plan_mem=float(self.plan_mem),
+            task_plan_gpu=self.plan_gpu,
+            task_status=TaskStatus.Submitted,
+            task_start_time=start_time,
+            task_runtime=scale_task_runtime(self.runtime),
+        )
+
+
+class TaskSubmissionState(BaseModel):
+    task_id: str
+    task_name: str
+    status: SubmissionStatus
+    attempts: int = 0
+    error: Optional[str] = None
+    updated_at: float
 
 
 class TaskLogResponse(BaseModel):
@@ -144,7 +239,17 @@ class TaskLogResponse(BaseModel):
     logs: dict[int, str]
 
 
-class RequestSubmitRequest(BaseModel):
+class SamplingOverrides(BaseModel):
+    # 未指定的采样参数使用推理客户端的默认值
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+    def sampling_params(self) -> dict:
+        return self.model_dump(include={"temperature", "top_p", "max_tokens"}, exclude_none=True)
+
+
+class RequestSubmitRequest(SamplingOverrides):
     message: str
 
 
@@ -153,6 +258,23 @@ class BenchmarkRequest(BaseModel):
     qps: float
 
 
+class LoadTestRequest(SamplingOverrides):
+    # prompt 数据集，按顺序循环使用
+    prompts: list[str]
+    # 各 prompt 的 token 数，不提供时按空白分词估计
+    prompt_lens: Optional[list[int]] = None
+    # 请求总数，默认为数据集大小；trace 模式下为到达时间个数
+    num_prompts: Optional[int] = None
+    pattern: ArrivalPattern = ArrivalPattern.Poisson
+    # poisson 和 constant 模式的平均请求速率
+    qps: Optional[float] = None
+    # trace 模式下各请求的到达时间（秒），只使用相对间隔
+    arrival_times: Optional[list[float]] = None
+    target: LoadTestTarget = LoadTestTarget.Chat
+    # poisson 模式的随机种子，相同种子得到相同的到达序列
+    seed: Optional[int] = None
+
+
 class BenchmarkProgressResponse(BaseModel):
     total: int
     completed: int
@@ -165,9 +287,68 @@ class BenchmarkResultResponse(BaseModel):
     prefill_latencies: list[float]
 
 
+class HistogramSummary(BaseModel):
+    bin_edges: list[float]
+    counts: list[int]
+
+
+class MetricSummary(BaseModel):
+    count: int
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+    histogram: HistogramSummary
+
+
+class BenchmarkSummaryResponse(BaseModel):
+    benchmark_id: str
+    is_complete: bool = False
+    num_requests: int
+    # 估算的墙钟时长（秒）及吞吐
+    duration: float
+    request_throughput: float
+    output_token_throughput: float
+    total_token_throughput: float
+    prompt_lens: MetricSummary
+    response_lens: MetricSummary
+    end_to_end_latencies: MetricSummary
+    prefill_latencies: MetricSummary
+    # 每个请求的输出 token 数 / 端到端延迟
+    output_token_rates: MetricSummary
+
+
 class BenchmarkHistory(BaseModel):
     benchmark_id: str
     timestamp: float
     qps: float
     num_prompts: int
+    is_complete: bool = False
     results: BenchmarkResultResponse
+
+
+class BenchmarkProgressEvent(BenchmarkProgressResponse):
+    benchmark_id: str
+
+
+class TaskStatusTransition(BaseModel):
+    task_id: str
+    task_name: str
+    # 新出现的任务为 None
+    previous_status: Optional[TaskStatus] = None
+    status: TaskStatus
+
+
+class NodeRemovedEvent(BaseModel):
+    node_id: str
+
+
+class DashboardSnapshot(BaseModel):
+    resources: ResourceStats
+    nodes: list[NodeStatusInfo]
+    tasks: list[TrainingTaskDetail]
+    instances: list[InferenceInstanceInfo]
+    benchmarks: list[BenchmarkProgressEvent]
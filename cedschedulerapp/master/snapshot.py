@@ -0,0 +1,85 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Snapshot(Generic[T]):
+    version: int
+    data: T
+    updated_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.updated_at
+
+
+class VersionedSnapshot(Generic[T]):
+    """
+    带版本号的快照缓存
+
+    后台轮询通过 refresh() 写入新快照；读取方通过 get() 获取，
+    快照超过 max_age 时会触发一次刷新，并发的读取方共享同一个进行中的上游请求。
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[T]], max_age: float):
+        self.fetch = fetch
+        self.max_age = max_age
+        self.snapshot: Optional[Snapshot[T]] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version if self.snapshot is not None else 0
+
+    def is_fresh(self) -> bool:
+        return self.snapshot is not None and self.snapshot.age <= self.max_age
+
+    def set(self, data: T) -> Snapshot[T]:
+        self.snapshot = Snapshot(
+            version=self.version + 1, data=data, updated_at=time.monotonic()
+        )
+        return self.snapshot
+
+    async def refresh(self) -> Snapshot[T]:
+        """拉取一次上游数据，已有进行中的请求时直接复用其结果"""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # shield 保证单个调用方被取消时不会取消其他调用方共享的请求
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> Snapshot[T]:
+        try:
+            return self.set(await self.fetch())
+        finally:
+            self._inflight = None
+
+    async def get(self) -> T:
+        if self.is_fresh():
+            return self.snapshot.data
+        return (await self.refresh()).data
+
+    async def get_or_stale(self, wait: Optional[float] = None) -> tuple[T, bool]:
+        """
+        与 get() 相同，但刷新失败时返回最近一次成功的快照，第二个返回值表示快照已过期
+
+        Args:
+            wait: 已有快照时最多等待刷新的秒数，超时先返回旧快照，刷新在后台继续
+        """
+        if self.is_fresh():
+            return self.snapshot.data, False
+        try:
+            if self.snapshot is None or wait is None:
+                return (await self.refresh()).data, False
+            return (await asyncio.wait_for(self.refresh(), wait)).data, False
+        except Exception:
+            if self.snapshot is None:
+                raise
+            return self.snapshot.data, True
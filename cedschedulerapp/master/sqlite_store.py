@@ -0,0 +1,29 @@
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """
+    master 本地 SQLite 存储的基类
+
+    打开数据库（必要时创建所在目录）并执行子类 schema 中的建表语句。连接可在
+    asyncio.to_thread 的工作线程中使用，所有访问都需持有 self.lock。
+    """
+
+    # 建表及建索引语句，按顺序执行
+    schema: tuple[str, ...] = ()
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            for statement in self.schema:
+                self.conn.execute(statement)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Optional
+
+from cedschedulerapp.master.client.base_client import UpstreamNotSentError
+from cedschedulerapp.master.client.client_type import TaskMeta
+from cedschedulerapp.master.client.resilience import backoff_delay
+from cedschedulerapp.master.enums import SubmissionStatus
+from cedschedulerapp.master.schemas import TaskSubmissionState
+from cedschedulerapp.utils.logger import setup_logger
+
+
+class RateLimiter:
+    """令牌桶限流，rate 为每秒允许的请求数，<= 0 表示不限流"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SubmissionPipeline:
+    """
+    训练任务后台提交流水线
+
+    enqueue() 立即返回任务ID，由固定数量的后台协程按限流速率提交，
+    每个任务的提交状态可通过 get_states() 查询。训练服务的提交接口不是幂等的，
+    只有请求没有发送出去（submit 抛出 UpstreamNotSentError）时才按指数退避重试；
+    请求发出后超时或返回错误时任务可能已经创建，直接标记为失败，避免重复创建任务。
+
+    队列和限流器在 start() 中创建：Python 3.9 的 asyncio 原语在创建时绑定
+    当前的事件循环，导入时创建会绑定到 uvicorn 之外的循环。
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[TaskMeta], Awaitable[Optional[dict]]],
+        concurrency: int = 8,
+        rate: float = 20.0,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        max_history: int = 10000,
+    ):
+        self.submit = submit
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.max_history = max_history
+        self.rate = rate
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.queue: Optional[asyncio.Queue[TaskMeta]] = None
+        self.states: OrderedDict[str, TaskSubmissionState] = OrderedDict()
+        self.workers: list[asyncio.Task] = []
+        self.logger = setup_logger(__name__)
+
+    def start(self):
+        """在运行中的事件循环内创建队列、限流器和提交协程"""
+        self.queue = asyncio.Queue()
+        self.rate_limiter = RateLimiter(self.rate)
+        for _ in range(self.concurrency):
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def close(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+    def contains(self, task_id: str) -> bool:
+        return task_id in self.states
+
+    def enqueue(self, task_metas: list[TaskMeta]) -> list[str]:
+        if self.queue is None:
+            raise RuntimeError("Submission pipeline is not started")
+        for task_meta in task_metas:
+            self.states[task_meta.task_id] = TaskSubmissionState(
+                task_id=task_meta.task_id,
+                task_name=task_meta.task_name,
+                status=SubmissionStatus.Queued,
+                updated_at=time.time(),
+            )
+            self.queue.put_nowait(task_meta)
+        self._evict_history()
+        return [task_meta.task_id for task_meta in task_metas]
+
+    def get_states(
+        self, task_ids: Optional[list[str]] = None
+    ) -> list[TaskSubmissionState]:
+        if not task_ids:
+            return list(self.states.values())
+        return [self.states[task_id] for task_id in task_ids if task_id in self.states]
+
+    def _evict_history(self):
+        # 只淘汰已经结束的最早记录，排队中的任务状态必须保留
+        overflow = len(self.states) - self.max_history
+        if overflow <= 0:
+            return
+        for task_id in list(self.states):
+            if overflow <= 0:
+                break
+            if self.states[task_id].status in (
+                SubmissionStatus.Submitted,
+                SubmissionStatus.Failed,
+            ):
+                del self.states[task_id]
+                overflow -= 1
+
+    def _update_state(self, task_id: str, **kwargs):
+        state = self.states.get(task_id)
+        if state is None:
+            return
+        for key, value in kwargs.items():
+            setattr(state, key, value)
+        state.updated_at = time.time()
+
+    async def _worker(self):
+        while True:
+            task_meta = await self.queue.get()
+            try:
+                await self._submit_with_retry(task_meta)
+            except Exception as e:
+                self.logger.error(f"Error submitting task {task_meta.task_id}: {e}")
+                self._update_state(
+                    task_meta.task_id, status=SubmissionStatus.Failed, error=str(e)
+                )
+            finally:
+                self.queue.task_done()
+
+    async def _submit_with_retry(self, task_meta: TaskMeta):
+        task_id = task_meta.task_id
+        for attempt in range(1, self.max_retries + 2):
+            await self.rate_limiter.acquire()
+            self._update_state(
+                task_id, status=SubmissionStatus.Submitting, attempts=attempt
+            )
+            try:
+                response = await self.submit(task_meta)
+            except UpstreamNotSentError as e:
+                self._update_state(task_id, error=str(e))
+            else:
+                if response is not None:
+                    self._update_state(task_id, status=SubmissionStatus.Submitted, error=None)
+                else:
+                    self._update_state(
+                        task_id,
+                        status=SubmissionStatus.Failed,
+                        error="Submit request failed, the task may or may not have been created",
+                    )
+                return
+            if attempt <= self.max_retries:
+                delay = backoff_delay(
+                    attempt, self.retry_backoff, self.max_retry_backoff
+                )
+                self.logger.warning(
+                    f"Submit task {task_id} failed (attempt {attempt}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+        self._update_state(
+            task_id,
+            status=SubmissionStatus.Failed,
+            error=f"Submit failed after {self.max_retries + 1} attempts",
+        )
@@ -0,0 +1,172 @@
+from array import array
+from typing import Optional
+
+from cedschedulerapp.master.schemas import GPUHistory
+from cedschedulerapp.master.schemas import NodeHistoryResponse
+from cedschedulerapp.master.schemas import NodeResourceStats
+
+# (分辨率秒数, 保留秒数)，由细到粗
+HISTORY_TIERS = ((5, 3600), (60, 6 * 3600), (900, 24 * 3600))
+# 节点级序列: 已用 CPU、内存、存储；之后每块 GPU 两条序列: 已用显存、利用率
+NODE_SERIES = 3
+GPU_SERIES = 2
+
+
+def sample_values(stats: NodeResourceStats) -> list[float]:
+    values = [stats.used_cpu_count, stats.used_memory_count, stats.used_storage_count]
+    for gpu in stats.gpu_info:
+        values.append(gpu.gpu_memory_used)
+        values.append(gpu.gpu_utilization)
+    return values
+
+
+class HistoryTier:
+    """
+    单一分辨率的环形缓冲
+
+    每个时间槽连续存放一个节点全部序列的 float32 值，slots 记录每个位置当前
+    保存的是哪个时间槽，位置被新时间槽覆盖或从未写入时查询自动跳过。
+    当前时间槽内的多个样本取平均，写入时直接更新，查询能看到未结束的时间槽。
+    """
+
+    def __init__(self, resolution: int, retention: int, width: int):
+        self.resolution = resolution
+        self.capacity = max(retention // resolution, 1)
+        self.width = width
+        self.slots = array("q", [-1]) * self.capacity
+        self.values = array("f", bytes(4 * self.capacity * width))
+        self.current_slot = -1
+        self.count = 0
+        self.sums = [0.0] * width
+
+    def add(self, timestamp: float, values: list[float]):
+        slot = int(timestamp // self.resolution)
+        if slot < self.current_slot:
+            # 时钟回拨的样本只计入最新时间槽之前，直接丢弃
+            return
+        if slot != self.current_slot:
+            self.current_slot = slot
+            self.count = 0
+            self.sums = [0.0] * self.width
+        self.count += 1
+        self.sums = [total + value for total, value in zip(self.sums, values)]
+        pos = slot % self.capacity
+        self.slots[pos] = slot
+        self.values[pos * self.width:(pos + 1) * self.width] = array("f", [total / self.count for total in self.sums])
+
+    def query(self, start: float, end: float) -> tuple[list[float], list[list[float]]]:
+        """返回 [start, end] 内有数据的时间槽起始时间，以及每条序列的取值"""
+        first = max(int(start // self.resolution), self.current_slot - self.capacity + 1)
+        last = min(int(end // self.resolution), self.current_slot)
+        timestamps = []
+        columns: list[list[float]] = [[] for _ in range(self.width)]
+        for slot in range(first, last + 1):
+            pos = slot % self.capacity
+            if self.slots[pos] != slot:
+                continue
+            timestamps.append(float(slot * self.resolution))
+            row = self.values[pos * self.width:(pos + 1) * self.width]
+            for column, value in zip(columns, row):
+                column.append(value)
+        return timestamps, columns
+
+    @property
+    def nbytes(self) -> int:
+        return self.slots.itemsize * len(self.slots) + self.values.itemsize * len(self.values)
+
+
+class NodeHistory:
+    def __init__(self, stats: NodeResourceStats, tiers=HISTORY_TIERS):
+        self.gpus = [(gpu.gpu_id, gpu.gpu_type) for gpu in stats.gpu_info]
+        width = NODE_SERIES + GPU_SERIES * len(self.gpus)
+        self.tiers = [HistoryTier(resolution, retention, width) for resolution, retention in tiers]
+
+    def matches(self, stats: NodeResourceStats) -> bool:
+        return len(stats.gpu_info) == len(self.gpus) and all(
+            gpu.gpu_id == gpu_id for gpu, (gpu_id, _) in zip(stats.gpu_info, self.gpus)
+        )
+
+    def add(self, timestamp: float, stats: NodeResourceStats):
+        values = sample_values(stats)
+        for tier in self.tiers:
+            tier.add(timestamp, values)
+
+    def select_tier(self, start: float, now: float, resolution: Optional[int]) -> HistoryTier:
+        """指定分辨率时使用对应层级，否则选择保留时间覆盖 start 的最细层级"""
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.resolution == resolution:
+                    return tier
+            raise ValueError(
+                f"Unsupported resolution {resolution}, expected one of {[tier.resolution for tier in self.tiers]}"
+            )
+        for tier in self.tiers:
+            if now - start <= tier.resolution * tier.capacity:
+                return tier
+        return self.tiers[-1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tier.nbytes for tier in self.tiers)
+
+
+class NodeHistoryStore:
+    """
+    节点及 GPU 利用率历史
+
+    每个节点按 HISTORY_TIERS 预先分配固定大小的 float32 环形缓冲，心跳时同时写入
+    各层级，内存只与节点数和 GPU 数相关，不随运行时间增长。节点被移除时释放，
+    GPU 列表变化时重新分配。
+    """
+
+    def __init__(self, tiers=HISTORY_TIERS):
+        self.tiers = tiers
+        self.nodes: dict[str, NodeHistory] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def record(self, timestamp: float, stats: NodeResourceStats):
+        history = self.nodes.get(stats.node_id)
+        if history is None or not history.matches(stats):
+            history = self.nodes[stats.node_id] = NodeHistory(stats, self.tiers)
+        history.add(timestamp, stats)
+
+    def remove(self, node_id: str):
+        self.nodes.pop(node_id, None)
+
+    def query(
+        self,
+        node_id: str,
+        start: float,
+        end: float,
+        now: float,
+        resolution: Optional[int] = None,
+    ) -> Optional[NodeHistoryResponse]:
+        history = self.nodes.get(node_id)
+        if history is None:
+            return None
+        tier = history.select_tier(start, now, resolution)
+        timestamps, columns = tier.query(start, end)
+        return NodeHistoryResponse(
+            node_id=node_id,
+            resolution=tier.resolution,
+            timestamps=timestamps,
+            used_cpu_count=columns[0],
+            used_memory_count=columns[1],
+            used_storage_count=columns[2],
+            gpus=[
+                GPUHistory(
+                    gpu_id=gpu_id,
+                    gpu_type=gpu_type,
+                    gpu_memory_used=columns[NODE_SERIES + GPU_SERIES * index],
+                    gpu_utilization=columns[NODE_SERIES + GPU_SERIES * index + 1],
+                )
+                for index, (gpu_id, gpu_type) in enumerate(history.gpus)
+            ],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """环形缓冲占用的字节数"""
+        return sum(history.nbytes for history in self.nodes.values())
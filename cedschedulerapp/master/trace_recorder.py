@@ -0,0 +1,173 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.utils.logger import setup_logger
+
+TRACE_MAGIC = b"CEDTRACE"
+TRACE_VERSION = 1
+FILE_HEADER = struct.Struct("<8sH")
+# 时间戳(f64) + 记录类型(u8，最高位表示 zlib 压缩) + 负载长度(u32)
+FRAME_HEADER = struct.Struct("<dBI")
+COMPRESSED_FLAG = 0x80
+# 超过该大小的负载使用 zlib 压缩（上游任务列表通常较大）
+COMPRESS_THRESHOLD = 1024
+
+
+class TraceFormatError(Exception):
+    """轨迹文件格式错误"""
+
+
+@dataclass
+class TraceFrame:
+    timestamp: float
+    kind: TraceRecordType
+    payload: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.payload)
+
+
+def encode_payload(payload: Any, exclude_none: bool = True) -> bytes:
+    """将 bytes、pydantic 模型、模型列表或普通 JSON 对象编码为紧凑的 JSON"""
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json(exclude_none=exclude_none).encode()
+    if isinstance(payload, list) and all(isinstance(item, BaseModel) for item in payload):
+        return b"[" + b",".join(item.model_dump_json(exclude_none=exclude_none).encode() for item in payload) + b"]"
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_frame(timestamp: float, kind: TraceRecordType, payload: bytes) -> bytes:
+    flags = int(kind)
+    if len(payload) > COMPRESS_THRESHOLD:
+        payload = zlib.compress(payload, 1)
+        flags |= COMPRESSED_FLAG
+    return FRAME_HEADER.pack(timestamp, flags, len(payload)) + payload
+
+
+def read_trace_frames(path: str) -> Iterator[TraceFrame]:
+    """顺序读取轨迹记录，末尾写了一半的记录（进程异常退出）会被忽略"""
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise TraceFormatError(f"{path}: missing trace header")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise TraceFormatError(f"{path}: unsupported trace file")
+        while True:
+            frame_header = f.read(FRAME_HEADER.size)
+            if len(frame_header) < FRAME_HEADER.size:
+                return
+            timestamp, flags, length = FRAME_HEADER.unpack(frame_header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if flags & COMPRESSED_FLAG:
+                payload = zlib.decompress(payload)
+            yield TraceFrame(timestamp=timestamp, kind=TraceRecordType(flags & ~COMPRESSED_FLAG), payload=payload)
+
+
+def is_trace_file(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+
+
+class TraceRecorder:
+    """
+    追加写入的二进制轨迹记录器
+
+    请求路径只把 (时间戳, 类型, 负载) 放入有界队列，序列化、压缩和写盘都在
+    后台线程中按批完成；队列满时丢弃记录并计数，不阻塞请求。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_pending: int = 100000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.thread = None
+        self.file = None
+        self.logger = setup_logger(__name__)
+
+    def start(self):
+        if self.thread is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 在调用线程中打开文件，路径或格式错误在启动时暴露
+        self.file = self._open()
+        self.thread = threading.Thread(target=self._run, name="trace-recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, kind: TraceRecordType, payload: Any):
+        try:
+            self.queue.put_nowait((time.time(), kind, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self):
+        f = open(self.path, "ab")
+        if f.tell() == 0:
+            f.write(FILE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION))
+        elif not is_trace_file(self.path):
+            f.close()
+            raise TraceFormatError(f"{self.path} exists and is not a trace file")
+        return f
+
+    def _run(self):
+        with self.file as f:
+            stopping = False
+            while not stopping:
+                try:
+                    items = [self.queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(items) < self.batch_size:
+                    try:
+                        items.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                frames = []
+                for item in items:
+                    if item is None:
+                        stopping = True
+                        continue
+                    timestamp, kind, payload = item
+                    try:
+                        frames.append(encode_frame(timestamp, kind, encode_payload(payload)))
+                    except (TypeError, ValueError) as e:
+                        self.logger.error(f"Failed to encode {kind.name} trace record: {e}")
+                f.write(b"".join(frames))
+                f.flush()
+                self.written += len(frames)
+
+    def close(self):
+        if self.thread is None:
+            return
+        # 队列已满时哨兵也要送达，这里允许阻塞
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.dropped:
+            self.logger.warning(f"Trace recorder dropped {self.dropped} records")
@@ -0,0 +1,53 @@
+import argparse
+from dataclasses import dataclass
+
+
+@dataclass
+class ReplayConfig:
+    trace: str = ""
+    master_host: str = "127.0.0.1"
+    master_port: int = 8000
+    speed: float = 1.0
+    concurrency: int = 8
+    stand_in_host: str = "127.0.0.1"
+    training_port: int = 5000
+    inference_port: int = 5001
+
+
+def parse_args() -> ReplayConfig:
+    parser = argparse.ArgumentParser(description="CedScheduler Trace Replay")
+    parser.add_argument("--trace", type=str, required=True, help="master --record-trace 记录的轨迹文件路径")
+    parser.add_argument("--master-host", type=str, default="127.0.0.1", help="Master主机地址 (默认: 127.0.0.1)")
+    parser.add_argument("--master-port", type=int, default=8000, help="Master端口号 (默认: 8000)")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速，如 1、10，<=0 表示不等待全速回放 (默认: 1)")
+    parser.add_argument("--concurrency", type=int, default=8, help="发往 master 的最大并发请求数 (默认: 8)")
+    parser.add_argument(
+        "--stand-in-host", type=str, default="127.0.0.1", help="本地替身上游服务监听地址 (默认: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--training-port",
+        type=int,
+        default=5000,
+        help="替身训练服务端口，master 的 --training-port 需指向它 (默认: 5000)",
+    )
+    parser.add_argument(
+        "--inference-port",
+        type=int,
+        default=5001,
+        help="替身推理服务端口，master 的 --inference-port 需指向它 (默认: 5001)",
+    )
+
+    args = parser.parse_args()
+    return ReplayConfig(
+        trace=args.trace,
+        master_host=args.master_host,
+        master_port=args.master_port,
+        speed=args.speed,
+        concurrency=args.concurrency,
+        stand_in_host=args.stand_in_host,
+        training_port=args.training_port,
+        inference_port=args.inference_port,
+    )
+
+
+replay_config = parse_args()
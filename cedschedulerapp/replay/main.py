@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+from array import array
+from collections import Counter
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from cedschedulerapp.master.benchmark_stats import summarize_metric
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.trace_recorder import read_trace_frames
+from cedschedulerapp.master.trace_recorder import TraceFrame
+from cedschedulerapp.replay.args import replay_config
+from cedschedulerapp.replay.upstreams import create_inference_app
+from cedschedulerapp.replay.upstreams import create_training_app
+from cedschedulerapp.replay.upstreams import UpstreamState
+
+# 需要发往 master 的记录类型及对应端点
+MASTER_ENDPOINTS = {
+    TraceRecordType.Heartbeat: "/node/heartbeat",
+    TraceRecordType.HeartbeatDelta: "/node/heartbeat/delta",
+    TraceRecordType.Submit: "/training/task_submit",
+}
+
+
+class ReplayStats:
+    def __init__(self):
+        self.latencies: dict[TraceRecordType, array] = defaultdict(lambda: array("d"))
+        # (记录类型, 响应码)，请求失败记为 0
+        self.codes: Counter = Counter()
+
+    def add(self, kind: TraceRecordType, latency: float, code: int):
+        self.latencies[kind].append(latency)
+        self.codes[(kind, code)] += 1
+
+    def format(self) -> str:
+        lines = [f"{'record':<16}{'count':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}  codes"]
+        for kind, latencies in self.latencies.items():
+            summary = summarize_metric(latencies, bins=1)
+            codes = ", ".join(f"{code}: {count}" for (k, code), count in sorted(self.codes.items()) if k == kind)
+            lines.append(
+                f"{kind.name:<16}{summary.count:>8}{summary.p50 * 1000:>10.1f}{summary.p99 * 1000:>10.1f}"
+                f"{summary.max * 1000:>10.1f}  {codes}"
+            )
+        return "\n".join(lines)
+
+
+async def start_server(app: FastAPI, host: str, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def send(
+    client: httpx.AsyncClient,
+    frame: TraceFrame,
+    stats: ReplayStats,
+    semaphore: asyncio.Semaphore,
+    previous: Optional[asyncio.Task] = None,
+):
+    try:
+        # 同一节点的心跳按记录顺序发送，避免增量心跳乱序触发重同步
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                MASTER_ENDPOINTS[frame.kind],
+                content=frame.payload,
+                headers={"Content-Type": "application/json"},
+            )
+            code = response.json().get("code", response.status_code)
+        except (httpx.HTTPError, ValueError):
+            code = 0
+        stats.add(frame.kind, time.perf_counter() - started, code)
+    finally:
+        semaphore.release()
+
+
+async def replay() -> ReplayStats:
+    state = UpstreamState()
+    servers = [
+        await start_server(create_training_app(state), replay_config.stand_in_host, replay_config.training_port),
+        await start_server(create_inference_app(state), replay_config.stand_in_host, replay_config.inference_port),
+    ]
+    client = httpx.AsyncClient(
+        base_url=f"http://{replay_config.master_host}:{replay_config.master_port}",
+        limits=httpx.Limits(max_connections=replay_config.concurrency),
+        timeout=30.0,
+    )
+    stats = ReplayStats()
+    semaphore = asyncio.Semaphore(replay_config.concurrency)
+    pending: set[asyncio.Task] = set()
+    node_tasks: dict[str, asyncio.Task] = {}
+    first_timestamp = None
+    last_timestamp = 0.0
+    started = time.monotonic()
+    try:
+        for frame in read_trace_frames(replay_config.trace):
+            if first_timestamp is None:
+                first_timestamp = frame.timestamp
+            last_timestamp = frame.timestamp
+            if replay_config.speed > 0:
+                delay = (frame.timestamp - first_timestamp) / replay_config.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if frame.kind == TraceRecordType.TaskInfos:
+                state.task_infos = frame.payload
+                continue
+            if frame.kind == TraceRecordType.InstanceList:
+                state.instance_list = frame.payload
+                continue
+
+            await semaphore.acquire()
+            if frame.kind == TraceRecordType.Submit:
+                task = asyncio.create_task(send(client, frame, stats, semaphore))
+            else:
+                node_id = json.loads(frame.payload)["node_id"]
+                task = asyncio.create_task(send(client, frame, stats, semaphore, node_tasks.get(node_id)))
+                node_tasks[node_id] = task
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.gather(*pending)
+    finally:
+        await client.aclose()
+        for server, task in servers:
+            server.should_exit = True
+            await task
+
+    elapsed = time.monotonic() - started
+    span = last_timestamp - (first_timestamp or 0.0)
+    print(f"Replayed {span:.1f}s of trace in {elapsed:.1f}s ({span / elapsed if elapsed else 0:.1f}x)")
+    print(f"Upstream submissions received: {state.submitted}")
+    return stats
+
+
+def main():
+    stats = asyncio.run(replay())
+    print(stats.format())
+
+
+if __name__ == "__main__":
+    main()
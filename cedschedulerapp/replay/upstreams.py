@@ -0,0 +1,44 @@
+from fastapi import FastAPI
+from fastapi import Response
+
+
+class UpstreamState:
+    """替身上游当前返回的内容，随回放时钟推进更新为轨迹中最近一次记录的响应"""
+
+    def __init__(self):
+        self.task_infos = b"{}"
+        self.instance_list = b'{"data": []}'
+        self.submitted = 0
+
+
+def create_training_app(state: UpstreamState) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/task/infos")
+    async def task_infos():
+        return Response(content=state.task_infos, media_type="application/json")
+
+    @app.post("/api/task/submit")
+    async def submit_task():
+        state.submitted += 1
+        return {"code": 200, "message": "success"}
+
+    @app.post("/api/task/log/{task_id}")
+    async def task_log(task_id: str):
+        return {}
+
+    return app
+
+
+def create_inference_app(state: UpstreamState) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/instance_list")
+    async def instance_list():
+        return Response(content=state.instance_list, media_type="application/json")
+
+    @app.get("/instance_log/{instance_id}")
+    async def instance_log(instance_id: str):
+        return {"data": ""}
+
+    return app
@@ -0,0 +1,36 @@
+import argparse
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from cedschedulerapp.master.enums import PlacementStrategy
+
+
+@dataclass
+class SimulatorConfig:
+    trace: str = ""
+    strategies: list[PlacementStrategy] = field(default_factory=lambda: list(PlacementStrategy))
+    output: Optional[str] = None
+
+
+def parse_args() -> SimulatorConfig:
+    parser = argparse.ArgumentParser(description="CedScheduler Offline Simulator")
+    parser.add_argument("--trace", type=str, required=True, help="心跳与任务提交轨迹文件路径")
+    parser.add_argument(
+        "--strategy",
+        type=PlacementStrategy,
+        choices=list(PlacementStrategy),
+        action="append",
+        help="参与比较的放置策略，可重复指定 (默认: 全部策略)",
+    )
+    parser.add_argument("--output", type=str, default=None, help="将结果以 JSON 写入该文件 (可选)")
+
+    args = parser.parse_args()
+    return SimulatorConfig(
+        trace=args.trace,
+        strategies=args.strategy or list(PlacementStrategy),
+        output=args.output,
+    )
+
+
+simulator_config = parse_args()
@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import math
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from cedschedulerapp.master.client.client_type import TaskMeta
+from cedschedulerapp.master.enums import PlacementStrategy
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.enums import TaskStatus
+from cedschedulerapp.master.node_registry import normalize_gpu_type
+from cedschedulerapp.master.placement import GPU_TYPE_INDEX
+from cedschedulerapp.master.placement import GPU_TYPES
+from cedschedulerapp.master.placement import NodeCapacity
+from cedschedulerapp.master.placement import PlacementEngine
+from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.simulator.trace import HeartbeatRecord
+from cedschedulerapp.simulator.trace import TraceRecord
+
+
+@dataclass
+class SimulationResult:
+    strategy: PlacementStrategy
+    submitted: int = 0
+    finished: int = 0
+    # 在空集群上也无法放置的任务
+    rejected: int = 0
+    makespan: float = 0.0
+    avg_jct: float = 0.0
+    avg_queueing_delay: float = 0.0
+    gpu_utilization: float = 0.0
+
+
+@dataclass
+class SimTask:
+    task: TaskMeta
+    region: Optional[RegionType]
+    submit_time: float
+    status: TaskStatus = TaskStatus.Submitted
+    start_time: float = 0.0
+    # (node_id, GPU 型号下标)
+    allocations: list[tuple[str, int]] = field(default_factory=list)
+
+
+class Simulator:
+    """
+    离散事件调度仿真
+
+    按时间顺序回放心跳和提交记录：心跳给出节点容量（忽略其中的使用量），
+    提交的任务进入 FIFO 队列，由 PlacementEngine 放置，运行时间取放置时
+    估计的完成时间。队首任务放不下时阻塞，直到有任务结束或节点变化，
+    因此每个事件最多产生一次失败的放置尝试。
+    """
+
+    def __init__(self, strategy: PlacementStrategy):
+        self.engine = PlacementEngine(strategy)
+        self.result = SimulationResult(strategy=strategy)
+        self.now = 0.0
+        self.nodes: dict[str, NodeResourceStats] = {}
+        self.node_signatures: dict[str, tuple] = {}
+        # 运行中任务在各节点上占用的资源: node_id -> [cpu, mem, 各型号 GPU 数...]
+        self.allocated: dict[str, list[float]] = {}
+        self.capacity: Optional[NodeCapacity] = None
+        self.node_index: dict[str, int] = {}
+        self.queue: deque[SimTask] = deque()
+        self.running = 0
+        # (结束时间, 序号, 任务)
+        self.completions: list[tuple[float, int, SimTask]] = []
+        self.seq = itertools.count()
+        self.blocked = False
+        self.schedule_pending = False
+
+        self.first_submit: Optional[float] = None
+        self.last_finish = 0.0
+        self.total_jct = 0.0
+        self.total_queueing_delay = 0.0
+        self.gpu_busy_seconds = 0.0
+
+    @staticmethod
+    def _signature(node: NodeResourceStats) -> tuple:
+        return (
+            node.region,
+            node.cpu_count,
+            node.memory_count,
+            tuple(sorted(normalize_gpu_type(gpu.gpu_type) for gpu in node.gpu_info)),
+        )
+
+    def add_node(self, node: NodeResourceStats):
+        """心跳只在节点首次出现或容量变化时使容量视图失效"""
+        signature = self._signature(node)
+        if self.node_signatures.get(node.node_id) == signature:
+            return
+        self.node_signatures[node.node_id] = signature
+        self.nodes[node.node_id] = node
+        self.capacity = None
+        self.blocked = False
+        self.schedule_pending = True
+
+    def _build_capacity(self) -> NodeCapacity:
+        capacity = NodeCapacity.from_nodes(self.nodes.values(), idle=True)
+        self.node_index = {node_id: index for index, node_id in enumerate(capacity.node_ids)}
+        for node_id, (cpu, mem, *gpus) in self.allocated.items():
+            node = self.node_index[node_id]
+            capacity.allocate(node, 0, 0, cpu, mem)
+            for gpu_index, gpu in enumerate(gpus):
+                capacity.allocate(node, gpu_index, int(gpu), 0.0, 0.0)
+        return capacity
+
+    def _account(self, sim_task: SimTask, sign: int):
+        task = sim_task.task
+        for node_id, gpu_index in sim_task.allocations:
+            usage = self.allocated.setdefault(node_id, [0.0] * (2 + len(GPU_TYPES)))
+            usage[0] += sign * task.task_plan_cpu
+            usage[1] += sign * task.task_plan_mem
+            usage[2 + gpu_index] += sign * task.task_plan_gpu
+
+    def submit(self, task: TaskMeta, region: Optional[RegionType] = None):
+        if self.first_submit is None:
+            self.first_submit = self.now
+        self.result.submitted += 1
+        sim_task = SimTask(task=task, region=region, submit_time=self.now, status=TaskStatus.Pending)
+        self.queue.append(sim_task)
+        if not self.blocked:
+            self.schedule_pending = True
+
+    def schedule(self):
+        self.schedule_pending = False
+        if self.blocked or not self.queue or not self.nodes:
+            return
+        if self.capacity is None:
+            self.capacity = self._build_capacity()
+        while self.queue:
+            sim_task = self.queue[0]
+            hint = self.engine.place(sim_task.task, self.capacity, sim_task.region)
+            if hint is None:
+                if self.running:
+                    self.blocked = True
+                    return
+                # 集群空闲时仍然放不下，不再等待
+                self.queue.popleft()
+                self.result.rejected += 1
+                continue
+            self.queue.popleft()
+            sim_task.status = TaskStatus.Running
+            sim_task.start_time = self.now
+            sim_task.allocations = [
+                (instance.node_id, GPU_TYPE_INDEX[instance.gpu_type] if instance.gpu_type else 0)
+                for instance in hint.instances
+            ]
+            self._account(sim_task, 1)
+            self.running += 1
+            task = sim_task.task
+            self.gpu_busy_seconds += task.task_plan_gpu * task.task_inst_num * hint.estimated_runtime
+            heapq.heappush(self.completions, (self.now + hint.estimated_runtime, next(self.seq), sim_task))
+
+    def finish(self, sim_task: SimTask):
+        task = sim_task.task
+        sim_task.status = TaskStatus.Finished
+        self._account(sim_task, -1)
+        if self.capacity is not None:
+            for node_id, gpu_index in sim_task.allocations:
+                self.capacity.release(
+                    self.node_index[node_id], gpu_index, task.task_plan_gpu, task.task_plan_cpu, task.task_plan_mem
+                )
+        self.running -= 1
+        self.blocked = False
+        self.schedule_pending = True
+        self.result.finished += 1
+        self.last_finish = self.now
+        self.total_jct += self.now - sim_task.submit_time
+        self.total_queueing_delay += sim_task.start_time - sim_task.submit_time
+
+    def advance(self, until: float):
+        """处理 until 之前结束的任务，同一时刻结束的任务释放后统一调度一次"""
+        while True:
+            if self.schedule_pending:
+                self.schedule()
+            if not self.completions or self.completions[0][0] > until:
+                break
+            self.now = self.completions[0][0]
+            while self.completions and self.completions[0][0] == self.now:
+                self.finish(heapq.heappop(self.completions)[2])
+        if math.isfinite(until):
+            self.now = max(self.now, until)
+
+    def run(self, records: Iterable[TraceRecord]) -> SimulationResult:
+        for record in records:
+            if record.time > self.now:
+                self.advance(record.time)
+            if isinstance(record, HeartbeatRecord):
+                self.add_node(record.node)
+            else:
+                self.submit(record.task, record.region)
+        self.advance(float("inf"))
+        return self.summarize()
+
+    def summarize(self) -> SimulationResult:
+        result = self.result
+        if result.finished:
+            result.makespan = self.last_finish - (self.first_submit or 0.0)
+            result.avg_jct = self.total_jct / result.finished
+            result.avg_queueing_delay = self.total_queueing_delay / result.finished
+        total_gpus = sum(
+            gpu_type in GPU_TYPE_INDEX for signature in self.node_signatures.values() for gpu_type in signature[3]
+        )
+        if result.makespan > 0 and total_gpus:
+            result.gpu_utilization = self.gpu_busy_seconds / (total_gpus * result.makespan)
+        return result
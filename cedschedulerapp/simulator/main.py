@@ -0,0 +1,41 @@
+import json
+import time
+from dataclasses import asdict
+
+from cedschedulerapp.simulator.args import simulator_config
+from cedschedulerapp.simulator.engine import SimulationResult
+from cedschedulerapp.simulator.engine import Simulator
+from cedschedulerapp.simulator.trace import read_trace
+from cedschedulerapp.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def format_results(results: list[SimulationResult]) -> str:
+    header = f"{'strategy':<16}{'finished':>10}{'rejected':>10}{'makespan(s)':>14}{'avg_jct(s)':>14}"
+    header += f"{'avg_queue(s)':>14}{'gpu_util':>10}"
+    lines = [header]
+    for result in results:
+        lines.append(
+            f"{result.strategy.value:<16}{result.finished:>10}{result.rejected:>10}{result.makespan:>14.1f}"
+            f"{result.avg_jct:>14.1f}{result.avg_queueing_delay:>14.1f}{result.gpu_utilization:>10.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    results = []
+    for strategy in simulator_config.strategies:
+        started = time.perf_counter()
+        result = Simulator(strategy).run(read_trace(simulator_config.trace))
+        logger.info(f"Simulated {result.submitted} tasks with {strategy.value} in {time.perf_counter() - started:.1f}s")
+        results.append(result)
+
+    print(format_results(results))
+    if simulator_config.output:
+        with open(simulator_config.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
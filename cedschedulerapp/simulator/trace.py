@@ -0,0 +1,97 @@
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Optional
+from typing import Union
+
+from cedschedulerapp.master.client.client_type import TaskMeta
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.enums import TraceRecordType
+from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import SubmitTaskRequest
+from cedschedulerapp.master.trace_recorder import is_trace_file
+from cedschedulerapp.master.trace_recorder import read_trace_frames
+from cedschedulerapp.master.trace_recorder import TraceFormatError
+
+
+@dataclass
+class HeartbeatRecord:
+    time: float
+    node: NodeResourceStats
+
+
+@dataclass
+class SubmitRecord:
+    time: float
+    task: TaskMeta
+    region: Optional[RegionType] = None
+
+
+TraceRecord = Union[HeartbeatRecord, SubmitRecord]
+
+
+def parse_record(item: dict) -> TraceRecord:
+    """
+    解析一条 JSONL 轨迹记录
+
+    心跳: {"type": "heartbeat", "time": 0.0, "node": {NodeResourceStats}}
+    提交: {"type": "submit", "time": 1.0, "task": {TaskMeta}, "region": 1}
+    """
+    record_type = item.get("type")
+    if record_type == "heartbeat":
+        return HeartbeatRecord(time=float(item["time"]), node=NodeResourceStats.model_validate(item["node"]))
+    if record_type == "submit":
+        region = item.get("region")
+        return SubmitRecord(
+            time=float(item["time"]),
+            task=TaskMeta.model_validate(item["task"]),
+            region=RegionType(region) if region is not None else None,
+        )
+    raise TraceFormatError(f"Unknown trace record type: {record_type}")
+
+
+def read_recorded_trace(path: str) -> Iterator[TraceRecord]:
+    """读取 master --record-trace 写出的二进制轨迹，增量心跳合并到该节点最近一次的全量心跳上"""
+    nodes: dict[str, dict] = {}
+    task_count = 0
+    for frame in read_trace_frames(path):
+        if frame.kind in (TraceRecordType.Heartbeat, TraceRecordType.HeartbeatDelta):
+            item = frame.json()
+            if frame.kind == TraceRecordType.Heartbeat:
+                node = nodes[item["node_id"]] = item
+            else:
+                node = nodes.get(item["node_id"])
+                if node is None:
+                    # master 同样会拒绝并要求重发全量心跳
+                    continue
+                node.update((key, value) for key, value in item.items() if key != "seq")
+            yield HeartbeatRecord(time=frame.timestamp, node=NodeResourceStats.model_validate(node))
+        elif frame.kind == TraceRecordType.Submit:
+            for request in frame.json():
+                task_count += 1
+                request = SubmitTaskRequest.model_validate(request)
+                yield SubmitRecord(
+                    time=frame.timestamp,
+                    task=request.to_task_meta(task_id=f"trace-{task_count}", start_time=frame.timestamp),
+                    region=request.region,
+                )
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """
+    读取轨迹，记录需按时间排序，不会一次性载入内存
+
+    支持 master 记录的二进制轨迹和逐行 JSONL 轨迹
+    """
+    if is_trace_file(path):
+        yield from read_recorded_trace(path)
+        return
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield parse_record(json.loads(line))
+            except (ValueError, KeyError) as e:
+                raise TraceFormatError(f"{path}:{line_no}: {e}") from e
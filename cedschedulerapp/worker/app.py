@@ -5,32 +5,50 @@ import httpx
 
 from cedschedulerapp.worker.args import server_config
 from cedschedulerapp.worker.schemas import NodeResourceStats
-from cedschedulerapp.worker.service import get_node_stats
+from cedschedulerapp.worker.service import HeartbeatEncoder
+from cedschedulerapp.worker.service import NodeStatsCollector
 
 HEARTBEAT_INTERVAL = 5
+HEARTBEAT_TIMEOUT = 5
 
 
 async def send_heartbeat():
     """定期向master发送心跳"""
-    while True:
-        try:
-            # 获取当前节点状态
-            stats: NodeResourceStats = get_node_stats()
-
-            # 发送心跳到master
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"http://{server_config.master_host}:{server_config.master_port}/node/heartbeat",
-                    json=stats.model_dump(),
-                )
+    collector = NodeStatsCollector()
+    encoder = HeartbeatEncoder(server_config.full_snapshot_interval)
+    # worker 生命周期内复用同一个连接
+    async with httpx.AsyncClient(
+        base_url=f"http://{server_config.master_host}:{server_config.master_port}",
+        timeout=HEARTBEAT_TIMEOUT,
+    ) as client:
+        while True:
+            try:
+                # 获取当前节点状态
+                stats: NodeResourceStats = await collector.collect_async()
+                endpoint, payload, state = encoder.encode(stats)
+
+                # 发送心跳到master
+                response = await client.post(endpoint, json=payload)
+                if response.status_code == 404 and endpoint == encoder.DELTA_ENDPOINT:
+                    # master 不支持增量心跳，退回全量
+                    print("Master does not support delta heartbeats, falling back to full heartbeats")
+                    encoder.supports_delta = False
+                    encoder.reset()
+                    continue
                 response.raise_for_status()
-                print(f"Heartbeat sent successfully at {datetime.now()}")
-
-        except Exception as e:
-            print(f"Error sending heartbeat: {e}")
-
-        # 等待HEARTBEAT_INTERVAL秒后发送下一次心跳
-        await asyncio.sleep(HEARTBEAT_INTERVAL)
+                body = response.json()
+                if body.get("code", 200) != 200:
+                    raise RuntimeError(f"{body.get('code')} {body.get('message')}")
+                encoder.ack(endpoint, state)
+                print(f"Heartbeat sent successfully at {datetime.now()} ({endpoint})")
+
+            except Exception as e:
+                # 增量可能丢失，下一次发送全量心跳
+                encoder.reset()
+                print(f"Error sending heartbeat: {e}")
+
+            # 等待HEARTBEAT_INTERVAL秒后发送下一次心跳
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ class ServerConfig:
     node_id: str = "cedscheduler-worker"
     region: str = "Cloud"
     node_type: str = "Training"
+    full_snapshot_interval: int = 12
 
 
 def parse_args() -> ServerConfig:
@@ -35,6 +36,12 @@ def parse_args() -> ServerConfig:
         choices=[e.value for e in NodeType],
         help=f"节点类型，可选: {[e.value for e in NodeType]}",
     )
+    parser.add_argument(
+        "--full-snapshot-interval",
+        type=int,
+        default=12,
+        help="每隔多少次心跳发送一次全量心跳，其余发送增量心跳，<=1 表示总是全量 (默认: 12)",
+    )
 
     args = parser.parse_args()
     return ServerConfig(
@@ -44,6 +51,7 @@ def parse_args() -> ServerConfig:
         node_id=args.id,
         region=args.region,
         node_type=args.type,
+        full_snapshot_interval=args.full_snapshot_interval,
     )
 
 
@@ -10,3 +10,9 @@ class RegionType(str, Enum):
 class NodeType(str, Enum):
     Training = "训练"
     Inference = "推理"
+
+
+class GPUBackend(str, Enum):
+    NVIDIA = "nvidia"
+    Tianshu = "tianshu"
+    NoGPU = "none"
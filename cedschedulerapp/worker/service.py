@@ -1,53 +1,129 @@
+import asyncio
+import time
+from typing import Optional
+
 import psutil
 
 from cedschedulerapp.worker.args import server_config
 from cedschedulerapp.worker.enums import NodeType
 from cedschedulerapp.worker.enums import RegionType
 from cedschedulerapp.worker.schemas import NodeResourceStats
+from cedschedulerapp.worker.utils import detect_gpu_backend
 from cedschedulerapp.worker.utils import get_gpu_info
 from cedschedulerapp.worker.utils import get_node_ip
 
+GB = 1024 * 1024 * 1024
+# 节点IP可能随网络变化，定期重新获取
+NODE_IP_TTL = 300
+
+
+class NodeStatsCollector:
+    """
+    节点状态采集器
+
+    启动时检测一次 GPU 类型并缓存节点静态信息（IP、CPU/内存/磁盘总量），
+    每次心跳只采集动态指标，GPU 探测在线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(self):
+        self.gpu_backend = detect_gpu_backend()
+        self.cpu_count = psutil.cpu_count(logical=True)
+        self.memory_count = int(psutil.virtual_memory().total / GB)
+        self.storage_count = int(psutil.disk_usage("/").total / GB)
+        self.region = RegionType(server_config.region)
+        self.node_type = NodeType(server_config.node_type)
+        self.node_ip = get_node_ip()
+        self.node_ip_updated_at = time.monotonic()
+        # 首次调用 cpu_percent 返回 0，先建立基准
+        psutil.cpu_percent()
+
+    def get_node_ip(self) -> str:
+        if time.monotonic() - self.node_ip_updated_at > NODE_IP_TTL:
+            self.node_ip = get_node_ip()
+            self.node_ip_updated_at = time.monotonic()
+        return self.node_ip
+
+    def collect(self) -> NodeResourceStats:
+        try:
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage("/")
+
+            # Get GPU information
+            gpu_info = get_gpu_info(self.gpu_backend)
+
+            # Calculate used resources
+            used_cpu_count = int(psutil.cpu_percent() * self.cpu_count / 100)
+            used_memory_count = int(memory.used / GB)  # Convert to GB
+            used_storage_count = int(disk.used / GB)  # Convert to GB
+
+            # Calculate used GPU count based on memory usage and utilization
+            used_gpu_count = sum(
+                1
+                for gpu in gpu_info
+                if (gpu.gpu_memory_used / gpu.gpu_memory_total * 100 > 20) or (gpu.gpu_utilization > 20)
+            )
+
+            return NodeResourceStats(
+                node_id=server_config.node_id,
+                node_ip=self.get_node_ip(),
+                region=self.region,
+                node_type=self.node_type,
+                cpu_count=self.cpu_count,
+                gpu_count=len(gpu_info),
+                memory_count=self.memory_count,
+                storage_count=self.storage_count,
+                used_cpu_count=used_cpu_count,
+                used_gpu_count=used_gpu_count,
+                used_memory_count=used_memory_count,
+                used_storage_count=used_storage_count,
+                gpu_info=gpu_info,
+            )
+        except Exception as err:
+            raise RuntimeError("Failed to get node statistics") from err
+
+    async def collect_async(self) -> NodeResourceStats:
+        """在线程池中采集，避免 GPUtil/ixsmi 子进程阻塞事件循环"""
+        return await asyncio.to_thread(self.collect)
+
+
+class HeartbeatEncoder:
+    """
+    心跳编码器
+
+    注册时和每隔 full_snapshot_interval 次心跳发送全量状态，其余只发送
+    相对上一次成功发送的状态发生变化的字段。发送失败或 master 要求重同步时
+    下一次心跳回退为全量。
+    """
+
+    FULL_ENDPOINT = "/node/heartbeat"
+    DELTA_ENDPOINT = "/node/heartbeat/delta"
+
+    def __init__(self, full_snapshot_interval: int):
+        self.full_snapshot_interval = full_snapshot_interval
+        self.supports_delta = full_snapshot_interval > 1
+        self.last_sent: Optional[dict] = None
+        self.seq = 0
+
+    def encode(self, stats: NodeResourceStats) -> tuple[str, dict, dict]:
+        """
+        Returns:
+            tuple[str, dict, dict]: (端点, 请求体, 完整状态)，完整状态在发送成功后传给 ack()
+        """
+        state = stats.model_dump(mode="json")
+        if (
+            self.last_sent is None
+            or not self.supports_delta
+            or self.seq + 1 >= self.full_snapshot_interval
+        ):
+            return self.FULL_ENDPOINT, state, state
+        changes = {key: value for key, value in state.items() if self.last_sent.get(key) != value}
+        changes.update(node_id=state["node_id"], seq=self.seq + 1)
+        return self.DELTA_ENDPOINT, changes, state
+
+    def ack(self, endpoint: str, state: dict):
+        self.last_sent = state
+        self.seq = 0 if endpoint == self.FULL_ENDPOINT else self.seq + 1
 
-def get_node_stats() -> NodeResourceStats:
-    try:
-        # Get system information
-        cpu_count = psutil.cpu_count(logical=True)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
-
-        # Get GPU information
-        gpu_info = get_gpu_info()
-        gpu_count = len(gpu_info)
-
-        # Calculate used resources
-        used_cpu_count = int(psutil.cpu_percent() * cpu_count / 100)
-        used_memory_count = int(memory.used / (1024 * 1024 * 1024))  # Convert to GB
-        used_storage_count = int(disk.used / (1024 * 1024 * 1024))  # Convert to GB
-
-        # Calculate used GPU count based on memory usage and utilization
-        used_gpu_count = sum(
-            1
-            for gpu in gpu_info
-            if (gpu.gpu_memory_used / gpu.gpu_memory_total * 100 > 20) or (gpu.gpu_utilization > 20)
-        )
-
-        # Get node IP
-        node_ip = get_node_ip()
-
-        return NodeResourceStats(
-            node_id=server_config.node_id,
-            node_ip=node_ip,
-            region=RegionType(server_config.region),
-            node_type=NodeType(server_config.node_type),
-            cpu_count=cpu_count,
-            gpu_count=gpu_count,
-            memory_count=int(memory.total / (1024 * 1024 * 1024)),  # Convert to GB
-            storage_count=int(disk.total / (1024 * 1024 * 1024)),  # Convert to GB
-            used_cpu_count=used_cpu_count,
-            used_gpu_count=used_gpu_count,
-            used_memory_count=used_memory_count,
-            used_storage_count=used_storage_count,
-            gpu_info=gpu_info,
-        )
-    except Exception as err:
-        raise RuntimeError("Failed to get node statistics") from err
+    def reset(self):
+        self.last_sent = None
+        self.seq = 0
@@ -1,7 +1,10 @@
 import re
+import shutil
 import socket
 import subprocess
+from typing import Optional
 
+from cedschedulerapp.worker.enums import GPUBackend
 from cedschedulerapp.worker.schemas import GPUInfo
 
 
@@ -33,7 +36,7 @@ def get_nvidia_gpu_info() -> list[GPUInfo]:
 
 def get_tianshu_gpu_info() -> list[GPUInfo]:
     try:
-        result = subprocess.run(["ixsmi"], capture_output=True, text=True)
+        result = subprocess.run(["ixsmi"], capture_output=True, text=True, timeout=10)
         if result.returncode != 0:
             print("Error running ixsmi:", result.stderr.strip())
             return []
@@ -98,24 +101,39 @@ def get_tianshu_gpu_info() -> list[GPUInfo]:
         return []
 
 
-def get_gpu_info() -> list[GPUInfo]:
+def detect_gpu_backend() -> GPUBackend:
     """
-    自动检测是否支持 NVIDIA GPU，优先使用 NVIDIA 方式；
-    否则尝试使用天数智芯 ixsmi 获取 GPU 信息。
+    检测 GPU 类型，优先使用 NVIDIA (GPUtil)；
+    否则检测天数智芯 ixsmi 是否可用。只需要在启动时调用一次。
     """
     try:
-        # 尝试导入 GPUtil 并获取 GPU 信息
         import GPUtil
 
-        gpus = GPUtil.getGPUs()
-        if gpus:
+        if GPUtil.getGPUs():
             print("Detected NVIDIA GPU, using GPUtil...")
-            return get_nvidia_gpu_info()
-    except (ImportError, Exception):
+            return GPUBackend.NVIDIA
+    except Exception:
         pass
 
-    print("No NVIDIA GPU detected, trying 天数智芯 ixsmi...")
-    return get_tianshu_gpu_info()
+    if shutil.which("ixsmi"):
+        print("No NVIDIA GPU detected, using 天数智芯 ixsmi...")
+        return GPUBackend.Tianshu
+
+    print("No GPU detected on this system")
+    return GPUBackend.NoGPU
+
+
+def get_gpu_info(backend: Optional[GPUBackend] = None) -> list[GPUInfo]:
+    """
+    按 GPU 类型获取 GPU 信息，未指定时自动检测。
+    """
+    if backend is None:
+        backend = detect_gpu_backend()
+    if backend == GPUBackend.NVIDIA:
+        return get_nvidia_gpu_info()
+    if backend == GPUBackend.Tianshu:
+        return get_tianshu_gpu_info()
+    return []
 
 
 def get_node_ip() -> str:
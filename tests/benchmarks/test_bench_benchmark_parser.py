@@ -0,0 +1,116 @@
+import random
+import re
+import sys
+import time
+
+import pytest
+
+from cedschedulerapp.master.client.benchmark_parser import BenchmarkLogParser
+from cedschedulerapp.master.client.benchmark_parser import REQUIRED_ARRAYS
+
+pytestmark = pytest.mark.benchmark
+
+REQUEST_COUNT = 100_000
+# 日志每完成这么多请求被轮询一次
+POLL_EVERY = 1000
+
+PROGRESS_PATTERN = re.compile(r"num_finised_requests: (\d+)")
+TOTAL_PROMPTS_PATTERN = re.compile(r"num_prompts=(\d+)")
+ARRAY_PATTERN = re.compile(r"all_(\w+)=\[(.*?)\]")
+
+
+def legacy_parse_progress(log_text: str):
+    """改为增量解析前的实现，作为对照：每次轮询重新扫描整个日志"""
+    total_match = TOTAL_PROMPTS_PATTERN.search(log_text)
+    if not total_match:
+        return None
+    progress_matches = PROGRESS_PATTERN.findall(log_text)
+    if not progress_matches:
+        return None
+    return int(progress_matches[-1]), int(total_match.group(1))
+
+
+def legacy_parse_result(log_text: str):
+    """改为增量解析前的实现，作为对照：逐个值调用 float/int 转换为 Python 列表"""
+    arrays = {}
+    for match in ARRAY_PATTERN.finditer(log_text):
+        name, values_str = match.groups()
+        if name == "request_ids":
+            arrays[name] = [v.strip("'") for v in values_str.split(", ")]
+        else:
+            arrays[name] = [float(v) if "." in v else int(v) for v in values_str.split(", ")]
+    if not all(name in arrays for name in REQUIRED_ARRAYS):
+        return None
+    return arrays
+
+
+def synthetic_log() -> tuple[list[str], str]:
+    """返回运行期间每次轮询时的日志快照和输出结果数组后的完整日志"""
+    rng = random.Random(0)
+    parts = [f"Namespace(backend='vllm', num_prompts={REQUEST_COUNT}, qps=20.0)\n"]
+    snapshots = []
+    for finished in range(1, REQUEST_COUNT + 1):
+        parts.append(f"num_finised_requests: {finished}\n")
+        if finished % POLL_EVERY == 0:
+            snapshots.append("".join(parts))
+    for name in REQUIRED_ARRAYS:
+        if name == "request_ids":
+            values = ", ".join(f"'req-{i}'" for i in range(REQUEST_COUNT))
+        elif name.endswith("latencies"):
+            values = ", ".join(repr(rng.uniform(0.01, 30.0)) for _ in range(REQUEST_COUNT))
+        else:
+            values = ", ".join(str(rng.randint(1, 2048)) for _ in range(REQUEST_COUNT))
+        parts.append(f"all_{name}=[{values}]\n")
+    return snapshots, "".join(parts)
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def sample_bytes(arrays: dict) -> int:
+    total = 0
+    for name, values in arrays.items():
+        if name == "request_ids":
+            continue
+        total += sys.getsizeof(values)
+        if isinstance(values, list):
+            total += sum(sys.getsizeof(value) for value in values)
+    return total
+
+
+def test_parse_100k_request_log(benchmark_report):
+    snapshots, log_text = synthetic_log()
+
+    legacy_poll = sum(timed(legacy_parse_progress, snapshot)[0] for snapshot in snapshots)
+    parser = BenchmarkLogParser()
+    streaming_poll = sum(timed(parser.parse_progress, snapshot, "b1")[0] for snapshot in snapshots)
+    # 运行结束后只需解析新增的结果数组
+    streaming_tail, _ = timed(parser.parse_result, log_text, "b1")
+
+    legacy_result_time, legacy_result = timed(legacy_parse_result, log_text)
+    streaming_result_time, streaming_result = timed(BenchmarkLogParser().parse_result, log_text)
+    streaming_arrays = {name: getattr(streaming_result, name) for name in REQUIRED_ARRAYS}
+
+    assert legacy_result is not None
+    for name in REQUIRED_ARRAYS:
+        assert list(streaming_arrays[name]) == legacy_result[name]
+    assert parser.parse_progress(log_text, "b1").is_complete
+
+    benchmark_report(
+        ["case", "legacy_s", "streaming_s", "speedup"],
+        [
+            [f"{len(snapshots)} progress polls", legacy_poll, streaming_poll, legacy_poll / streaming_poll],
+            ["final result, whole log", legacy_result_time, streaming_result_time,
+             legacy_result_time / streaming_result_time],
+            ["final result, tail after polls", legacy_result_time, streaming_tail,
+             legacy_result_time / streaming_tail],
+        ],
+    )
+    benchmark_report(
+        ["numeric samples", "legacy_MiB", "streaming_MiB"],
+        [["9 arrays x 100k", sample_bytes(legacy_result) / 2**20, sample_bytes(streaming_arrays) / 2**20]],
+    )
+    assert streaming_poll < legacy_poll
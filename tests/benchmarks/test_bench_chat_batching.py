@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import random
+import time
+
+import numpy as np
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.manager import Manager
+from tests.standin import run_standin
+
+pytestmark = pytest.mark.benchmark
+
+# 上游每次调用的固定开销和每个 prompt 的增量耗时，最多同时处理 UPSTREAM_SLOTS 次调用
+CALL_OVERHEAD = 0.02
+PROMPT_TIME = 0.001
+UPSTREAM_SLOTS = 4
+ARRIVAL_RATES = (50.0, 150.0, 300.0)
+DURATION = 3.0
+MAX_BATCH_SIZE = 8
+BATCH_WINDOW = 0.01
+
+
+def batched_generator() -> Starlette:
+    """支持 prompt 列表的生成服务替身，单次调用耗时 CALL_OVERHEAD + 每个 prompt PROMPT_TIME"""
+    slots = []
+
+    async def generate(request):
+        if not slots:
+            slots.append(asyncio.Semaphore(UPSTREAM_SLOTS))
+        prompt = (await request.json())["prompt"]
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        async with slots[0]:
+            await asyncio.sleep(CALL_OVERHEAD + PROMPT_TIME * len(prompts))
+        return JSONResponse({"text": [f"re: {prompt}" for prompt in prompts]})
+
+    return Starlette(routes=[Route("/generate", generate, methods=["POST"])])
+
+
+async def open_loop(manager: Manager, rate: float) -> tuple[float, list[float]]:
+    """按泊松过程发送 rate * DURATION 个请求，返回完成吞吐量和各请求从计划发送到返回的延迟"""
+    rng = random.Random(0)
+    count = int(rate * DURATION)
+    scheduled = list(itertools.accumulate(rng.expovariate(rate) for _ in range(count)))
+    start = time.perf_counter()
+
+    async def one(index: int, at: float) -> float:
+        await asyncio.sleep(max(0.0, start + at - time.perf_counter()))
+        assert await manager.generate(f"p{index}") == f"re: p{index}"
+        return time.perf_counter() - start - at
+
+    latencies = await asyncio.gather(*(one(index, at) for index, at in enumerate(scheduled)))
+    return count / (time.perf_counter() - start), latencies
+
+
+async def run_with_manager(rate: float) -> tuple[float, list[float]]:
+    manager = Manager()
+    try:
+        return await open_loop(manager, rate)
+    finally:
+        await manager.close()
+
+
+def test_chat_batching_throughput_vs_latency(monkeypatch, benchmark_report):
+    """
+    不同到达速率下，逐个发送和微批处理的完成吞吐量与延迟
+
+    不合批时每个请求占用一次上游调用，到达速率超过 UPSTREAM_SLOTS / CALL_OVERHEAD
+    后排队；合批时一次调用处理多个 prompt。低速率下自适应窗口为 0，不增加延迟。
+    """
+    rows = []
+    results = {}
+    with run_standin(batched_generator()) as (host, port):
+        monkeypatch.setattr(server_config, "inference_host", host)
+        monkeypatch.setattr(server_config, "inference_port", port)
+        monkeypatch.setattr(server_config, "chat_batch_window", BATCH_WINDOW)
+        for rate, (label, max_batch_size) in itertools.product(
+            ARRIVAL_RATES, (("unbatched", 1), (f"batch<={MAX_BATCH_SIZE}", MAX_BATCH_SIZE))
+        ):
+            monkeypatch.setattr(server_config, "chat_max_batch_size", max_batch_size)
+            throughput, latencies = asyncio.run(run_with_manager(rate))
+            results[(label, rate)] = (throughput, np.percentile(latencies, 99))
+            rows.append(
+                [
+                    label,
+                    rate,
+                    throughput,
+                    np.percentile(latencies, 50) * 1e3,
+                    np.percentile(latencies, 99) * 1e3,
+                ]
+            )
+
+    benchmark_report(["mode", "arrival_rps", "completed_rps", "p50_ms", "p99_ms"], rows)
+    top = ARRIVAL_RATES[-1]
+    unbatched_throughput, unbatched_p99 = results[("unbatched", top)]
+    batched_throughput, batched_p99 = results[(f"batch<={MAX_BATCH_SIZE}", top)]
+    assert batched_throughput > unbatched_throughput
+    assert batched_p99 < unbatched_p99
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+
+import httpx
+import numpy as np
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.client.inference_client import STREAM_DELIMITER
+from cedschedulerapp.master.manager import global_manager
+from tests.standin import run_standin
+
+pytestmark = pytest.mark.benchmark
+
+PREFILL_TIME = 0.05
+TOKEN_TIME = 0.01
+TOKEN_COUNT = 64
+CONCURRENCY = 4
+REQUEST_COUNT = 40
+
+
+def generator_standin() -> Starlette:
+    """生成服务替身：预填充 PREFILL_TIME 秒后每 TOKEN_TIME 秒产生一个 token，流式时每个片段是截至当前的完整文本"""
+
+    async def tokens():
+        await asyncio.sleep(PREFILL_TIME)
+        for i in range(TOKEN_COUNT):
+            yield f"t{i} "
+            await asyncio.sleep(TOKEN_TIME)
+
+    async def generate(request):
+        body = await request.json()
+        if not body.get("stream"):
+            return JSONResponse({"text": ["".join([token async for token in tokens()])]})
+
+        async def frames():
+            text = ""
+            async for token in tokens():
+                text += token
+                yield json.dumps({"text": [text]}).encode() + STREAM_DELIMITER
+
+        return StreamingResponse(frames())
+
+    return Starlette(routes=[Route("/generate", generate, methods=["POST"])])
+
+
+async def non_stream(client: httpx.AsyncClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    response = await client.post("/inference/chat", json={"message": "hi"})
+    elapsed = time.perf_counter() - start
+    assert response.json()["data"].count("t") == TOKEN_COUNT
+    # 非流式接口收到完整结果时才看到第一个 token
+    return elapsed, elapsed
+
+
+async def stream(client: httpx.AsyncClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", "/inference/chat/stream", json={"message": "hi"}) as response:
+        async for line in response.aiter_lines():
+            if line == "event: token" and first_token is None:
+                first_token = time.perf_counter() - start
+            if line == "event: done":
+                break
+    return first_token, time.perf_counter() - start
+
+
+def test_chat_time_to_first_token(monkeypatch, benchmark_report):
+    """
+    对比 /inference/chat 和 /inference/chat/stream 的首 token 延迟和总耗时
+
+    master 和生成服务替身都在真实的 HTTP 服务中运行，ASGITransport 会缓冲整个
+    响应，测不出流式的首 token 延迟。
+    """
+    results = {}
+    with run_standin(generator_standin()) as (generator_host, generator_port):
+        monkeypatch.setattr(global_manager, "inference_client", InferenceServerClient(generator_host, generator_port))
+        with run_standin(app) as (host, port):
+
+            async def run(request) -> list[tuple[float, float]]:
+                semaphore = asyncio.Semaphore(CONCURRENCY)
+
+                async def one(client: httpx.AsyncClient):
+                    async with semaphore:
+                        return await request(client)
+
+                async with httpx.AsyncClient(base_url=f"http://{host}:{port}", timeout=30) as client:
+                    return await asyncio.gather(*(one(client) for _ in range(REQUEST_COUNT)))
+
+            for label, request in (("/inference/chat", non_stream), ("/inference/chat/stream", stream)):
+                results[label] = np.array(asyncio.run(run(request)))
+
+    benchmark_report(
+        ["endpoint", "ttft_p50_ms", "ttft_p99_ms", "total_p50_ms"],
+        [
+            [
+                label,
+                np.percentile(values[:, 0], 50) * 1e3,
+                np.percentile(values[:, 0], 99) * 1e3,
+                np.percentile(values[:, 1], 50) * 1e3,
+            ]
+            for label, values in results.items()
+        ],
+    )
+    assert np.percentile(results["/inference/chat/stream"][:, 0], 99) < np.percentile(
+        results["/inference/chat"][:, 0], 50
+    )
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.generation_cache import GenerationCache
+from tests.standin import run_standin
+
+pytestmark = pytest.mark.benchmark
+
+GREEDY = {"temperature": 0}
+PROMPT_COUNT = 1000
+REQUEST_COUNT = 2000
+UPSTREAM_REQUEST_COUNT = 200
+TEXT = "x" * 2048
+
+
+def instant_generator() -> Starlette:
+    async def generate(request):
+        await request.body()
+        return JSONResponse({"text": [TEXT]})
+
+    return Starlette(routes=[Route("/generate", generate, methods=["POST"])])
+
+
+async def per_request(count: int, request) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        await request(i)
+    return (time.perf_counter() - start) / count
+
+
+def test_generation_cache_hit_cost(tmp_path, benchmark_report):
+    """
+    生成结果缓存各条路径的单次耗时，与不经过缓存直接请求零延迟上游替身的耗时对比
+
+    未命中一行使用立即返回的生成函数，只包含缓存自身的开销；实际未命中还要加上一次上游请求。
+    """
+    prompts = [f"prompt {i} " + "p" * 2048 for i in range(PROMPT_COUNT)]
+
+    async def generate():
+        return TEXT
+
+    async def run(host: str, port: int) -> dict[str, float]:
+        memory = GenerationCache(max_entries=PROMPT_COUNT, ttl=3600)
+        # 内存只保留一条，其余全部落盘，轮流访问时每次都从磁盘读取
+        disk = GenerationCache(max_entries=1, ttl=3600, spill_path=str(tmp_path / "generation_cache.db"))
+        for prompt in prompts:
+            await memory.get_or_generate(prompt, GREEDY, generate)
+            await disk.get_or_generate(prompt, GREEDY, generate)
+        await asyncio.gather(*disk.spill_tasks)
+        miss_counter = iter(range(10**9))
+
+        async def miss(i: int):
+            await memory.get_or_generate(f"miss {next(miss_counter)}", GREEDY, generate)
+
+        client = InferenceServerClient(host, port)
+        timings = {
+            "memory hit": await per_request(
+                REQUEST_COUNT, lambda i: memory.get_or_generate(prompts[i % PROMPT_COUNT], GREEDY, generate)
+            ),
+            "disk hit": await per_request(
+                REQUEST_COUNT, lambda i: disk.get_or_generate(prompts[i % PROMPT_COUNT], GREEDY, generate)
+            ),
+            "miss (cache overhead only)": await per_request(REQUEST_COUNT, miss),
+            "uncached upstream round trip": await per_request(
+                UPSTREAM_REQUEST_COUNT, lambda i: client.generate(prompts[i % PROMPT_COUNT], GREEDY)
+            ),
+        }
+        await client.close()
+        await memory.close()
+        await disk.close()
+        return timings
+
+    with run_standin(instant_generator()) as (host, port):
+        timings = asyncio.run(run(host, port))
+
+    benchmark_report(["path", "per_request_us"], [[label, value * 1e6] for label, value in timings.items()])
+    assert timings["memory hit"] < timings["disk hit"] < timings["uncached upstream round trip"]
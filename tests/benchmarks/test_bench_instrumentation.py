@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import pytest
+
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.app import HEARTBEAT_OK
+from cedschedulerapp.master.metrics import InstrumentedLock
+from cedschedulerapp.master.metrics import MetricsMiddleware
+from tests.test_heartbeat_delta import full_stats
+
+pytestmark = pytest.mark.benchmark
+
+NODE_COUNT = 100
+HEARTBEATS_PER_ROUND = 500
+CALLS_PER_ROUND = 20000
+ROUNDS = 10
+
+HEARTBEAT_ROUTE = next(route for route in app.routes if getattr(route, "path", None) == "/node/heartbeat")
+
+
+def heartbeat_scope(body: bytes) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/node/heartbeat",
+        "raw_path": b"/node/heartbeat",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+        "app": app,
+    }
+
+
+async def post_heartbeat(body: bytes):
+    """直接调用 ASGI 应用，不经过 HTTP 客户端，使测得的耗时只包含 master 自身的处理"""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(heartbeat_scope(body), receive, send)
+    assert status == [200]
+
+
+async def heartbeat_time(bodies: list[bytes]) -> float:
+    start = time.perf_counter()
+    for i in range(HEARTBEATS_PER_ROUND):
+        await post_heartbeat(bodies[i % len(bodies)])
+    return (time.perf_counter() - start) / HEARTBEATS_PER_ROUND
+
+
+async def endpoint(scope, receive, send):
+    # 与路由匹配后的行为一致，在 scope 中记录匹配到的路由
+    scope["route"] = HEARTBEAT_ROUTE
+
+
+async def async_call_time(func) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_ROUND):
+        await func()
+    return (time.perf_counter() - start) / CALLS_PER_ROUND
+
+
+def call_time(func) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_ROUND):
+        func()
+    return (time.perf_counter() - start) / CALLS_PER_ROUND
+
+
+def test_heartbeat_instrumentation_overhead(benchmark_report):
+    """
+    心跳路径上指标采集的开销占心跳处理耗时的比例
+
+    这台机器上整条心跳路径的耗时逐轮抖动在 10% 以上，直接对比带指标和不带指标的
+    端到端耗时分辨不出 2% 的差异。这里分别测量心跳路径上的三处指标采集（路由延迟
+    中间件、节点状态锁的等待计时、心跳计数）相对未采集版本多出的耗时，与端到端
+    心跳耗时相比。每项都交替运行多轮，取最快一轮，排除其他负载带来的抖动。
+    """
+    bodies = [full_stats(f"n{i}").model_dump_json().encode() for i in range(NODE_COUNT)]
+    middleware = MetricsMiddleware(endpoint)
+    scope = heartbeat_scope(b"")
+    plain_lock = asyncio.Lock()
+    instrumented_lock = InstrumentedLock("benchmark")
+
+    async def bare_call():
+        await endpoint(dict(scope), None, None)
+
+    async def middleware_call():
+        await middleware(dict(scope), None, None)
+
+    async def plain_lock_cycle():
+        async with plain_lock:
+            pass
+
+    async def instrumented_lock_cycle():
+        async with instrumented_lock:
+            pass
+
+    async def run():
+        timings = {name: [] for name in ("heartbeat", "bare", "middleware", "lock", "instrumented_lock")}
+        for _ in range(ROUNDS):
+            timings["heartbeat"].append(await heartbeat_time(bodies))
+            timings["bare"].append(await async_call_time(bare_call))
+            timings["middleware"].append(await async_call_time(middleware_call))
+            timings["lock"].append(await async_call_time(plain_lock_cycle))
+            timings["instrumented_lock"].append(await async_call_time(instrumented_lock_cycle))
+        return {name: min(values) for name, values in timings.items()}
+
+    timings = asyncio.run(run())
+    counter = min(call_time(HEARTBEAT_OK.inc) for _ in range(ROUNDS))
+    costs = [
+        ["route latency middleware", (timings["middleware"] - timings["bare"]) * 1e6],
+        ["node_stats lock wait timer", (timings["instrumented_lock"] - timings["lock"]) * 1e6],
+        ["heartbeat counter", counter * 1e6],
+    ]
+    overhead = sum(cost for _, cost in costs)
+    heartbeat = timings["heartbeat"] * 1e6
+    benchmark_report(
+        ["component", "us", "%_of_heartbeat"],
+        [[name, cost, cost / heartbeat * 100] for name, cost in costs]
+        + [["total instrumentation", overhead, overhead / heartbeat * 100], ["heartbeat", heartbeat, 100.0]],
+    )
+    assert overhead / heartbeat < 0.02
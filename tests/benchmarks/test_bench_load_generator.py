@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.client.inference_client import STREAM_DELIMITER
+from cedschedulerapp.master.enums import ArrivalPattern
+from cedschedulerapp.master.load_generator import arrival_schedule
+from cedschedulerapp.master.load_generator import instance_stream_request
+from cedschedulerapp.master.load_generator import LoadGenerator
+from cedschedulerapp.master.load_generator import StreamingHTTPClient
+from tests.standin import run_standin
+
+pytestmark = pytest.mark.benchmark
+
+PREFILL_TIME = 0.02
+TOKEN_TIME = 0.005
+TOKEN_COUNT = 20
+DURATION = 2.0
+TARGET_RATES = (50.0, 200.0, 500.0)
+
+
+class StreamingInstance:
+    """流式推理实例替身，记录每个 prompt 到达和输出完成的时刻（time.monotonic，与事件循环时钟相同）"""
+
+    def __init__(self):
+        self.received: dict[int, float] = {}
+        self.finished: dict[int, float] = {}
+
+    async def generate(self, request):
+        index = int((await request.json())["prompt"][1:])
+        self.received[index] = time.monotonic()
+
+        async def frames():
+            await asyncio.sleep(PREFILL_TIME)
+            text = ""
+            for i in range(TOKEN_COUNT):
+                text += f"t{i} "
+                yield json.dumps({"text": [text]}).encode() + STREAM_DELIMITER
+                if i < TOKEN_COUNT - 1:
+                    await asyncio.sleep(TOKEN_TIME)
+            self.finished[index] = time.monotonic()
+
+        return StreamingResponse(frames())
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[Route("/generate", self.generate, methods=["POST"])])
+
+
+async def run_load(url: str, rate: float) -> LoadGenerator:
+    count = int(rate * DURATION)
+    prompts = [f"p{i}" for i in range(count)]
+    client = StreamingHTTPClient()
+    generator = LoadGenerator(
+        "accuracy",
+        instance_stream_request(client, [url], {}),
+        prompts,
+        [1] * count,
+        arrival_schedule(ArrivalPattern.Poisson, count, qps=rate, seed=0),
+        max_inflight=4096,
+    )
+    try:
+        await generator.run()
+    finally:
+        client.close()
+    return generator
+
+
+def test_load_generator_accuracy(benchmark_report):
+    """
+    负载生成器的到达时刻和延迟测量相对替身实例实际观测值的误差
+
+    到达误差：替身收到各请求的时刻（相对第一个请求）与计划到达时刻之差。
+    延迟偏差：生成器报告的端到端延迟中位数与替身从收到请求到输出完成的耗时中位数之差，
+    包含调度延迟、连接和解析开销。替身实例与生成器共用同一个 CPU，最高速率下替身
+    本身先成为瓶颈。
+    """
+    rows = []
+    for rate in TARGET_RATES:
+        instance = StreamingInstance()
+        with run_standin(instance.app()) as (host, port):
+            generator = asyncio.run(run_load(f"http://{host}:{port}/generate", rate))
+
+        schedule = np.array(generator.schedule)
+        received = np.array([instance.received[index] for index in range(generator.total)])
+        arrival_error = np.abs((received - received[0]) - schedule)
+        # 泊松到达的样本速率与目标速率本身有偏差，与计划到达的速率比较
+        scheduled_rate = (generator.total - 1) / schedule[-1]
+        achieved_rate = (generator.total - 1) / (received.max() - received.min())
+        served = np.array([instance.finished[index] - instance.received[index] for index in instance.finished])
+        reported = np.array(generator.columns.end_to_end_latencies)
+        assert len(generator.columns) == generator.total
+        assert set(generator.columns.response_lens) == {TOKEN_COUNT}
+        rows.append(
+            [
+                rate,
+                scheduled_rate,
+                achieved_rate,
+                np.percentile(arrival_error, 50) * 1e3,
+                np.percentile(arrival_error, 99) * 1e3,
+                generator.max_lag * 1e3,
+                (np.percentile(reported, 50) - np.percentile(served, 50)) * 1e3,
+                np.percentile(generator.columns.prefill_latencies, 50) * 1e3,
+            ]
+        )
+
+    benchmark_report(
+        [
+            "target_rps",
+            "scheduled_rps",
+            "achieved_rps",
+            "arrival_err_p50_ms",
+            "arrival_err_p99_ms",
+            "max_dispatch_lag_ms",
+            "e2e_bias_p50_ms",
+            "ttft_p50_ms",
+        ],
+        rows,
+    )
+    # 低速率下生成器不应成为误差来源
+    _, scheduled, achieved, error_p50 = rows[0][:4]
+    assert abs(achieved - scheduled) / scheduled < 0.05
+    assert error_p50 < 5
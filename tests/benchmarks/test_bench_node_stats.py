@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+from cedschedulerapp.master import app as app_module
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.manager import Manager
+from cedschedulerapp.master.response_cache import ResponseCache
+from cedschedulerapp.master.schemas import APIResponse
+from cedschedulerapp.master.schemas import NodeStatusInfo
+from tests.test_heartbeat_delta import full_stats
+
+pytestmark = pytest.mark.benchmark
+
+NODE_COUNT = 1000
+REQUEST_COUNT = 200
+
+
+def legacy_app(manager: Manager) -> FastAPI:
+    """改为缓存序列化结果之前的实现：每次请求经过 response_model 校验并重新序列化"""
+    legacy = FastAPI()
+
+    @legacy.get("/resources/node_stats", response_model=APIResponse[list[NodeStatusInfo]])
+    async def get_node_stats(region: Optional[RegionType] = None):
+        return APIResponse(data=await manager.query_node_stats(region=region))
+
+    return legacy
+
+
+async def latencies(asgi_app, manager: Manager, headers: dict) -> list[float]:
+    """每次请求之前先处理一次心跳，模拟节点列表查询之间不断到达的心跳"""
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://test") as client:
+        for i in range(REQUEST_COUNT):
+            node_id = f"n{i % NODE_COUNT}"
+            await manager.update_node_stats(node_id, full_stats(node_id, used_cpu_count=i % 64))
+            start = time.perf_counter()
+            response = await client.get("/resources/node_stats", params={"region": 1}, headers=headers)
+            results.append(time.perf_counter() - start)
+            assert len(response.json()["data"]) == NODE_COUNT
+    return results
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip"])
+def test_node_stats_p99(monkeypatch, benchmark_report, accept_encoding):
+    """
+    对比 /resources/node_stats 在持续心跳下的 p50 / p99 延迟
+
+    缓存未命中时需要序列化整个节点列表，按时间分桶缓存时每个分桶只未命中一次，
+    p99 取决于分桶内的请求数。
+    """
+    manager = Manager()
+    monkeypatch.setattr(app_module, "global_manager", manager)
+
+    async def run():
+        for i in range(NODE_COUNT):
+            await manager.update_node_stats(f"n{i}", full_stats(f"n{i}"))
+        variants = {"response_model (legacy)": (legacy_app(manager), None)}
+        # ttl=0 相当于按每次心跳递增的版本号缓存
+        for label, ttl in (("cache keyed on every heartbeat", 0), ("cache, 1s ttl bucket", 1.0)):
+            variants[label] = (app, ttl)
+        results = {}
+        for label, (asgi_app, ttl) in variants.items():
+            if ttl is not None:
+                monkeypatch.setattr(server_config, "node_stats_cache_ttl", ttl)
+                monkeypatch.setattr(app_module, "response_cache", ResponseCache())
+            results[label] = await latencies(asgi_app, manager, {"Accept-Encoding": accept_encoding})
+        return results
+
+    results = asyncio.run(run())
+    benchmark_report(
+        ["path", "p50_ms", "p99_ms"],
+        [
+            [label, np.percentile(values, 50) * 1e3, np.percentile(values, 99) * 1e3]
+            for label, values in results.items()
+        ],
+    )
+    assert np.percentile(results["cache, 1s ttl bucket"], 99) < np.percentile(
+        results["response_model (legacy)"], 99
+    )
+
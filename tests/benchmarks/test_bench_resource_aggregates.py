@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+from cedschedulerapp.master import app as app_module
+from cedschedulerapp.master.aggregates import ResourceAggregates
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.enums import NodeType
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.manager import Manager
+from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import ResourceStats
+
+pytestmark = pytest.mark.benchmark
+
+NODE_COUNT = 10_000
+QUERY_COUNT = 200
+HEARTBEAT_COUNT = 50_000
+FAN_IN_CONCURRENCY = 64
+STATS_POLL_INTERVAL = 0.01
+
+
+def legacy_resource_stats(node_stats: dict[str, NodeResourceStats]) -> ResourceStats:
+    """改为增量维护前的实现，作为对照：每次查询对所有节点做 11 次遍历"""
+    return ResourceStats(
+        cloud_node_count=sum(1 for node in node_stats.values() if node.region == RegionType.Cloud),
+        edge_node_count=sum(1 for node in node_stats.values() if node.region == RegionType.Edge),
+        device_node_count=sum(1 for node in node_stats.values() if node.region == RegionType.Device),
+        total_cpu_count=sum(node.cpu_count for node in node_stats.values()),
+        used_cpu_count=sum(node.used_cpu_count for node in node_stats.values()),
+        total_gpu_count=sum(node.gpu_count for node in node_stats.values()),
+        used_gpu_count=sum(node.used_gpu_count for node in node_stats.values()),
+        total_memory_count=sum(node.memory_count for node in node_stats.values()),
+        used_memory_count=sum(node.used_memory_count for node in node_stats.values()),
+        total_storage_count=sum(node.storage_count for node in node_stats.values()),
+        used_storage_count=sum(node.used_storage_count for node in node_stats.values()),
+    )
+
+
+def random_stats(rng: random.Random, node_id: str) -> NodeResourceStats:
+    return NodeResourceStats(
+        node_id=node_id,
+        node_ip="10.0.0.1",
+        region=rng.choice([RegionType.Cloud, RegionType.Edge, RegionType.Device]),
+        node_type=NodeType.Training,
+        cpu_count=64,
+        gpu_count=8,
+        memory_count=512,
+        storage_count=4000,
+        used_cpu_count=rng.randint(0, 64),
+        used_gpu_count=rng.randint(0, 8),
+        used_memory_count=rng.randint(0, 512),
+        used_storage_count=rng.randint(0, 4000),
+        gpu_info=[],
+    )
+
+
+def per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def test_resource_stats_10k_nodes(benchmark_report):
+    rng = random.Random(0)
+    node_stats = {f"n{i}": random_stats(rng, f"n{i}") for i in range(NODE_COUNT)}
+    aggregates = ResourceAggregates()
+    for stats in node_stats.values():
+        aggregates.add(stats)
+    heartbeats = [random_stats(rng, f"n{rng.randrange(NODE_COUNT)}") for _ in range(HEARTBEAT_COUNT)]
+
+    legacy_stream = iter(heartbeats)
+    incremental_stream = iter(heartbeats)
+
+    def legacy_heartbeat():
+        new = next(legacy_stream)
+        node_stats[new.node_id] = new
+
+    def incremental_heartbeat():
+        new = next(incremental_stream)
+        aggregates.update(node_stats[new.node_id], new)
+        node_stats[new.node_id] = new
+
+    # 两种方式各自应用同一串心跳：先只替换节点状态，再重放一遍同时维护汇总
+    legacy_update = per_call(legacy_heartbeat, HEARTBEAT_COUNT)
+    aggregates = ResourceAggregates()
+    for stats in node_stats.values():
+        aggregates.add(stats)
+    incremental_update = per_call(incremental_heartbeat, HEARTBEAT_COUNT)
+
+    assert aggregates.to_resource_stats() == legacy_resource_stats(node_stats)
+    legacy_query = per_call(lambda: legacy_resource_stats(node_stats), QUERY_COUNT)
+    incremental_query = per_call(aggregates.to_resource_stats, QUERY_COUNT)
+
+    benchmark_report(
+        ["operation", "legacy_us", "incremental_us"],
+        [
+            [f"/resources/stats query, {NODE_COUNT} nodes", legacy_query * 1e6, incremental_query * 1e6],
+            ["heartbeat update", legacy_update * 1e6, incremental_update * 1e6],
+        ],
+    )
+    assert incremental_query < legacy_query
+
+
+async def fan_in(manager: Manager, heartbeats: list[NodeResourceStats]) -> tuple[float, list[float]]:
+    """
+    FAN_IN_CONCURRENCY 个并发连接发送全部心跳，同时每 STATS_POLL_INTERVAL 秒查询一次 /resources/stats
+
+    Returns:
+        tuple[float, list[float]]: 心跳吞吐量（次/秒）和各次统计查询的延迟
+    """
+    bodies = iter([stats.model_dump_json().encode() for stats in heartbeats])
+    stats_latencies = []
+    done = asyncio.Event()
+    headers = {"content-type": "application/json"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+
+        async def sender():
+            for body in bodies:
+                response = await client.post("/node/heartbeat", content=body, headers=headers)
+                assert response.json()["code"] == 200
+                # ASGITransport 的请求不会挂起，主动让出事件循环，使各连接和统计查询交替执行
+                await asyncio.sleep(0)
+
+        async def poller():
+            while not done.is_set():
+                start = time.perf_counter()
+                response = await client.get("/resources/stats")
+                stats_latencies.append(time.perf_counter() - start)
+                assert response.json()["code"] == 200
+                await asyncio.sleep(STATS_POLL_INTERVAL)
+
+        poll = asyncio.create_task(poller())
+        start = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(FAN_IN_CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poll
+    return len(heartbeats) / elapsed, stats_latencies
+
+
+def test_heartbeat_fan_in_10k_nodes(monkeypatch, benchmark_report):
+    """
+    10,000 个节点各发送一次心跳，同时轮询资源统计
+
+    旧实现每次统计查询持有 node_stats_lock 遍历全部节点，期间所有心跳都在等锁。
+    """
+    rng = random.Random(0)
+    registrations = [random_stats(rng, f"n{i}") for i in range(NODE_COUNT)]
+    heartbeats = [random_stats(rng, f"n{i}") for i in range(NODE_COUNT)]
+    rows = []
+    for label, legacy in (("legacy 11-pass stats", True), ("incremental aggregates", False)):
+        manager = Manager()
+        monkeypatch.setattr(app_module, "global_manager", manager)
+        if legacy:
+
+            async def legacy_get_resource_stats(region: RegionType = RegionType.ALL, manager=manager):
+                async with manager.node_stats_lock:
+                    return legacy_resource_stats(manager.node_registry.nodes)
+
+            monkeypatch.setattr(manager, "get_resource_stats", legacy_get_resource_stats)
+
+        async def run(manager=manager):
+            for stats in registrations:
+                await manager.update_node_stats(stats.node_id, stats)
+            return await fan_in(manager, heartbeats)
+
+        throughput, stats_latencies = asyncio.run(run())
+        rows.append(
+            [
+                label,
+                throughput,
+                len(stats_latencies),
+                np.percentile(stats_latencies, 50) * 1e3,
+                np.percentile(stats_latencies, 99) * 1e3,
+            ]
+        )
+
+    benchmark_report(
+        ["stats implementation", "heartbeats_per_s", "stats_queries", "stats_p50_ms", "stats_p99_ms"], rows
+    )
+    assert rows[1][4] < rows[0][4]
@@ -0,0 +1,150 @@
+import asyncio
+import itertools
+import random
+import time
+from contextlib import ExitStack
+
+import httpx
+import numpy as np
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.enums import RoutingPolicy
+from cedschedulerapp.master.manager import Manager
+from tests.standin import run_standin
+
+pytestmark = pytest.mark.benchmark
+
+# 三个正常实例和一个慢实例，总处理能力约 3 * 2 / 0.1 + 2 / 0.3 ≈ 67 请求/秒
+SERVICE_TIMES = {"fast-0": 0.1, "fast-1": 0.1, "fast-2": 0.1, "slow-0": 0.3}
+INSTANCE_SLOTS = 2
+ARRIVAL_RATE = 40.0
+REQUEST_COUNT = 400
+BLOCKS_PER_REQUEST = 10
+
+
+class SimulatedInstance:
+    """推理实例替身：最多同时运行 INSTANCE_SLOTS 个请求，其余排队，每个请求耗时 service_time"""
+
+    def __init__(self, instance_id: str, service_time: float):
+        self.instance_id = instance_id
+        self.service_time = service_time
+        self.running = 0
+        self.waiting = 0
+        # 在替身服务自己的事件循环中创建
+        self.slots = None
+
+    async def generate(self, request):
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(INSTANCE_SLOTS)
+        self.waiting += 1
+        async with self.slots:
+            self.waiting -= 1
+            self.running += 1
+            try:
+                await asyncio.sleep(self.service_time)
+            finally:
+                self.running -= 1
+        return JSONResponse({"text": [self.instance_id]})
+
+    def info(self) -> dict:
+        return {
+            "instance_id": self.instance_id,
+            "gpu_count": 1,
+            "request_count": self.running + self.waiting,
+            "running_request_count": self.running,
+            "waiting_request_count": self.waiting,
+            "total_gpu_blocks_count": 100,
+            "used_gpu_blocks_count": self.running * BLOCKS_PER_REQUEST,
+            "waiting_gpu_blocks_count": self.waiting * BLOCKS_PER_REQUEST,
+        }
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[Route("/generate", self.generate, methods=["POST"])])
+
+
+def inference_service(instances: list[SimulatedInstance], endpoints: dict[str, tuple[str, int]]) -> Starlette:
+    """推理服务统一入口的替身：提供实例列表，/generate 不看负载，按轮询转发到各实例"""
+    order = itertools.cycle(instances)
+    clients: dict[str, httpx.AsyncClient] = {}
+
+    async def instance_list(request):
+        return JSONResponse({"data": [instance.info() for instance in instances]})
+
+    async def generate(request):
+        instance_id = next(order).instance_id
+        if instance_id not in clients:
+            host, port = endpoints[instance_id]
+            clients[instance_id] = httpx.AsyncClient(base_url=f"http://{host}:{port}", timeout=60)
+        response = await clients[instance_id].post("/generate", content=await request.body())
+        return JSONResponse(response.json())
+
+    return Starlette(
+        routes=[Route("/instance_list", instance_list), Route("/generate", generate, methods=["POST"])]
+    )
+
+
+async def open_loop_latencies(manager: Manager) -> list[float]:
+    """按泊松过程发送请求，不等待前一个请求返回，记录每个请求从计划发送到返回的延迟"""
+    rng = random.Random(0)
+    start = time.perf_counter()
+    scheduled = list(itertools.accumulate(rng.expovariate(ARRIVAL_RATE) for _ in range(REQUEST_COUNT)))
+
+    async def one(at: float) -> float:
+        await asyncio.sleep(max(0.0, start + at - time.perf_counter()))
+        assert await manager.generate("hi")
+        return time.perf_counter() - start - at
+
+    return await asyncio.gather(*(one(at) for at in scheduled))
+
+
+def test_router_p99_against_single_endpoint(monkeypatch, benchmark_report):
+    """
+    开环负载下对比统一入口和各路由策略的延迟
+
+    统一入口按轮询分发，慢实例分到的请求超过其处理能力后持续排队；路由按后台
+    刷新的遥测和本地 inflight 选择实例，避开排队的实例。
+    """
+    instances = [SimulatedInstance(instance_id, service_time) for instance_id, service_time in SERVICE_TIMES.items()]
+    monkeypatch.setattr(server_config, "router_refresh_interval", 0.2)
+    results = {}
+    with ExitStack() as stack:
+        endpoints = {instance.instance_id: stack.enter_context(run_standin(instance.app())) for instance in instances}
+        host, port = stack.enter_context(run_standin(inference_service(instances, endpoints)))
+        monkeypatch.setattr(server_config, "inference_host", host)
+        monkeypatch.setattr(server_config, "inference_port", port)
+        variants = [("single endpoint", {}, RoutingPolicy.LeastWaiting)] + [
+            (f"router ({policy.value})", endpoints, policy) for policy in RoutingPolicy
+        ]
+        for label, inference_instances, policy in variants:
+            monkeypatch.setattr(server_config, "inference_instances", inference_instances)
+            monkeypatch.setattr(server_config, "routing_policy", policy)
+
+            async def run():
+                manager = Manager()
+                if manager.inference_router.enabled:
+                    await manager.refresh_inference_instances()
+                    manager.start_daemon(
+                        "inference_router", server_config.router_refresh_interval, manager.refresh_inference_instances
+                    )
+                try:
+                    return await open_loop_latencies(manager)
+                finally:
+                    await manager.close()
+
+            results[label] = asyncio.run(run())
+
+    benchmark_report(
+        ["path", "p50_ms", "p99_ms", "max_ms"],
+        [
+            [label, np.percentile(values, 50) * 1e3, np.percentile(values, 99) * 1e3, max(values) * 1e3]
+            for label, values in results.items()
+        ],
+    )
+    single_p99 = np.percentile(results["single endpoint"], 99)
+    for label, values in results.items():
+        if label != "single endpoint":
+            assert np.percentile(values, 99) < single_p99, label
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.client.training_client import TraingingServerClient
+from cedschedulerapp.master.enums import SubmissionStatus
+from cedschedulerapp.master.manager import global_manager
+from cedschedulerapp.master.submission import SubmissionPipeline
+from tests.standin import run_standin
+from tests.test_submit_task import make_request
+
+pytestmark = pytest.mark.benchmark
+
+TASK_COUNT = 1000
+# 替身训练服务每次提交的处理时间
+UPSTREAM_LATENCY = 0.02
+# 原实现逐个提交，每个任务之间固定等待 3 秒
+SEQUENTIAL_SLEEP = 3.0
+
+
+def training_server(received: list[str]) -> Starlette:
+    async def submit(request):
+        received.append((await request.json())["task"]["task_id"])
+        await asyncio.sleep(UPSTREAM_LATENCY)
+        return JSONResponse({"code": 200})
+
+    return Starlette(routes=[Route("/api/task/submit", submit, methods=["POST"])])
+
+
+@pytest.mark.parametrize("concurrency, rate", [(8, 0.0), (32, 0.0), (8, 200.0)])
+def test_submit_batch(concurrency, rate, monkeypatch, benchmark_report):
+    received: list[str] = []
+
+    async def run(host: str, port: int):
+        training_client = TraingingServerClient(host, port, pool_size=concurrency)
+        pipeline = SubmissionPipeline(training_client.submit_task, concurrency=concurrency, rate=rate)
+        monkeypatch.setattr(global_manager, "submission_pipeline", pipeline)
+        pipeline.start()
+        body = [make_request(i).model_dump(mode="json") for i in range(TASK_COUNT)]
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                start = time.perf_counter()
+                response = await client.post("/training/task_submit", json=body)
+                accepted = time.perf_counter() - start
+                await pipeline.queue.join()
+                submitted = time.perf_counter() - start
+        finally:
+            await pipeline.close()
+            await training_client.close()
+        return response.json()["data"], pipeline.get_states(), accepted, submitted
+
+    with run_standin(training_server(received)) as (host, port):
+        task_ids, states, accepted, submitted = asyncio.run(run(host, port))
+
+    assert len(task_ids) == TASK_COUNT
+    assert all(state.status == SubmissionStatus.Submitted for state in states)
+    assert sorted(received) == sorted(task_ids)
+    sequential = TASK_COUNT * UPSTREAM_LATENCY + (TASK_COUNT - 1) * SEQUENTIAL_SLEEP
+    benchmark_report(
+        ["concurrency", "rate", "route_s", "all_submitted_s", "tasks_per_s", "sequential_s"],
+        [[concurrency, rate or "unlimited", accepted, submitted, TASK_COUNT / submitted, sequential]],
+    )
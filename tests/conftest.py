@@ -0,0 +1,46 @@
+import sys
+
+import pytest
+
+# master 和 worker 的配置在导入时解析命令行参数，测试中使用默认配置而不是 pytest 的参数
+sys.argv = sys.argv[:1]
+
+# 基准测试结果表，在测试结束后的汇总中输出
+BENCHMARK_REPORTS: list[tuple[str, list[str]]] = []
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", help="运行 tests/benchmarks 下的性能基准测试")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: 性能基准测试，耗时较长，只在指定 --run-benchmarks 时运行")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="基准测试需要 --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter):
+    for title, lines in BENCHMARK_REPORTS:
+        terminalreporter.section(title)
+        for line in lines:
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def benchmark_report(request):
+    """返回 report(header, rows)，按列对齐后加入汇总输出"""
+
+    def report(header: list[str], rows: list[list]):
+        cells = [header] + [[f"{cell:.3f}" if isinstance(cell, float) else str(cell) for cell in row] for row in rows]
+        widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+        lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells]
+        BENCHMARK_REPORTS.append((request.node.name, lines))
+
+    return report
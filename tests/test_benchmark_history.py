@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.manager import Manager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(server_config, "benchmark_db_path", str(tmp_path / "benchmark_history.db"))
+    manager = Manager()
+    manager.open_benchmark_store()
+    yield manager
+    manager.benchmark_store.close()
+
+
+def stub_benchmark(manager: Manager, monkeypatch, benchmark_id: str):
+    async def benchmark(num_prompts: int, qps: float) -> str:
+        return benchmark_id
+
+    monkeypatch.setattr(manager.inference_client, "benchmark", benchmark)
+
+
+def test_failed_benchmark_not_recorded(manager, monkeypatch):
+    # 推理服务请求失败时客户端返回空 ID
+    stub_benchmark(manager, monkeypatch, "")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.benchmark(num_prompts=10, qps=1.0))
+
+    assert manager.benchmark_history == {}
+    assert manager.benchmark_store.load_all() == []
+
+
+def test_started_benchmark_recorded(manager, monkeypatch):
+    stub_benchmark(manager, monkeypatch, "bench-1")
+
+    assert asyncio.run(manager.benchmark(num_prompts=10, qps=1.0)) == "bench-1"
+
+    assert list(manager.benchmark_history) == ["bench-1"]
+    assert [record.benchmark_id for record in manager.benchmark_store.load_all()] == ["bench-1"]
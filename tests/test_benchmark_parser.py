@@ -0,0 +1,77 @@
+from cedschedulerapp.master.client.benchmark_parser import BenchmarkLogParser
+from cedschedulerapp.master.client.benchmark_parser import REQUIRED_ARRAYS
+
+HEADER = "Namespace(backend='vllm', num_prompts=1000, qps=2.0)\n"
+
+
+def result_lines() -> str:
+    lines = []
+    for name in REQUIRED_ARRAYS:
+        if name == "request_ids":
+            lines.append(f"all_{name}=['a', 'b']")
+        elif name.endswith("latencies"):
+            lines.append(f"all_{name}=[0.5, 1.25]")
+        else:
+            lines.append(f"all_{name}=[3, 4]")
+    return "\n".join(lines) + "\n"
+
+
+def test_progress_is_parsed_incrementally():
+    parser = BenchmarkLogParser()
+    log = HEADER + "num_finised_requests: 10\n"
+    progress = parser.parse_progress(log, "b1")
+    assert (progress.current_progress, progress.total_prompts, progress.is_complete) == (10, 1000, False)
+
+    log += "num_finised_requests: 500\nnum_finised_requests: 1000\n"
+    progress = parser.parse_progress(log, "b1")
+    assert (progress.current_progress, progress.is_complete) == (1000, True)
+    assert parser.states["b1"].offset == len(log)
+
+
+def test_partial_total_line_is_not_pinned():
+    parser = BenchmarkLogParser()
+    # 轮询时 num_prompts=1000 只写出了一部分
+    assert parser.parse_progress("Namespace(num_prompts=10", "b1") is None
+
+    progress = parser.parse_progress(HEADER + "num_finised_requests: 10", "b1")
+
+    assert progress.total_prompts == 1000
+    assert progress.is_complete is False
+
+
+def test_partial_progress_line_is_reread():
+    parser = BenchmarkLogParser()
+    progress = parser.parse_progress(HEADER + "num_finised_requests: 1", "b1")
+    assert progress.current_progress == 1
+    assert parser.states["b1"].current_progress is None
+
+    progress = parser.parse_progress(HEADER + "num_finised_requests: 150\n", "b1")
+    assert progress.current_progress == 150
+
+
+def test_result_without_trailing_newline():
+    parser = BenchmarkLogParser()
+    log = HEADER + "num_finised_requests: 2\n" + result_lines().rstrip("\n")
+
+    result = parser.parse_result(log, "b1")
+
+    assert result is not None
+    assert list(result.prompt_lens) == [3, 4]
+    assert list(result.e2e_latencies) == [0.5, 1.25]
+    assert result.request_ids == ["a", "b"]
+
+
+def test_truncated_log_restarts_parse():
+    parser = BenchmarkLogParser()
+    parser.parse_progress(HEADER + "num_finised_requests: 900\n", "b1")
+
+    progress = parser.parse_progress(HEADER + "num_finised_requests: 5\n", "b1")
+
+    assert progress.current_progress == 5
+
+
+def test_forget_drops_state():
+    parser = BenchmarkLogParser()
+    parser.parse_progress(HEADER, "b1")
+    parser.forget("b1")
+    assert "b1" not in parser.states
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from cedschedulerapp.master.generation_cache import GenerationCache
+from cedschedulerapp.master.generation_cache import SpillStore
+
+GREEDY = {"temperature": 0}
+
+
+def test_spill_store_survives_reopen_and_drops_expired(tmp_path):
+    path = str(tmp_path / "cache" / "generation_cache.db")
+    now = time.time()
+    store = SpillStore(path, max_entries=10)
+    store.put_sync([("live", now + 60, "kept"), ("expired", now + 0.01, "dropped")])
+    store.close()
+    time.sleep(0.02)
+
+    store = SpillStore(path, max_entries=10)
+    try:
+        assert store.get_sync("live") == (now + 60, "kept")
+        assert store.conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone() == (1,)
+    finally:
+        store.close()
+
+
+def test_evicted_entry_served_from_spill(tmp_path):
+    calls = []
+
+    async def run():
+        cache = GenerationCache(max_entries=1, ttl=60, spill_path=str(tmp_path / "generation_cache.db"))
+
+        async def generate(prompt: str):
+            calls.append(prompt)
+            return f"reply to {prompt}"
+
+        await cache.get_or_generate("a", GREEDY, lambda: generate("a"))
+        await cache.get_or_generate("b", GREEDY, lambda: generate("b"))
+        # "a" 已被淘汰出内存，等待后台落盘完成
+        await asyncio.gather(*cache.spill_tasks)
+        text = await cache.get_or_generate("a", GREEDY, lambda: generate("a"))
+        await cache.close()
+        return text
+
+    assert asyncio.run(run()) == "reply to a"
+    assert calls == ["a", "b"]
@@ -0,0 +1,136 @@
+import asyncio
+import sys
+
+import pytest
+
+from cedschedulerapp.master.enums import NodeType
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.manager import Manager
+from cedschedulerapp.master.manager import NodeStatsResyncError
+from cedschedulerapp.master.schemas import GPUInfo
+from cedschedulerapp.master.schemas import NodeResourceStats
+from cedschedulerapp.master.schemas import NodeResourceStatsDelta
+
+
+def full_stats(node_id: str = "n1", used_cpu_count: int = 1) -> NodeResourceStats:
+    return NodeResourceStats(
+        node_id=node_id,
+        node_ip="10.0.0.1",
+        region=RegionType.Cloud,
+        node_type=NodeType.Training,
+        cpu_count=64,
+        gpu_count=1,
+        memory_count=256,
+        storage_count=1000,
+        used_cpu_count=used_cpu_count,
+        used_gpu_count=0,
+        used_memory_count=10,
+        used_storage_count=100,
+        gpu_info=[
+            GPUInfo(gpu_id="0", gpu_type="V100", gpu_memory_total=32, gpu_memory_used=0, gpu_utilization=0.0)
+        ],
+    )
+
+
+@pytest.fixture
+def manager():
+    return Manager()
+
+
+def update(manager: Manager, stats):
+    return asyncio.run(manager.update_node_stats(stats.node_id, stats))
+
+
+def test_delta_applies_changed_fields(manager):
+    update(manager, full_stats())
+
+    merged = update(manager, NodeResourceStatsDelta(node_id="n1", seq=1, used_cpu_count=8))
+    assert merged.used_cpu_count == 8
+    assert merged.used_memory_count == 10
+    assert merged.gpu_info[0].gpu_type == "V100"
+
+    gpu = GPUInfo(gpu_id="0", gpu_type="V100", gpu_memory_total=32, gpu_memory_used=16, gpu_utilization=0.5)
+    merged = update(manager, NodeResourceStatsDelta(node_id="n1", seq=2, gpu_info=[gpu]))
+    assert merged.used_cpu_count == 8
+    assert merged.gpu_info == [gpu]
+    assert manager.node_registry.get("n1") == merged
+
+
+def test_delta_for_unknown_node_requires_resync(manager):
+    with pytest.raises(NodeStatsResyncError):
+        update(manager, NodeResourceStatsDelta(node_id="n1", seq=1, used_cpu_count=8))
+
+
+def test_seq_gap_requires_full_heartbeat(manager):
+    update(manager, full_stats())
+
+    with pytest.raises(NodeStatsResyncError):
+        update(manager, NodeResourceStatsDelta(node_id="n1", seq=2, used_cpu_count=8))
+    # 出现缺口后在收到全量心跳前拒绝所有增量
+    with pytest.raises(NodeStatsResyncError):
+        update(manager, NodeResourceStatsDelta(node_id="n1", seq=1, used_cpu_count=8))
+    assert manager.node_registry.get("n1").used_cpu_count == 1
+
+    update(manager, full_stats(used_cpu_count=2))
+    merged = update(manager, NodeResourceStatsDelta(node_id="n1", seq=1, used_cpu_count=8))
+    assert merged.used_cpu_count == 8
+
+
+def test_delta_updates_resource_totals(manager):
+    update(manager, full_stats("n1", used_cpu_count=1))
+    update(manager, full_stats("n2", used_cpu_count=2))
+
+    update(manager, NodeResourceStatsDelta(node_id="n1", seq=1, used_cpu_count=10))
+
+    assert manager.resource_aggregates.to_resource_stats().used_cpu_count == 12
+
+
+@pytest.fixture
+def worker_modules(monkeypatch):
+    # worker 的配置同样在导入时解析命令行参数
+    monkeypatch.setattr(sys, "argv", ["worker", "--id", "n1", "--region", "1", "--type", "训练"])
+    from cedschedulerapp.worker import schemas
+    from cedschedulerapp.worker import service
+
+    return schemas, service
+
+
+def worker_stats(schemas, used_cpu_count: int):
+    return schemas.NodeResourceStats(
+        **full_stats(used_cpu_count=used_cpu_count).model_dump(mode="json", exclude={"region"}), region="1"
+    )
+
+
+def test_encoder_sends_changed_fields_between_full_snapshots(worker_modules):
+    schemas, service = worker_modules
+    encoder = service.HeartbeatEncoder(full_snapshot_interval=3)
+
+    endpoint, body, state = encoder.encode(worker_stats(schemas, 1))
+    assert endpoint == encoder.FULL_ENDPOINT
+    encoder.ack(endpoint, state)
+
+    endpoint, body, state = encoder.encode(worker_stats(schemas, 5))
+    assert endpoint == encoder.DELTA_ENDPOINT
+    assert body == {"node_id": "n1", "seq": 1, "used_cpu_count": 5}
+    encoder.ack(endpoint, state)
+
+    endpoint, body, state = encoder.encode(worker_stats(schemas, 5))
+    assert endpoint == encoder.DELTA_ENDPOINT
+    assert body == {"node_id": "n1", "seq": 2}
+    encoder.ack(endpoint, state)
+
+    endpoint, body, state = encoder.encode(worker_stats(schemas, 5))
+    assert endpoint == encoder.FULL_ENDPOINT
+
+
+def test_encoder_resends_full_after_reset(worker_modules):
+    schemas, service = worker_modules
+    encoder = service.HeartbeatEncoder(full_snapshot_interval=10)
+    endpoint, _, state = encoder.encode(worker_stats(schemas, 1))
+    encoder.ack(endpoint, state)
+
+    # master 返回 409 或发送失败
+    encoder.reset()
+
+    endpoint, _, _ = encoder.encode(worker_stats(schemas, 2))
+    assert endpoint == encoder.FULL_ENDPOINT
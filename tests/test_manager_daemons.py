@@ -0,0 +1,48 @@
+import asyncio
+
+from cedschedulerapp.master.manager import Manager
+
+
+def run_daemon(manager: Manager, seconds: float, **kwargs):
+    async def run():
+        manager.start_daemon(**kwargs)
+        await asyncio.sleep(seconds)
+        await manager.close()
+
+    asyncio.run(run())
+
+
+def test_daemon_keeps_running_after_errors():
+    manager = Manager()
+    calls = []
+
+    async def job():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("upstream unavailable")
+
+    run_daemon(manager, 0.1, name="test", interval=0.01, job=job)
+
+    assert len(calls) >= 3
+    assert manager.daemon_tasks == []
+
+
+def test_daemon_skips_runs_while_condition_false():
+    manager = Manager()
+    calls = []
+    enabled = []
+
+    async def job():
+        calls.append(len(calls))
+
+    async def run():
+        manager.start_daemon("test", 0.01, job, when=lambda: bool(enabled))
+        await asyncio.sleep(0.05)
+        assert calls == []
+        enabled.append(True)
+        await asyncio.sleep(0.05)
+        await manager.close()
+
+    asyncio.run(run())
+
+    assert calls
@@ -0,0 +1,45 @@
+from cedschedulerapp.master.enums import NodeType
+from cedschedulerapp.master.enums import RegionType
+from cedschedulerapp.master.node_registry import NodeRegistry
+from tests.test_heartbeat_delta import full_stats
+
+# 注册顺序与 node_id 的字典序不同
+REGISTRATION_ORDER = ["n3", "n1", "n4", "n2"]
+
+
+def node_ids(nodes) -> list[str]:
+    return [node.node_id for node in nodes]
+
+
+def registry() -> NodeRegistry:
+    registry = NodeRegistry()
+    for node_id in REGISTRATION_ORDER:
+        registry.upsert(full_stats(node_id))
+    return registry
+
+
+def test_filtered_queries_keep_registration_order():
+    nodes = registry()
+
+    assert node_ids(nodes.query()) == REGISTRATION_ORDER
+    assert node_ids(nodes.query(region=RegionType.Cloud)) == REGISTRATION_ORDER
+    assert node_ids(nodes.query(free_gpu=True)) == REGISTRATION_ORDER
+    assert node_ids(nodes.query(node_type=NodeType.Training, gpu_type="V100")) == REGISTRATION_ORDER
+    # 区域、类型、型号都给定时走组合索引
+    assert (
+        node_ids(nodes.query(region=RegionType.Cloud, node_type=NodeType.Training, gpu_type="V100", free_gpu=True))
+        == REGISTRATION_ORDER
+    )
+
+
+def test_heartbeat_keeps_position_and_reregistration_moves_to_end():
+    nodes = registry()
+
+    nodes.upsert(full_stats("n3", used_cpu_count=8))
+    assert node_ids(nodes.query(region=RegionType.Cloud)) == REGISTRATION_ORDER
+
+    nodes.remove("n1")
+    nodes.upsert(full_stats("n1"))
+    expected = ["n3", "n4", "n2", "n1"]
+    assert node_ids(nodes.query()) == expected
+    assert node_ids(nodes.query(region=RegionType.Cloud)) == expected
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master import app as app_module
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.app import STALE_MESSAGE
+from cedschedulerapp.master.client import base_client
+from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.client.resilience import RetryBudget
+from cedschedulerapp.master.client.training_client import TraingingServerClient
+from cedschedulerapp.master.enums import CircuitState
+from cedschedulerapp.master.manager import global_manager
+from cedschedulerapp.master.response_cache import ResponseCache
+from cedschedulerapp.master.snapshot import VersionedSnapshot
+from tests.standin import run_standin
+from tests.test_submit_task import make_request
+
+INSTANCE = {
+    "instance_id": "inst-0",
+    "gpu_count": 1,
+    "request_count": 0,
+    "running_request_count": 0,
+    "waiting_request_count": 0,
+    "total_gpu_blocks_count": 100,
+    "used_gpu_blocks_count": 0,
+    "waiting_gpu_blocks_count": 0,
+}
+TASK_INFO = {"task_meta": make_request(0).to_task_meta(task_id="t0", start_time=0.0).model_dump(mode="json")}
+PAYLOADS = {
+    "/instance_list": {"data": [INSTANCE]},
+    "/api/task/infos": {"t0": TASK_INFO},
+    "/generate": {"text": ["done"]},
+}
+
+
+class FaultInjector:
+    """可编程的上游替身：按路径返回固定响应，可切换为 503 或延迟响应，并记录每个路径的请求次数"""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0.0
+        self.hits: Counter = Counter()
+
+    async def handle(self, request):
+        path = request.url.path
+        self.hits[path] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return JSONResponse({"error": "injected"}, status_code=self.status)
+        return JSONResponse(PAYLOADS.get(path, {}))
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[Route("/{path:path}", self.handle, methods=["GET", "POST"])])
+
+
+@pytest.fixture
+def fault():
+    injector = FaultInjector()
+    with run_standin(injector.app()) as (host, port):
+        injector.host, injector.port = host, port
+        yield injector
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(base_client, "RETRY_BACKOFF", 0.01)
+
+
+def test_breaker_opens_half_opens_and_closes(fault):
+    async def run():
+        client = InferenceServerClient(fault.host, fault.port, failure_threshold=3, reset_timeout=0.2, max_retries=0)
+        breaker = client.circuit_breaker
+        fault.status = 503
+        for _ in range(3):
+            assert await client.list_instances() is None
+        assert breaker.state == CircuitState.Open
+        # 打开期间直接失败，不再请求上游
+        assert await client.list_instances() is None
+        assert fault.hits["/instance_list"] == 3
+
+        # 冷却后放行一个探测请求，探测失败重新打开
+        await asyncio.sleep(0.25)
+        assert await client.list_instances() is None
+        assert breaker.state == CircuitState.Open
+        assert fault.hits["/instance_list"] == 4
+
+        # 探测进行中保持半开，其他请求仍被拒绝
+        await asyncio.sleep(0.25)
+        fault.status, fault.delay = 200, 0.2
+        probe = asyncio.create_task(client.list_instances())
+        await asyncio.sleep(0.05)
+        assert breaker.state == CircuitState.HalfOpen
+        assert await client.list_instances() is None
+        assert [instance.instance_id for instance in await probe] == ["inst-0"]
+        assert breaker.state == CircuitState.Closed
+        assert fault.hits["/instance_list"] == 5
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_client_stops_retrying_when_budget_exhausted(fault):
+    async def run():
+        client = InferenceServerClient(fault.host, fault.port, failure_threshold=100, max_retries=5)
+        client.retry_budget = RetryBudget(ratio=0, min_per_second=0, max_tokens=2)
+        fault.status = 503
+        assert await client.list_instances() is None
+        # 预算只够两次重试
+        assert fault.hits["/instance_list"] == 3
+        assert await client.list_instances() is None
+        assert fault.hits["/instance_list"] == 4
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_only_retry_endpoints_are_retried(fault):
+    async def run():
+        inference = InferenceServerClient(fault.host, fault.port, failure_threshold=100, max_retries=2)
+        training = TraingingServerClient(fault.host, fault.port, failure_threshold=100, max_retries=2)
+        fault.status = 503
+        assert await inference.list_instances() is None
+        assert await inference.generate("hi") == ""
+        assert await training.list_tasks() is None
+        assert fault.hits == {"/instance_list": 3, "/generate": 1, "/api/task/infos": 3}
+        await inference.close()
+        await training.close()
+
+    asyncio.run(run())
+
+
+def test_read_timeout_bounded_and_not_retried(fault):
+    async def run():
+        client = InferenceServerClient(
+            fault.host, fault.port, endpoint_timeouts={"/instance_list": 0.1}, max_retries=2
+        )
+        fault.delay = 1.0
+        start = time.perf_counter()
+        assert await client.list_instances() is None
+        assert time.perf_counter() - start < fault.delay
+        assert fault.hits["/instance_list"] == 1
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_routes_serve_stale_snapshot_while_circuit_open(fault, monkeypatch):
+    training = TraingingServerClient(fault.host, fault.port, failure_threshold=1, reset_timeout=60, max_retries=0)
+    inference = InferenceServerClient(fault.host, fault.port, failure_threshold=1, reset_timeout=60, max_retries=0)
+    monkeypatch.setattr(global_manager, "training_client", training)
+    monkeypatch.setattr(global_manager, "inference_client", inference)
+    monkeypatch.setattr(global_manager, "inference_services", [])
+    # max_age=0 使每次请求都向上游刷新
+    monkeypatch.setattr(
+        global_manager, "training_task_snapshot", VersionedSnapshot(global_manager.fetch_training_task_list, max_age=0)
+    )
+    monkeypatch.setattr(app_module, "response_cache", ResponseCache())
+
+    async def get_both(client: httpx.AsyncClient) -> tuple[dict, dict]:
+        tasks = (await client.get("/training/task_list")).json()
+        instances = (await client.get("/inference/instance_list")).json()
+        return tasks, instances
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            fresh = await get_both(client)
+            fault.status = 503
+            # 第一次失败打开熔断器，之后不再请求上游
+            failing = await get_both(client)
+            hits = sum(fault.hits.values())
+            start = time.perf_counter()
+            open_circuit = await get_both(client)
+            elapsed = time.perf_counter() - start
+        await training.close()
+        await inference.close()
+        return fresh, failing, open_circuit, hits, elapsed
+
+    fresh, failing, open_circuit, hits, elapsed = asyncio.run(run())
+
+    tasks, instances = fresh
+    assert not tasks["stale"] and [task["task_id"] for task in tasks["data"]] == ["t0"]
+    assert not instances["stale"] and [instance["instance_id"] for instance in instances["data"]] == ["inst-0"]
+    assert training.circuit_breaker.state == inference.circuit_breaker.state == CircuitState.Open
+    for tasks, instances in (failing, open_circuit):
+        assert tasks["stale"] and tasks["message"] == STALE_MESSAGE and tasks["data"] == fresh[0]["data"]
+        assert instances["stale"] and instances["message"] == STALE_MESSAGE
+        assert instances["data"] == fresh[1]["data"]
+    assert sum(fault.hits.values()) == hits
+    assert elapsed < 0.5
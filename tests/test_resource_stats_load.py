@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.client.inference_client import InferenceServerClient
+from cedschedulerapp.master.manager import global_manager
+from tests.standin import run_standin
+from tests.test_heartbeat_delta import full_stats
+
+UPSTREAM_DELAY = 1.0
+CONCURRENT_REQUESTS = 200
+
+
+def slow_inference_server(received: threading.Event, received_at: list[float]) -> Starlette:
+    async def generate(request):
+        received_at.append(time.perf_counter())
+        received.set()
+        await asyncio.sleep(UPSTREAM_DELAY)
+        return JSONResponse({"text": ["done"]})
+
+    return Starlette(routes=[Route("/generate", generate, methods=["POST"])])
+
+
+async def timed(request) -> tuple[float, httpx.Response]:
+    start = time.perf_counter()
+    response = await request
+    return time.perf_counter() - start, response
+
+
+def test_stats_and_heartbeats_not_stalled_by_slow_upstream(monkeypatch):
+    received = threading.Event()
+    received_at: list[float] = []
+
+    async def run(host: str, port: int):
+        inference_client = InferenceServerClient(host, port)
+        monkeypatch.setattr(global_manager, "inference_client", inference_client)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            chat = asyncio.create_task(client.post("/inference/chat", json={"message": "hi"}))
+            # 上游收到生成请求后再并发请求统计和心跳接口
+            assert await asyncio.to_thread(received.wait, 5)
+            results = await asyncio.gather(
+                *(timed(client.get("/resources/stats")) for _ in range(CONCURRENT_REQUESTS)),
+                *(
+                    timed(
+                        client.post(
+                            "/node/heartbeat", json=full_stats(f"load-n{i}").model_dump(mode="json")
+                        )
+                    )
+                    for i in range(CONCURRENT_REQUESTS)
+                ),
+            )
+            # 从上游收到请求开始计时，阻塞式调用期间事件循环无法推进，计时同样覆盖被冻结的时间
+            burst_elapsed = time.perf_counter() - received_at[0]
+            chat_response = await chat
+        await inference_client.close()
+        return results, burst_elapsed, chat_response
+
+    with run_standin(slow_inference_server(received, received_at)) as (host, port):
+        results, burst_elapsed, chat_response = asyncio.run(run(host, port))
+
+    assert all(response.json()["code"] == 200 for _, response in results)
+    assert chat_response.json()["data"] == "done"
+    # 阻塞式上游调用会冻结事件循环，所有请求至少要等到上游返回
+    assert burst_elapsed < UPSTREAM_DELAY / 2
+    assert max(latency for latency, _ in results) < UPSTREAM_DELAY / 2
@@ -0,0 +1,126 @@
+import asyncio
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+
+from cedschedulerapp.master.app import app
+from cedschedulerapp.master.app import response_cache
+from cedschedulerapp.master.args import server_config
+from cedschedulerapp.master.manager import global_manager
+from cedschedulerapp.master.response_cache import MIN_COMPRESS_SIZE
+from cedschedulerapp.master.response_cache import negotiate_encoding
+from cedschedulerapp.master.response_cache import ResponseCache
+from cedschedulerapp.master.schemas import APIResponse
+from tests.test_heartbeat_delta import full_stats
+
+
+def test_lookup_misses_after_version_change():
+    cache = ResponseCache()
+    cache.store("key", 1, {"value": 1})
+
+    assert cache.lookup("key", 1) is not None
+    assert cache.lookup("key", 2) is None
+
+
+def test_get_rebuilds_only_when_version_changes():
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"count": len(builds)}
+
+    first = cache.get("key", 1, build)
+    assert cache.get("key", 1, build) is first
+    second = cache.get("key", 2, build)
+
+    assert len(builds) == 2
+    assert json.loads(second.bodies["identity"]) == {"count": 2}
+
+
+def test_least_recently_used_entry_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.store("a", 1, {})
+    cache.store("b", 1, {})
+    cache.lookup("a", 1)
+    cache.store("c", 1, {})
+
+    assert cache.lookup("a", 1) is not None
+    assert cache.lookup("b", 1) is None
+
+
+def test_gzip_body_cached_per_payload():
+    cache = ResponseCache()
+    payload = cache.store("key", 1, {"items": ["x" * 10] * MIN_COMPRESS_SIZE})
+
+    response = asyncio.run(payload.to_response("gzip"))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == json.loads(payload.bodies["identity"])
+    assert "gzip" in payload.bodies
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [("gzip, deflate", "gzip"), ("gzip;q=0", "identity"), ("br", "identity"), ("zstd, gzip", "gzip")],
+)
+def test_negotiate_encoding_without_zstd(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, zstd_available=False) == expected
+
+
+async def node_stats_after(updates) -> list[dict]:
+    """依次执行 updates 中的操作，每次操作后请求一次节点列表"""
+    responses = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for update in updates:
+            await update()
+            response = (await client.get("/resources/node_stats", params={"region": 1})).json()
+            assert APIResponse.model_validate(response).code == 200
+            responses.append({node["node_id"]: node["used_cpu_count"] for node in response["data"]})
+    return responses
+
+
+def heartbeat(node_id: str, used_cpu_count: int):
+    return lambda: global_manager.update_node_stats(node_id, full_stats(node_id, used_cpu_count=used_cpu_count))
+
+
+def test_node_stats_cache_survives_heartbeats_within_ttl(monkeypatch):
+    ttl = 0.3
+    monkeypatch.setattr(server_config, "node_stats_cache_ttl", ttl)
+    response_cache.entries.clear()
+
+    async def bucket_start():
+        # 从时间分桶的起点开始，前两次请求落在同一个分桶内
+        await asyncio.sleep(ttl - time.monotonic() % ttl)
+        await heartbeat("cache-n1", 1)()
+
+    async def next_bucket():
+        await asyncio.sleep(ttl)
+
+    first, cached, updated = asyncio.run(node_stats_after([bucket_start, heartbeat("cache-n1", 7), next_bucket]))
+
+    assert first["cache-n1"] == cached["cache-n1"] == 1
+    assert updated["cache-n1"] == 7
+
+
+def test_node_stats_cache_invalidated_when_node_joins(monkeypatch):
+    monkeypatch.setattr(server_config, "node_stats_cache_ttl", 60.0)
+    response_cache.entries.clear()
+
+    first, joined = asyncio.run(node_stats_after([heartbeat("join-n1", 1), heartbeat("join-n2", 2)]))
+
+    assert "join-n2" not in first
+    assert joined["join-n2"] == 2
+
+
+def test_node_stats_cache_follows_every_heartbeat_without_ttl(monkeypatch):
+    monkeypatch.setattr(server_config, "node_stats_cache_ttl", 0)
+    response_cache.entries.clear()
+
+    first, updated = asyncio.run(node_stats_after([heartbeat("exact-n1", 1), heartbeat("exact-n1", 7)]))
+
+    assert first["exact-n1"] == 1
+    assert updated["exact-n1"] == 7
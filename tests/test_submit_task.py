@@ -0,0 +1,180 @@
+import asyncio
+import itertools
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cedschedulerapp.master import manager as manager_module
+from cedschedulerapp.master.client.base_client import UpstreamNotSentError
+from cedschedulerapp.master.client.training_client import TraingingServerClient
+from cedschedulerapp.master.enums import SubmissionStatus
+from cedschedulerapp.master.manager import Manager
+from cedschedulerapp.master.schemas import SubmitTaskRequest
+from cedschedulerapp.master.submission import SubmissionPipeline
+from tests.standin import free_port
+from tests.standin import run_standin
+
+
+def make_request(index: int) -> SubmitTaskRequest:
+    return SubmitTaskRequest(
+        task_name=f"job{index}",
+        task_image="image:latest",
+        inst_num=1,
+        plan_cpu=4,
+        plan_mem=16,
+        plan_gpu=1,
+        runtime=60,
+        fs_files=[],
+    )
+
+
+async def accept(task_meta):
+    return {}
+
+
+@pytest.fixture
+def manager():
+    manager = Manager()
+    manager.submission_pipeline.submit = accept
+    return manager
+
+
+def submit(manager: Manager, requests: list[SubmitTaskRequest]) -> list[str]:
+    async def run():
+        manager.submission_pipeline.start()
+        try:
+            return await manager.submit_task(requests)
+        finally:
+            await manager.submission_pipeline.close()
+
+    return asyncio.run(run())
+
+
+def test_batch_task_ids_unique(manager):
+    requests = [make_request(i) for i in range(2000)]
+
+    task_ids = submit(manager, requests)
+
+    assert len(task_ids) == len(requests)
+    assert len(set(task_ids)) == len(task_ids)
+    assert len(manager.submission_pipeline.get_states()) == len(requests)
+
+
+def test_batch_task_id_collision_retried(manager, monkeypatch):
+    # 前两次生成相同的随机后缀，第二个 ID 必须重新生成
+    suffixes = itertools.chain(["aaaa", "aaaa"], (f"{i:04d}" for i in itertools.count()))
+    monkeypatch.setattr(manager_module.random, "choices", lambda population, k: list(next(suffixes)))
+
+    task_ids = submit(manager, [make_request(i) for i in range(3)])
+
+    assert len(set(task_ids)) == 3
+
+
+def test_task_id_checked_against_queued_tasks(manager, monkeypatch):
+    first = submit(manager, [make_request(0)])[0]
+    suffixes = itertools.chain([first.rsplit("_", 1)[1]], (f"{i:04d}" for i in itertools.count()))
+    monkeypatch.setattr(manager_module.random, "choices", lambda population, k: list(next(suffixes)))
+
+    second = submit(manager, [make_request(1)])[0]
+
+    assert second != first
+
+
+def test_pipeline_runs_under_fresh_event_loops():
+    # 与 global_manager 一样在事件循环之外创建，每次 asyncio.run 都是新的事件循环
+    pipeline = SubmissionPipeline(accept, concurrency=2, rate=0)
+
+    async def run(batch: int) -> list[str]:
+        pipeline.start()
+        # 与服务启动时一样，提交协程先在空队列上等待
+        await asyncio.sleep(0)
+        try:
+            task_metas = [
+                make_request(i).to_task_meta(task_id=f"{batch}_{i}", start_time=0.0) for i in range(10)
+            ]
+            task_ids = pipeline.enqueue(task_metas)
+            await asyncio.wait_for(pipeline.queue.join(), 5)
+            return task_ids
+        finally:
+            await pipeline.close()
+
+    for batch in range(2):
+        task_ids = asyncio.run(run(batch))
+        assert all(state.status == SubmissionStatus.Submitted for state in pipeline.get_states(task_ids))
+
+
+def test_enqueue_before_start_rejected():
+    pipeline = SubmissionPipeline(accept)
+
+    with pytest.raises(RuntimeError):
+        pipeline.enqueue([make_request(0).to_task_meta(task_id="t0", start_time=0.0)])
+
+
+def run_pipeline(submit, task_count: int = 1) -> SubmissionPipeline:
+    pipeline = SubmissionPipeline(submit, concurrency=1, rate=0, max_retries=3, retry_backoff=0.001)
+
+    async def run():
+        pipeline.start()
+        try:
+            pipeline.enqueue(
+                [make_request(i).to_task_meta(task_id=f"t{i}", start_time=0.0) for i in range(task_count)]
+            )
+            await asyncio.wait_for(pipeline.queue.join(), 5)
+        finally:
+            await pipeline.close()
+
+    asyncio.run(run())
+    return pipeline
+
+
+def test_unsent_submission_retried():
+    outcomes = iter([UpstreamNotSentError("refused"), UpstreamNotSentError("refused"), {}])
+
+    async def submit(task_meta):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    state = run_pipeline(submit).get_states()[0]
+
+    assert state.status == SubmissionStatus.Submitted
+    assert state.attempts == 3
+
+
+def test_failed_submission_not_retried():
+    calls = []
+
+    async def submit(task_meta):
+        # 请求已发出但超时或返回错误，训练服务可能已经创建了任务
+        calls.append(task_meta.task_id)
+        return None
+
+    state = run_pipeline(submit).get_states()[0]
+
+    assert state.status == SubmissionStatus.Failed
+    assert calls == ["t0"]
+
+
+def test_training_client_reports_unsent_submission():
+    task_meta = make_request(0).to_task_meta(task_id="t0", start_time=0.0)
+
+    async def submit(port: int):
+        client = TraingingServerClient("127.0.0.1", port, failure_threshold=100)
+        try:
+            return await client.submit_task(task_meta)
+        finally:
+            await client.close()
+
+    # 端口上没有服务，连接被拒绝
+    with pytest.raises(UpstreamNotSentError):
+        asyncio.run(submit(free_port()))
+
+    async def unavailable(request):
+        return JSONResponse({}, status_code=503)
+
+    # 请求已经到达训练服务，结果未知，不能当作未发送
+    with run_standin(Starlette(routes=[Route("/api/task/submit", unavailable, methods=["POST"])])) as (_, port):
+        assert asyncio.run(submit(port)) is None